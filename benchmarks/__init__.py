@@ -0,0 +1,6 @@
+"""
+benchmarks:
+
+Standalone benchmarks for the posh interpreter, run them from the project root with
+`$ python -m benchmarks.<name>` after installing posh (or with `src` on the `PYTHONPATH`).
+"""
@@ -0,0 +1,72 @@
+"""
+dispatch.py
+
+Measure the cost of dispatching a builtin, comparing a freshly constructed executable
+(and therefore a freshly built argument parser) per call against the instances reused
+by the `CommandRegistry`.
+
+Usage: `$ python -m benchmarks.dispatch [-n NUMBER]`
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from os import devnull
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from posh.interpreter import Interpreter, load_commands
+
+COMMANDS: tuple[tuple[str, list[str]], ...] = (
+    ("cd", ["."]),
+    ("pwd", []),
+    ("ls", ["-t"]),
+    ("cat", ["file_0.txt"]),
+    ("touch", ["-f", "file_0.txt"]),
+)
+
+
+class BenchmarkInterpreter(Interpreter):
+    def main(self) -> None: ...
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.dispatch")
+    parser.add_argument(
+        "-n", "--number", type=int, default=2000, help="calls per command"
+    )
+    number: int = parser.parse_args().number
+
+    with TemporaryDirectory() as directory, open(devnull, "w", encoding="utf8") as null:
+        cwd = Path(directory)
+        for index in range(10):
+            (cwd / f"file_{index}.txt").write_text("line\n" * 10)
+
+        console = BenchmarkInterpreter(cwd)
+        console.config.record_history = False
+        commands = load_commands()
+
+        print(f"{'command':<8}{'fresh (us)':>12}{'reused (us)':>13}{'speedup':>9}")
+        with redirect_stdout(null):
+            results = list[tuple[str, float, float]]()
+            for name, args in COMMANDS:
+                command = commands[name]
+                fresh = timeit(lambda: command().execute(console, args), number=number)
+
+                executable = commands.instance(name)
+                assert executable is not None
+                reused = timeit(
+                    lambda: executable.execute(console, args), number=number
+                )
+
+                results.append((name, fresh, reused))
+
+        for name, fresh, reused in results:
+            print(
+                f"{name:<8}{fresh / number * 1e6:>12.1f}{reused / number * 1e6:>13.1f}"
+                f"{fresh / reused:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
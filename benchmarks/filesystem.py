@@ -0,0 +1,207 @@
+"""
+filesystem.py
+
+Measure the file system commands, `ls -r`, `cp -r`, `rm -r`, `mv` & `cat`, on the
+synthetic trees of `benchmarks.trees`, driving the real commands through the
+interpreter. Every run happens in a fresh process, so that the peak memory usage of
+one run doesn't hide that of the next, and records the wall & cpu time, the number of
+read & write syscalls, the bytes they transferred and the peak rss.
+
+The trees are generated in a temporary directory, use `--directory /dev/shm` to keep
+them on a tmpfs, and `--scale` for a quicker run. Results can be saved with `--output`
+and compared against an earlier run with `--compare`, or with `benchmarks.results`.
+
+Usage: `$ python -m benchmarks.filesystem [--scale SCALE] [--repeat REPEAT]
+[--directory DIRECTORY] [--output FILE] [--compare FILE] [CASE ...]`
+"""
+
+import shutil
+from argparse import ArgumentParser
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os import devnull
+from pathlib import Path
+from resource import RUSAGE_SELF, getrusage
+from statistics import median
+from tempfile import TemporaryDirectory
+from typing import Any, NamedTuple
+
+from posh.interpreter import Interpreter
+from posh.interpreter.metrics import measure
+from posh.interpreter.streams import OutputSink
+
+from .results import compare_results, load_results, write_results
+from .trees import TREES
+
+
+class BenchmarkInterpreter(Interpreter):
+    def main(self) -> None:
+        ...
+
+
+class Case(NamedTuple):
+    tree: str
+    command: str
+    # puts the tree back the way it was after the command changed it, untimed
+    restore: Callable[[Path, str, float], None] | None = None
+
+
+def remove_copy(cwd: Path, tree: str, scale: float) -> None:
+    shutil.rmtree(cwd / "copy")
+
+
+def move_back(cwd: Path, tree: str, scale: float) -> None:
+    (cwd / "moved").rename(cwd / tree)
+
+
+def regenerate(cwd: Path, tree: str, scale: float) -> None:
+    if (cwd / tree).exists():
+        shutil.rmtree(cwd / tree)
+    TREES[tree](cwd / tree, scale)
+
+
+CASES = {
+    "ls-wide": Case("wide", "ls wide"),
+    "ls-r-deep": Case("deep", "ls -r deep"),
+    "ls-r-small": Case("small", "ls -r small"),
+    "ls-r-hidden": Case("hidden", "ls -r hidden"),
+    "ls-ra-hidden": Case("hidden", "ls -r -a hidden"),
+    "cat-huge": Case("huge", "cat huge/file_0.txt huge/file_1.txt huge/file_2.txt"),
+    "cp-r-wide": Case("wide", "cp -r wide copy", remove_copy),
+    "cp-r-small": Case("small", "cp -r small copy", remove_copy),
+    "cp-r-huge": Case("huge", "cp -r huge copy", remove_copy),
+    "mv-small": Case("small", "mv small moved", move_back),
+    "rm-r-wide": Case("wide", "rm -r -f wide", regenerate),
+    "rm-r-deep": Case("deep", "rm -r -f deep", regenerate),
+    "rm-r-small": Case("small", "rm -r -f small", regenerate),
+}
+
+
+def run_command(cwd: Path, command: str) -> dict[str, Any]:
+    """Run a command in a fresh interpreter, this is called in a new process."""
+    console = BenchmarkInterpreter(cwd)
+    console.config.record_history = False
+    # commands are imported on first use, which shouldn't be part of the timing
+    console.commands.instance(command.split()[0])
+
+    with open(devnull, "w", encoding="utf8") as null:
+        console.stdout = OutputSink(null)
+        with measure(command) as metrics:
+            err = console.interpret_command(command)
+            console.stdout.flush()
+
+    if err is not None:
+        raise RuntimeError(f"{command!r} failed, {err}")
+    return {
+        "wall": metrics.wall,
+        "user": metrics.user,
+        "system": metrics.system,
+        "read_calls": metrics.read_calls,
+        "write_calls": metrics.write_calls,
+        "read_bytes": metrics.read_bytes,
+        "write_bytes": metrics.write_bytes,
+        "peak_rss": getrusage(RUSAGE_SELF).ru_maxrss * 1024,
+        "rss_growth": metrics.max_rss_delta,
+    }
+
+
+def run_case(cwd: Path, case: Case, scale: float, repeat: int) -> dict[str, Any]:
+    runs = list[dict[str, Any]]()
+    for _ in range(repeat):
+        with ProcessPoolExecutor(
+            1, mp_context=get_context("spawn"), max_tasks_per_child=1
+        ) as pool:
+            runs.append(pool.submit(run_command, cwd, case.command).result())
+        if case.restore is not None:
+            case.restore(cwd, case.tree, scale)
+
+    result = dict[str, Any]()
+    for metric in runs[0]:
+        values = [run[metric] for run in runs]
+        # io counters aren't available everywhere, those metrics are None then
+        result[metric] = None if None in values else median(values)
+    return result
+
+
+def print_result(name: str, result: dict[str, Any]) -> None:
+    def size(value: int | None) -> str:
+        return "N/A" if value is None else f"{value / (1024 * 1024):,.1f}M"
+
+    def count(value: int | None) -> str:
+        return "N/A" if value is None else f"{value:,.0f}"
+
+    print(
+        f"{name:<14}{result['wall']:>9.3f}{result['user']:>9.3f}"
+        f"{result['system']:>9.3f}{count(result['read_calls']):>11}"
+        f"{count(result['write_calls']):>11}{size(result['read_bytes']):>10}"
+        f"{size(result['write_bytes']):>10}{size(result['peak_rss']):>9}",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.filesystem")
+    parser.add_argument(
+        "-s", "--scale", type=float, default=1, help="multiplier of the tree sizes"
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="runs per case, the median is kept"
+    )
+    parser.add_argument(
+        "-d",
+        "--directory",
+        type=Path,
+        default=None,
+        help="directory to generate the trees in, e.g. /dev/shm for a tmpfs",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="save the results as json"
+    )
+    parser.add_argument(
+        "-c",
+        "--compare",
+        type=Path,
+        default=None,
+        help="compare the results against those of an earlier run",
+    )
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        help=f"cases to run, default is all of them, from {', '.join(CASES)}",
+    )
+    arguments = parser.parse_args()
+    scale: float = arguments.scale
+    names: list[str] = arguments.cases or list(CASES)
+    if unknown := [name for name in names if name not in CASES]:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = dict[str, Any]()
+    with TemporaryDirectory(dir=arguments.directory) as directory:
+        cwd = Path(directory)
+        for tree in dict.fromkeys(CASES[name].tree for name in names):
+            print(f"generating {tree}...", flush=True)
+            TREES[tree](cwd / tree, scale)
+
+        print(
+            f"{'case':<14}{'wall':>9}{'user':>9}{'sys':>9}{'reads':>11}{'writes':>11}"
+            f"{'read':>10}{'written':>10}{'rss':>9}"
+        )
+        for name in names:
+            results[name] = run_case(cwd, CASES[name], scale, arguments.repeat)
+            print_result(name, results[name])
+
+    settings = {"scale": scale, "repeat": arguments.repeat}
+    if arguments.output is not None:
+        write_results(arguments.output, "filesystem", settings, results)
+    if arguments.compare is not None:
+        print()
+        compare_results(
+            load_results(arguments.compare),
+            {"settings": settings, "results": results},
+            threshold=10,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+history_sessions.py
+
+Check that concurrent sessions keep the history & its sidecar index consistent. Every
+trial starts several processes at once on a history without a sidecar, each of them
+builds the index, appends some commands & builds it again, then a fresh manager checks
+that the index matches the file & that lines are read from the right offsets. Exits
+with a status of 1 if any trial finds a corrupted history or index.
+
+Usage: `$ python -m benchmarks.history_sessions [-l LINES] [-s SESSIONS] [-t TRIALS]
+[-a APPENDS]`
+"""
+
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Barrier
+from time import perf_counter
+
+from posh.interpreter.history_manager import INDEX_SUFFIX, HistoryManager, index_lines
+
+
+def run_session(path: Path, session: int, appends: int, barrier: Barrier) -> None:
+    manager = HistoryManager(path, window=0)
+    barrier.wait()  # every session builds the index at the same time
+    len(manager)
+    for index in range(appends):
+        manager.add(f"session {session} command {index}")
+    manager.close()
+    len(manager)
+
+
+def check_history(path: Path, lines: int, sessions: int, appends: int) -> list[str]:
+    problems = list[str]()
+    with open(path, "rb") as file:
+        ends = index_lines(file, 0)
+    data = path.read_bytes().decode("utf8").split("\n")[:-1]
+    if len(ends) != lines + sessions * appends:
+        problems.append(f"{len(ends)} lines, expected {lines + sessions * appends}")
+
+    for session in range(sessions):
+        commands = [line for line in data if line.startswith(f"session {session} ")]
+        if commands != [f"session {session} command {i}" for i in range(appends)]:
+            problems.append(f"the commands of session {session} are missing or mixed")
+
+    manager = HistoryManager(path, window=0)
+    if (length := len(manager)) != len(data):
+        problems.append(f"the index has {length} lines, the history has {len(data)}")
+    else:
+        for index in {0, len(data) // 3, len(data) // 2, len(data) - 1}:
+            if (line := manager.get_line(index)) != data[index]:
+                problems.append(f"line {index} is {line!r}, expected {data[index]!r}")
+    manager.close()
+    return problems
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.history_sessions")
+    parser.add_argument(
+        "-l", "--lines", type=int, default=300_000, help="lines in the history"
+    )
+    parser.add_argument(
+        "-s", "--sessions", type=int, default=6, help="concurrent sessions"
+    )
+    parser.add_argument("-t", "--trials", type=int, default=15, help="trials to run")
+    parser.add_argument(
+        "-a", "--appends", type=int, default=50, help="commands added per session"
+    )
+    options = parser.parse_args()
+
+    failures = 0
+    context = get_context("spawn")
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / "history.txt"
+        for trial in range(options.trials):
+            path.write_text(
+                "".join(f"old {index}\n" for index in range(options.lines)),
+                encoding="utf8",
+            )
+            path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+
+            start = perf_counter()
+            with (
+                context.Manager() as sync_manager,
+                ProcessPoolExecutor(options.sessions, mp_context=context) as pool,
+            ):
+                barrier = sync_manager.Barrier(options.sessions)
+                futures = [
+                    pool.submit(run_session, path, session, options.appends, barrier)
+                    for session in range(options.sessions)
+                ]
+                for future in futures:
+                    future.result()
+            elapsed = perf_counter() - start
+
+            # a fresh process, which loads the sidecar the sessions left behind
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                problems = pool.submit(
+                    check_history,
+                    path,
+                    options.lines,
+                    options.sessions,
+                    options.appends,
+                ).result()
+            failures += bool(problems)
+            status = "ok" if not problems else "; ".join(problems)
+            print(f"trial {trial + 1:>3}  {elapsed:>6.2f}s  {status}")
+
+    print(f"{failures} of {options.trials} trials corrupted the history")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
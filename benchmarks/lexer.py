@@ -0,0 +1,59 @@
+"""
+lexer.py
+
+Compare the posh tokenizer against the previous `shlex` based splitting (including its
+second quote stripping pass) on long script lines.
+
+Usage: `$ python -m benchmarks.lexer [-n NUMBER]`
+"""
+from argparse import ArgumentParser
+from shlex import shlex
+from timeit import timeit
+
+from posh.interpreter.lexer import tokenize
+
+LINES = {
+    "short": "ls -a",
+    "many groups": "; ".join(f"cd dir_{i}; ls -t -s" for i in range(50)),
+    "quoted": " ".join(f"cp \"source file {i}.txt\" 'dest {i}'" for i in range(100)),
+    "long words": " ".join(f"/some/fairly/long/path/number/{i}" for i in range(200)),
+}
+
+
+def shlex_split(string: str) -> list[list[str]]:
+    lexer = shlex(string, punctuation_chars=True, posix=True)
+    lexer.whitespace_split = True
+
+    cmd_groups = list[list[str]]()
+    cur_args = list[str]()
+    for arg in lexer:
+        if ";" in arg:
+            cmd_groups.append(cur_args)
+            cur_args = list[str]()
+            continue
+        cur_args.append(arg.replace("'", "").replace('"', ""))
+
+    if cur_args:
+        cmd_groups.append(cur_args)
+    return cmd_groups
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.lexer")
+    parser.add_argument(
+        "-n", "--number", type=int, default=200, help="iterations per line"
+    )
+    number: int = parser.parse_args().number
+
+    print(f"{'line':<12}{'chars':>7}{'shlex (us)':>12}{'posh (us)':>11}{'speedup':>9}")
+    for name, line in LINES.items():
+        old = timeit(lambda: shlex_split(line), number=number)
+        new = timeit(lambda: tokenize(line), number=number)
+        print(
+            f"{name:<12}{len(line):>7}{old / number * 1e6:>12.1f}"
+            f"{new / number * 1e6:>11.1f}{old / new:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+output.py
+
+Measure the output throughput of `cat` on a large file and `ls -r` on a large tree,
+comparing the buffered `OutputSink` against a sink which writes & flushes every
+single write, like the previous per-line `print()` calls did on a terminal.
+
+The defaults (a 1 GiB file & a 1M entry tree) take a while to generate, use
+`--size` & `--entries` for a quicker run.
+
+Usage: `$ python -m benchmarks.output [--size MIB] [--entries ENTRIES]`
+"""
+
+from argparse import ArgumentParser
+from os import devnull
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from posh.interpreter import Interpreter
+from posh.interpreter.streams import OutputSink
+
+LINE = "the quick brown fox jumps over the lazy dog, " * 2 + "\n"
+FILES_PER_DIRECTORY = 1000
+
+
+class BenchmarkInterpreter(Interpreter):
+    def main(self) -> None: ...
+
+
+def write_file(path: Path, size: int) -> None:
+    block = LINE * (1024 * 1024 // len(LINE))
+    with open(path, "w", encoding="utf8") as file:
+        written = 0
+        while written < size:
+            written += file.write(block)
+
+
+def write_tree(root: Path, entries: int) -> None:
+    for index in range(entries):
+        directory = root / f"dir_{index // FILES_PER_DIRECTORY}"
+        if index % FILES_PER_DIRECTORY == 0:
+            directory.mkdir()
+        (directory / f"file_{index}.txt").touch()
+
+
+def run(console: Interpreter, command: str, buffer_size: int) -> float:
+    with open(devnull, "w", encoding="utf8") as null:
+        console.stdout = OutputSink(null, buffer_size=buffer_size)
+        start = perf_counter()
+        err = console.interpret_command(command)
+        elapsed = perf_counter() - start
+
+    assert err is None, err
+    return elapsed
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.output")
+    parser.add_argument(
+        "-s", "--size", type=int, default=1024, help="size of the file in MiB"
+    )
+    parser.add_argument(
+        "-e", "--entries", type=int, default=1_000_000, help="files in the tree"
+    )
+    arguments = parser.parse_args()
+    size: int = arguments.size * 1024 * 1024
+    entries: int = arguments.entries
+
+    with TemporaryDirectory() as directory:
+        cwd = Path(directory)
+        print("generating...", flush=True)
+        write_file(cwd / "large.txt", size)
+        (cwd / "tree").mkdir()
+        write_tree(cwd / "tree", entries)
+
+        console = BenchmarkInterpreter(cwd)
+        console.config.record_history = False
+
+        print(f"{'command':<18}{'unbuffered':>14}{'buffered':>14}{'speedup':>9}")
+        for command, amount, unit in (
+            ("cat large.txt", size / (1024 * 1024), "MiB/s"),
+            ("cat -n large.txt", size / (1024 * 1024), "MiB/s"),
+            ("ls -r tree", entries, "entries/s"),
+        ):
+            unbuffered = run(console, command, 0)
+            buffered = run(console, command, OutputSink().buffer_size)
+            print(
+                f"{command:<18}{amount / unbuffered:>14,.0f}{amount / buffered:>14,.0f}"
+                f"{unbuffered / buffered:>8.2f}x  ({unit})"
+            )
+
+
+if __name__ == "__main__":
+    main()
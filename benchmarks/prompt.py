@@ -0,0 +1,61 @@
+"""
+prompt.py
+
+Measure the latency of rendering the prompt, comparing a prompt rendered from scratch,
+like every prompt used to be, against the cached prompt, which is only rendered again
+once the cwd, the config or the size of the terminal changes.
+
+Usage: `$ python -m benchmarks.prompt [-n NUMBER]`
+"""
+
+import os
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from posh.interpreter.config import Config
+from posh.interpreter.console import Console
+from posh.interpreter.prompt import shorten_path
+
+
+def render_uncached(console: Console) -> str:
+    console.prompt.clear()
+    console._resolved_cwd = None  # pylint: disable=protected-access
+    shorten_path.cache_clear()
+    return console.input_string()
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.prompt")
+    parser.add_argument(
+        "-n", "--number", type=int, default=20_000, help="renders per directory"
+    )
+    number: int = parser.parse_args().number
+
+    with TemporaryDirectory() as directory:
+        root = Path(directory).resolve()
+        home = root / "home"
+        deep = home.joinpath(*(f"directory_{index}" for index in range(20)))
+        deep.mkdir(parents=True)
+        outside = root.joinpath(*(f"outside_{index}" for index in range(20)))
+        outside.mkdir(parents=True)
+        # the home directory is looked up from the environment on every render
+        os.environ["HOME"] = str(home)
+
+        config = Config(root / "config.json", record_history=False)
+        console = Console(home, config)
+
+        print(f"{'cwd':<14}{'uncached (us)':>15}{'cached (us)':>13}{'speedup':>9}")
+        for name, cwd in (("home", home), ("under home", deep), ("outside", outside)):
+            console.cwd = cwd
+            uncached = timeit(lambda: render_uncached(console), number=number)
+            cached = timeit(console.input_string, number=number)
+            print(
+                f"{name:<14}{uncached / number * 1e6:>15.1f}"
+                f"{cached / number * 1e6:>13.1f}{uncached / cached:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+results.py
+
+Saving the results of a benchmark as json & comparing the results of two runs, e.g.
+before & after a change.
+
+Usage: `$ python -m benchmarks.results [--threshold PERCENT] OLD NEW`
+"""
+
+import json
+import platform
+import sys
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# metrics where a higher value is better, every other one is a cost
+HIGHER_IS_BETTER = frozenset(("throughput",))
+
+
+def write_results(
+    path: Path, benchmark: str, settings: dict[str, Any], results: dict[str, Any]
+) -> None:
+    document = {
+        "benchmark": benchmark,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf8")
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    document: dict[str, Any] = json.loads(path.read_text(encoding="utf8"))
+    if "results" not in document:
+        raise ValueError(f"{str(path)!r} doesn't contain benchmark results")
+    return document
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, int) or abs(value) >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:.4g}"
+
+
+def compare_results(
+    old: dict[str, Any], new: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    Print every metric shared by both runs, returning the names of those which got
+    worse by more than the threshold percentage.
+    """
+    if old.get("settings") != new.get("settings"):
+        print(
+            f"warning: the runs used different settings, {old.get('settings')} & "
+            f"{new.get('settings')}",
+            file=sys.stderr,
+        )
+
+    regressions = list[str]()
+    print(f"{'case':<24}{'metric':<16}{'old':>14}{'new':>14}{'change':>10}")
+    for case, new_metrics in new["results"].items():
+        if (old_metrics := old["results"].get(case)) is None:
+            continue
+        for metric, new_value in new_metrics.items():
+            old_value = old_metrics.get(metric)
+            if not isinstance(new_value, (int, float)) or not isinstance(
+                old_value, (int, float)
+            ):
+                continue
+
+            flag = ""
+            if not old_value:  # a change from nothing has no percentage
+                change = "n/a" if new_value else "+0.0%"
+            else:
+                percentage = (new_value - old_value) / old_value * 100
+                change = f"{percentage:+.1f}%"
+                worse = -percentage if metric in HIGHER_IS_BETTER else percentage
+                if worse > threshold:
+                    flag = "  !"
+                    regressions.append(f"{case} {metric}")
+            print(
+                f"{case:<24}{metric:<16}{format_value(old_value):>14}"
+                f"{format_value(new_value):>14}{change:>10}{flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.results")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=10,
+        help="percentage a metric may get worse by before it's a regression",
+    )
+    parser.add_argument("old", type=Path, help="results of the baseline run")
+    parser.add_argument("new", type=Path, help="results to compare against it")
+    arguments = parser.parse_args()
+
+    regressions = compare_results(
+        load_results(arguments.old), load_results(arguments.new), arguments.threshold
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+throughput.py
+
+Measure the fixed overhead of every command line, separately from the cost of the
+commands themselves, by replaying a corpus of realistic & generated lines, with long
+alias chains, many `;` groups and many `$var` references, against an interpreter whose
+output goes to a null sink. Every stage of a line is timed on its own, tokenizing,
+alias expansion, parsing and the whole line run by the interpreter, with & without the
+parse cache. The allocations of a line are the peak memory traced by `tracemalloc`
+while it runs, averaged over the corpus.
+
+The same corpus, mutated randomly, is a fuzz regression set for the parser, `--fuzz`
+checks that no line crashes it, & `--save` adds any line which does to
+`corpus/crashes.txt`.
+
+Usage: `$ python -m benchmarks.throughput [--repeat REPEAT] [--output FILE]
+[--compare FILE]` or `$ python -m benchmarks.throughput --fuzz [--lines LINES]
+[--seed SEED] [--save]`
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from traceback import format_exception
+from typing import Any
+
+from posh.interpreter import Interpreter
+from posh.interpreter.commands import (
+    Command,
+    ParseCache,
+    copy_command,
+    expand_aliases,
+    group_tokens,
+    parse_commands,
+    parse_string_command,
+)
+from posh.interpreter.config import Config
+from posh.interpreter.lexer import Token, tokenize
+from posh.interpreter.streams import CURRENT_SESSION, OutputSink
+
+from .results import compare_results, load_results, write_results
+
+CORPUS = Path(__file__).parent / "corpus"
+ALIASES = {
+    "ll": "ls -a -s",
+    "lt": "ll -t",
+    "todos": "cat notes.txt | grep todo",
+    # a long chain, each alias expands to the next
+    **{f"chain_{index}": f"chain_{index + 1}" for index in range(63)},
+    "chain_63": "pwd",
+}
+VARIABLES = 32
+# characters which are most likely to confuse the lexer & parser
+FUZZ_CHARACTERS = "|&;<>$=\"'\\ \t2-"
+
+
+class NullStream:
+    def write(self, string: str, /) -> int:
+        return len(string)
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class BenchmarkInterpreter(Interpreter):
+    def main(self) -> None: ...
+
+
+def read_corpus(name: str) -> list[str]:
+    with open(CORPUS / name, encoding="utf8") as file:
+        return [
+            line.rstrip("\n")
+            for line in file
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def generated_lines() -> list[str]:
+    variables = " ".join(f"$log_{index}" for index in range(VARIABLES))
+    return [
+        "chain_0",
+        "; ".join(f"chain_{index}" for index in range(0, 64, 4)),
+        "; ".join(["pwd", "cd src", "cd .."] * 32),
+        "; ".join(f"$var_{index} = value_{index}" for index in range(64)),
+        f"cat {variables}",
+        f"touch -f {variables}",
+        f"grep -c todo {variables} | grep -v :0",
+        " ".join(["ls", "-t", "-s"] + [f"-i ignored_{index}" for index in range(64)]),
+    ]
+
+
+def fuzz_lines(lines: list[str], count: int, seed: int) -> list[str]:
+    """Mutate random lines by inserting, deleting & replacing characters."""
+    random = Random(seed)
+    alphabet = FUZZ_CHARACTERS + "abc$"
+    fuzzed = list[str]()
+    for _ in range(count):
+        characters = list(random.choice(lines))
+        for _ in range(random.randint(1, 8)):
+            position = random.randint(0, len(characters))
+            action = random.random()
+            if action < 0.4 or not characters:
+                characters.insert(position, random.choice(alphabet))
+            elif action < 0.7:
+                del characters[min(position, len(characters) - 1)]
+            else:
+                characters[min(position, len(characters) - 1)] = random.choice(alphabet)
+        fuzzed.append("".join(characters))
+    return fuzzed
+
+
+def create_console(cwd: Path) -> BenchmarkInterpreter:
+    (cwd / "src").mkdir()
+    (cwd / "notes.txt").write_text(
+        "".join(f"todo: fix item {index}\nnote {index}\n" for index in range(50)),
+        encoding="utf8",
+    )
+    for index in range(VARIABLES):
+        (cwd / f"log_{index}.txt").write_text(f"error {index}\n", encoding="utf8")
+
+    # a config of its own, so that neither the user's aliases nor history are used
+    config = Config(cwd / "config.json", record_history=False, aliases=ALIASES)
+    console = BenchmarkInterpreter(cwd, config)
+    console.stdout = OutputSink(NullStream())
+    console.stderr = OutputSink(NullStream())
+    for index in range(VARIABLES):
+        console.variables[f"$log_{index}"] = f"log_{index}.txt"
+    return console
+
+
+def time_stage(lines: list[str], stage: Callable[[str], object], repeat: int) -> float:
+    """Return the best time, out of `repeat`, to run a stage over every line."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for line in lines:
+            stage(line)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def allocated_per_line(lines: list[str], stage: Callable[[str], object]) -> float:
+    tracemalloc.start()
+    try:
+        total = 0
+        for line in lines:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            stage(line)
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / len(lines)
+
+
+def benchmark(lines: list[str], repeat: int) -> dict[str, Any]:
+    results = dict[str, Any]()
+    with TemporaryDirectory() as directory:
+        console = create_console(Path(directory))
+        aliases = console.config.expanded_aliases
+        tokens = {line: tokenize(line) for line in lines}
+        expanded = {
+            line: expand_aliases(line_tokens, aliases)
+            for line, line_tokens in tokens.items()
+            if not isinstance(line_tokens, Exception)
+        }
+
+        def expand(line: str) -> object:
+            if isinstance(line_tokens := tokens[line], Exception):
+                return line_tokens
+            return expand_aliases(line_tokens, aliases)
+
+        def parse(line: str) -> object:
+            if (line_tokens := expanded.get(line)) is None:
+                return None
+            return parse_commands(group_tokens(line_tokens))
+
+        def interpret(line: str) -> object:
+            return console.interpret_command(line)
+
+        def interpret_uncached(line: str) -> object:
+            console.parse_cache.clear()
+            return console.interpret_command(line)
+
+        stages: dict[str, Callable[[str], object]] = {
+            "tokenize": tokenize,
+            "expand_aliases": expand,
+            "parse_commands": parse,
+            "interpret": interpret_uncached,
+            "interpret_cached": interpret,
+        }
+
+        token = CURRENT_SESSION.set(console)
+        try:
+            for line in lines:  # imports the commands, which shouldn't be timed
+                interpret(line)
+            for name, stage in stages.items():
+                elapsed = time_stage(lines, stage, repeat)
+                results[name] = {
+                    "throughput": len(lines) / elapsed,
+                    "per_line": elapsed / len(lines) * 1e6,
+                }
+            for name in ("interpret", "interpret_cached"):
+                results[name]["allocated"] = allocated_per_line(lines, stages[name])
+        finally:
+            CURRENT_SESSION.reset(token)
+    return results
+
+
+def check_line(line: str, aliases: dict[str, list[Token]]) -> str | None:
+    """Parse a line, returning the traceback if anything but a parse error is raised."""
+    try:
+        commands = parse_string_command(line, aliases)
+        if not isinstance(commands, Exception):
+            for command in commands:
+                if not isinstance(command, Command):
+                    raise TypeError(f"{command!r} isn't a command")
+                copy_command(command)
+        ParseCache().parse(line, aliases, 0)
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        return "".join(format_exception(err))
+    return None
+
+
+def fuzz(lines: Iterable[str], save: bool) -> int:
+    config = Config(Path("config.json"), record_history=False, aliases=ALIASES)
+    crashes = dict[str, str]()
+    checked = 0
+    for line in lines:
+        checked += 1
+        if line not in crashes and (trace := check_line(line, config.expanded_aliases)):
+            crashes[line] = trace
+
+    for line, trace in crashes.items():
+        print(f"{line!r} crashed the parser\n{trace}", file=sys.stderr)
+    print(f"fuzz: {checked} lines, {len(crashes)} crashed the parser")
+
+    known = set(read_corpus("crashes.txt"))
+    if save and (new := [line for line in crashes if line not in known]):
+        with open(CORPUS / "crashes.txt", "a", encoding="utf8") as file:
+            file.writelines(f"{line}\n" for line in new if "\n" not in line)
+        print(f"added {len(new)} lines to {CORPUS / 'crashes.txt'}")
+    return len(crashes)
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.throughput")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="runs per stage, the best is kept"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="save the results as json"
+    )
+    parser.add_argument(
+        "-c",
+        "--compare",
+        type=Path,
+        default=None,
+        help="compare the results against those of an earlier run",
+    )
+    parser.add_argument(
+        "-f", "--fuzz", action="store_true", help="fuzz the parser instead"
+    )
+    parser.add_argument(
+        "-l", "--lines", type=int, default=100_000, help="random lines to fuzz with"
+    )
+    parser.add_argument(
+        "-s", "--seed", type=int, default=0, help="seed of the random lines"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="add lines which crash to the corpus"
+    )
+    arguments = parser.parse_args()
+
+    corpus = read_corpus("commands.txt") + generated_lines()
+    if arguments.fuzz:
+        lines = corpus + read_corpus("crashes.txt")
+        lines += fuzz_lines(lines, arguments.lines, arguments.seed)
+        sys.exit(1 if fuzz(lines, arguments.save) else 0)
+
+    results = benchmark(corpus, arguments.repeat)
+    print(f"{'stage':<18}{'lines/s':>12}{'us/line':>10}{'KiB/line':>10}")
+    for name, result in results.items():
+        allocated = result.get("allocated")
+        print(
+            f"{name:<18}{result['throughput']:>12,.0f}{result['per_line']:>10.1f}"
+            f"{'' if allocated is None else f'{allocated / 1024:.1f}':>10}"
+        )
+
+    settings = {"lines": len(corpus), "repeat": arguments.repeat}
+    if arguments.output is not None:
+        write_results(arguments.output, "throughput", settings, results)
+    if arguments.compare is not None:
+        print()
+        compare_results(
+            load_results(arguments.compare),
+            {"settings": settings, "results": results},
+            threshold=10,
+        )
+
+
+if __name__ == "__main__":
+    main()
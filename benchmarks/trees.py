@@ -0,0 +1,126 @@
+"""
+trees.py
+
+Deterministic generators of synthetic directory trees for the benchmarks, every tree
+is built from a fixed seed so that two runs, e.g. before & after a change, always
+operate on identical trees.
+
+Usage: `$ python -m benchmarks.trees [--scale SCALE] DIRECTORY` to generate every tree
+in a directory for inspection.
+"""
+
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+from random import Random
+
+SEED = 0x504F5348  # "POSH"
+WORDS = (
+    "the quick brown fox jumps over the lazy dog lorem ipsum dolor sit amet "
+    "consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore"
+).split()
+FILES_PER_DIRECTORY = 1000
+
+
+def scaled(count: int, scale: float) -> int:
+    return max(1, round(count * scale))
+
+
+def random_text(random: Random, size: int) -> str:
+    lines = list[str]()
+    written = 0
+    while written < size:
+        line = " ".join(random.choices(WORDS, k=random.randint(1, 16))) + "\n"
+        lines.append(line)
+        written += len(line)
+    return "".join(lines)[:size]
+
+
+def write_text(path: Path, random: Random, size: int) -> None:
+    # huge files repeat a block of random lines, generating every line is too slow
+    block = random_text(random, min(size, 1024 * 1024))
+    with open(path, "w", encoding="utf8") as file:
+        written = 0
+        while written < size:
+            written += file.write(block[: size - written])
+
+
+def wide(root: Path, scale: float = 1) -> None:
+    """A single directory of 100k empty files."""
+    root.mkdir()
+    for index in range(scaled(100_000, scale)):
+        (root / f"file_{index:06}.txt").touch()
+
+
+def deep(root: Path, scale: float = 1) -> None:
+    """A chain of 200 nested directories, with a few small files at every level."""
+    random = Random(SEED)
+    directory = root
+    for level in range(scaled(200, scale)):
+        directory.mkdir()
+        for index in range(5):
+            (directory / f"file_{index}.txt").write_text(
+                random_text(random, random.randint(0, 512)), encoding="utf8"
+            )
+        directory /= f"level_{level:03}"
+
+
+def small(root: Path, scale: float = 1) -> None:
+    """20k small text files of up to 4 KiB, spread over directories of 1000 files."""
+    random = Random(SEED)
+    root.mkdir()
+    for index in range(scaled(20_000, scale)):
+        directory = root / f"dir_{index // FILES_PER_DIRECTORY:03}"
+        if index % FILES_PER_DIRECTORY == 0:
+            directory.mkdir()
+        (directory / f"file_{index:05}.txt").write_text(
+            random_text(random, random.randint(0, 4096)), encoding="utf8"
+        )
+
+
+def huge(root: Path, scale: float = 1) -> None:
+    """Three text files of 256 MiB."""
+    random = Random(SEED)
+    root.mkdir()
+    for index in range(3):
+        write_text(root / f"file_{index}.txt", random, scaled(256 * 1024 * 1024, scale))
+
+
+def hidden(root: Path, scale: float = 1) -> None:
+    """100 directories of 100 small files, where every other directory & file is hidden."""
+    random = Random(SEED)
+    root.mkdir()
+    for index in range(scaled(100, scale)):
+        directory = root / f"{'.' if index % 2 else ''}dir_{index:03}"
+        directory.mkdir()
+        for file_index in range(100):
+            name = f"{'.' if file_index % 2 else ''}file_{file_index:03}.txt"
+            (directory / name).write_text(
+                random_text(random, random.randint(0, 256)), encoding="utf8"
+            )
+
+
+TREES: dict[str, Callable[[Path, float], None]] = {
+    "wide": wide,
+    "deep": deep,
+    "small": small,
+    "huge": huge,
+    "hidden": hidden,
+}
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="benchmarks.trees")
+    parser.add_argument(
+        "-s", "--scale", type=float, default=1, help="multiplier of the tree sizes"
+    )
+    parser.add_argument("directory", type=Path, help="directory to generate them in")
+    arguments = parser.parse_args()
+
+    for name, generate in TREES.items():
+        print(f"generating {name}...", flush=True)
+        generate(arguments.directory / name, arguments.scale)
+
+
+if __name__ == "__main__":
+    main()
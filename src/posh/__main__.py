@@ -1,13 +1,15 @@
 from argparse import ArgumentParser
 from pathlib import Path
+from sys import exit as sys_exit
+from sys import stdin
 
 from loguru import logger
 
 from . import __version__
 from .colours import FgColour, add_colours
 from .commands.file_system.path_utils import parse_path
-from .interpreter import Console, FileIntepreter
-from .interpreter.interpreter import Interpreter
+from .interpreter import BatchInterpreter, Console, FileIntepreter
+from .interpreter.interpreter import ShellInterpreter
 
 
 @logger.catch
@@ -29,7 +31,36 @@ def main() -> None:
         help="print the interpreter version and exit",
     )
     parser.add_mutually_exclusive_group().add_argument(
-        "file_path", nargs="?", default=None, type=str, help="file to interpret"
+        "file_path",
+        nargs="?",
+        default=None,
+        type=str,
+        help="file to interpret, or '-' to read commands from stdin",
+    )
+    parser.add_argument(
+        "-c",
+        "--command",
+        type=str,
+        default=None,
+        help="command(s) to interpret, without starting the interactive shell",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        default=False,
+        help="only check the syntax of the file, without running it",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        default=False,
+        help="serve sessions from `posh.client` over a unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="path to the socket to serve on, see `posh.client`",
     )
     parser.add_argument(
         "-d",
@@ -45,6 +76,12 @@ def main() -> None:
         print(__version__)
         return
 
+    if arguments.check and arguments.file_path in (None, "-"):
+        parser.error("--check requires a file to check")
+
+    if arguments.command is not None and arguments.file_path is not None:
+        parser.error("-c can't be used with a file")
+
     starting_directory: str | Path = arguments.starting_directory
     if not isinstance(starting_directory, Path):
         starting_directory = parse_path(starting_directory, Path.cwd())
@@ -58,8 +95,26 @@ def main() -> None:
             )
             return
 
-    interpreter: Interpreter
-    if arguments.file_path is not None:
+    interpreter: ShellInterpreter
+    if arguments.serve:
+        # imported here since unix sockets aren't available on every platform
+        from .client import default_socket_path
+        from .interpreter.server import ServerInterpreter
+
+        socket_path = (
+            default_socket_path()
+            if arguments.socket is None
+            else parse_path(arguments.socket, Path.cwd())
+        )
+        interpreter = ServerInterpreter(starting_directory, socket_path)
+    elif arguments.command is not None or arguments.file_path == "-":
+        interpreter = BatchInterpreter(
+            starting_directory,
+            stdin if arguments.command is None else arguments.command.splitlines(),
+        )
+        interpreter.main()
+        sys_exit(interpreter.exit_code)
+    elif arguments.file_path is not None:
         file_path = parse_path(arguments.file_path, Path.cwd())
 
         if not file_path.is_file():
@@ -72,6 +127,8 @@ def main() -> None:
             return
 
         interpreter = FileIntepreter(starting_directory, file_path)
+        if arguments.check:
+            sys_exit(0 if interpreter.check() else 1)
     else:
         print(
             f"posh {__version__}  Copyright (C) 2023  Eris\n"
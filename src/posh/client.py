@@ -0,0 +1,150 @@
+"""
+client.py
+
+Thin client for a posh server started with `$ python -m posh --serve`. It only depends
+on the standard library so that each invocation starts as quickly as possible.
+
+Usage: `$ python -m posh.client [-s SOCKET] [-d DIRECTORY] [-c COMMAND]`, without `-c`
+commands are read from stdin, one per line.
+
+Protocol: both sides exchange JSON objects, one per line. The client sends
+`{"cwd": str, "colours": bool}` followed by a `{"line": str}` per command line, and
+shuts down its side of the socket once done. The server answers with `{"stdout": str}`
+& `{"stderr": str}` as output is produced, and `{"exit": int}` once the session ends.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from stat import S_ISDIR
+from tempfile import gettempdir
+from threading import Thread
+from typing import IO, Any, Iterable
+
+
+def socket_directory() -> Path:
+    """
+    Directory of the default socket, the runtime directory is private to the user
+    while the temporary directory is shared, so there it's a directory of their own.
+    """
+    if directory := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(directory)
+
+    user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return Path(gettempdir(), f"posh-{user}")
+
+
+def default_socket_path() -> Path:
+    if (path := os.environ.get("POSH_SOCKET")) is not None:
+        return Path(path)
+
+    return socket_directory() / "posh.sock"
+
+
+def check_owner(path: Path) -> None:
+    """Raise `PermissionError` if the path is owned by another user."""
+    if hasattr(os, "getuid") and (owner := path.lstat().st_uid) != os.getuid():
+        raise PermissionError(f"{str(path)!r} is owned by another user ({owner})")
+
+
+def make_private_directory(directory: Path) -> None:
+    """
+    Create a directory which only the current user can access, raising
+    `PermissionError` if it already exists and others could replace what's in it.
+    """
+    directory.mkdir(mode=0o700, exist_ok=True)
+    check_owner(directory)
+    if not S_ISDIR((stat := directory.lstat()).st_mode) or stat.st_mode & 0o077:
+        raise PermissionError(f"{str(directory)!r} isn't a private directory")
+
+
+def encode_frame(**frame: Any) -> bytes:
+    return (json.dumps(frame) + "\n").encode("utf8")
+
+
+def send_lines(connection: socket.socket, lines: Iterable[str]) -> None:
+    try:
+        for line in lines:
+            connection.sendall(encode_frame(line=line))
+        connection.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass  # the server ended the session, e.g. with `exit`
+
+
+def receive_frames(file: IO[bytes]) -> int:
+    """Print the output of the session as it arrives, returning its exit code."""
+    for raw_frame in file:
+        frame = json.loads(raw_frame)
+        if (stdout := frame.get("stdout")) is not None:
+            sys.stdout.write(stdout)
+            sys.stdout.flush()
+        elif (stderr := frame.get("stderr")) is not None:
+            sys.stderr.write(stderr)
+            sys.stderr.flush()
+        elif (code := frame.get("exit")) is not None:
+            return int(code)
+
+    print("Error: the server closed the connection", file=sys.stderr)
+    return 1
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="posh.client")
+    parser.add_argument(
+        "-s",
+        "--socket",
+        type=Path,
+        default=None,
+        help="path to the socket of the server",
+    )
+    parser.add_argument(
+        "-d",
+        "--starting_directory",
+        type=Path,
+        default=Path.cwd(),
+        help="starting directory",
+    )
+    parser.add_argument(
+        "-c",
+        "--command",
+        type=str,
+        default=None,
+        help="command(s) to interpret, without it commands are read from stdin",
+    )
+    arguments = parser.parse_args()
+    socket_path: Path = arguments.socket or default_socket_path()
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        # anyone else's socket could be listening in on, or faking, the session
+        check_owner(socket_path)
+        connection.connect(str(socket_path))
+    except OSError as err:
+        print(
+            f"Error: failed to connect to {str(socket_path)!r}, {err}", file=sys.stderr
+        )
+        sys.exit(1)
+
+    with connection, connection.makefile("rb") as file:
+        connection.sendall(
+            encode_frame(
+                cwd=str(arguments.starting_directory.resolve()),
+                colours=sys.stdout.isatty(),
+            )
+        )
+
+        lines = (
+            sys.stdin if arguments.command is None else arguments.command.splitlines()
+        )
+        Thread(target=send_lines, args=(connection, lines), daemon=True).start()
+
+        sys.exit(receive_frames(file))
+
+
+if __name__ == "__main__":
+    main()
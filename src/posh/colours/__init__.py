@@ -5,6 +5,7 @@ This package contains all of the needed functions & classes for printing colours
 
 Functions:
     - `add_colours` - Function used to add colours to a string, adds the reset colour at the end.
+    - `strip_colours` - Remove all ansi escape sequences from a string.
     - `should_colourize` - Determine whether or an object should receive colourized strings.
     - `should_wrap` - Determine whether or an object should be wrapped with an AnsiToWin32 wrapper.
     - `wrap` - Return the stream wrapped in a AnsiToWin32 wrapper.
@@ -15,7 +16,13 @@ Enums:
     - `FgColour` - Foregroud text colours.
     - `BgColour` - Background text colours.
 """
-from ._colourizer import add_colours, should_colourize, should_wrap, wrap
+from ._colourizer import (
+    add_colours,
+    should_colourize,
+    should_wrap,
+    strip_colours,
+    wrap,
+)
 from ._colours import BgColour, Colour, FgColour, Meta
 
 __version__ = "1.0.0"
@@ -24,6 +31,7 @@ __all__ = (
     "should_wrap",
     "wrap",
     "add_colours",
+    "strip_colours",
     "Colour",
     "Meta",
     "BgColour",
@@ -5,12 +5,14 @@ This file contains the functions required to prepare strings with colours for th
 
 Functions:
     - `add_colours` - Add colours a to strings and return the formatted string.
+    - `strip_colours` - Remove all ansi escape sequences from a string.
     - `should_colourize` - Check to see if an object should receive colourized strings.
     - `should_wrap` - Check to see if an object should be wrapped in a AnsiToWin32 converter.
     - `wrap` - Wrap a stream with a AnsiToWin32 wrapper.
 """
 
 import os
+import re
 import sys
 from typing import TextIO, TypeGuard
 
@@ -19,6 +21,8 @@ from colorama.win32 import winapi_test
 
 from ._colours import Colour, Meta
 
+_ANSI_ESCAPES = re.compile(r"\033(?:\[[0-?]*[ -/]*[@-~]|[@-Z\\-_a-z])")
+
 
 def _get_colours(*colours: Colour) -> str:
     """
@@ -50,6 +54,21 @@ def add_colours(string: str, *colours: Colour, end: Colour | None = Meta.RESET)
     return _get_colours(*colours) + string + _get_colours(end)
 
 
+def strip_colours(string: str) -> str:
+    """
+    Remove all ansi escape sequences, such as the ones added by `add_colours`, from a
+    string.
+
+    Parameters:
+        - `string: str` - String to remove the escape sequences from.
+
+    Returns: `str` - String without any escape sequences.
+    """
+    if "\033" not in string:
+        return string
+    return _ANSI_ESCAPES.sub("", string)
+
+
 def should_colourize(stream: object) -> bool:
     """
     Check to see if an object should receive colourized strings.
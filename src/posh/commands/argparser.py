@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import sys
 from argparse import ArgumentError, ArgumentParser, ArgumentTypeError, Namespace
-from typing import TYPE_CHECKING, Self, Sequence
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Self, Sequence
 
 if TYPE_CHECKING:
+    from ..interpreter import Interpreter
     from .command import Executable
 
+# the console whose arguments are being parsed, usage & help messages go to its streams
+_console: ContextVar[Interpreter | None] = ContextVar("console", default=None)
+
 
 class InlineArgumentParser(ArgumentParser):
     @classmethod
@@ -21,22 +27,36 @@ class InlineArgumentParser(ArgumentParser):
         )
         return parser
 
-    def parse_arguments(self, args: Sequence[str]) -> Namespace | None:
+    def _print_message(self, message: str, file: Any = None) -> None:
+        if message and (console := _console.get()) is not None:
+            (console.stderr if file is sys.stderr else console.stdout).write(message)
+            return
+        super()._print_message(message, file)
+
+    def parse_arguments(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> Namespace | None:
+        token = _console.set(console)
         try:
             return self.parse_args(args)
         except ArgumentError as e:
-            print(f"Error: {e}")
+            self._print_message(f"Error: {e}\n", sys.stdout)
         except SystemExit:
             pass
+        finally:
+            _console.reset(token)
         return None
 
     def parse_known_arguments(
-        self, args: Sequence[str]
+        self, console: Interpreter, args: Sequence[str]
     ) -> tuple[Namespace, list[str]] | None:
+        token = _console.set(console)
         try:
             return self.parse_known_args(args)
         except ArgumentTypeError as e:
-            print(f"Error: {e}")
+            self._print_message(f"Error: {e}\n", sys.stdout)
         except SystemExit:
             pass
+        finally:
+            _console.reset(token)
         return None
@@ -2,15 +2,22 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, ClassVar
 
 if TYPE_CHECKING:
+    from subprocess import Popen
+
     from ..interpreter import Interpreter
 
 
 class Executable(ABC):
     __slots__ = ()
 
+    # external commands run another process, in pipelines they're connected with os pipes
+    external: ClassVar[bool] = False
+    # spawnable commands start a process of their own when run in the background
+    spawnable: ClassVar[bool] = False
+
     @classmethod
     @abstractmethod
     def command(cls) -> str:
@@ -28,3 +35,21 @@ class Executable(ABC):
     @abstractmethod
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
         ...
+
+    def records(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> list[Any] | Exception:
+        """
+        Return what the command would print as a list of records, e.g. `PathRecord`,
+        instead of printing it.
+        """
+        return NotImplementedError(f"Error: {self.command()!r} doesn't return records")
+
+    def spawn(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> Popen[str] | Exception | None:
+        """
+        Start the process of the command without waiting for it, used to run it in the
+        background. Only called on commands which are `spawnable`.
+        """
+        return NotImplementedError(f"Error: {self.command()!r} doesn't start a process")
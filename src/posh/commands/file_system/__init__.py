@@ -1,12 +1,37 @@
-from .cat import Cat
-from .cd import Cd
-from .cp import Cp
-from .ls import Ls
-from .mkdir import Mkdir
-from .mv import Mv
-from .pwd import Pwd
-from .rm import Rm
-from .rmdir import Rmdir
-from .touch import Touch
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cat import Cat
+    from .cd import Cd
+    from .cp import Cp
+    from .ls import Ls
+    from .mkdir import Mkdir
+    from .mv import Mv
+    from .pwd import Pwd
+    from .rm import Rm
+    from .rmdir import Rmdir
+    from .touch import Touch
 
 __all__ = "Cd", "Cat", "Ls", "Pwd", "Touch", "Rm", "Rmdir", "Mkdir", "Cp", "Mv"
+
+# the command modules are imported on first access so that importing one of them
+# doesn't pull in the dependencies of all the others
+_MODULES = {
+    "Cat": ".cat",
+    "Cd": ".cd",
+    "Cp": ".cp",
+    "Ls": ".ls",
+    "Mkdir": ".mkdir",
+    "Mv": ".mv",
+    "Pwd": ".pwd",
+    "Rm": ".rm",
+    "Rmdir": ".rmdir",
+    "Touch": ".touch",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _MODULES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
@@ -1,22 +1,54 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
+from functools import partial
+from io import TextIOBase
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from ...interpreter.streams import send_file
 from ..argparser import InlineArgumentParser
 from ..command import Executable
-from .path_utils import parse_path
+from .path_utils import open_lines, parse_path
 
 if TYPE_CHECKING:
     from ...interpreter import Interpreter
+    from ...interpreter.streams import OutputStream
+
+BLOCK_SIZE = 64 * 1024  # characters read from a file at a time
+LINES_PER_BLOCK = 1024  # lines from stdin joined into a single write
+
+
+def read_blocks(lines: Iterable[str]) -> Iterator[str]:
+    # files are read in fixed size blocks, streams line by line since a read of a
+    # whole block could wait on a slow writer
+    if isinstance(lines, TextIOBase) and not lines.isatty() and lines.seekable():
+        return iter(partial(lines.read, BLOCK_SIZE), "")
+
+    iterator = iter(lines)
+    return iter(lambda: "".join(islice(iterator, LINES_PER_BLOCK)), "")
+
+
+def copy_lines(lines: Iterable[str], stdout: OutputStream) -> None:
+    """Copy lines unchanged in large blocks, making sure the output ends in a LF."""
+    last_block = ""
+    for block in read_blocks(lines):
+        stdout.write(block)
+        last_block = block
+
+    if last_block and not last_block.endswith("\n"):
+        stdout.write("\n")
 
 
 class Cat(Executable):
     def __init__(self) -> None:
         self.parser = InlineArgumentParser.from_command(self)
         self.parser.add_argument(
-            "paths", type=str, nargs="+", help="path(s) to the file(s)"
+            "paths",
+            type=str,
+            nargs="*",
+            help="path(s) to the file(s), with no path or '-' read from stdin",
         )
         self.parser.add_argument(
             "-n", "--number", action="store_true", help="show line numbers"
@@ -64,11 +96,15 @@ class Cat(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
-        paths = list[Path]()
-        for path_string in options.paths:
+        paths = list[Path | None]()  # None is stdin
+        for path_string in options.paths or ["-"]:
+            if path_string == "-":
+                paths.append(None)
+                continue
+
             path = parse_path(path_string, console.cwd)
 
             if not path.is_absolute():
@@ -82,19 +118,34 @@ class Cat(Executable):
 
             paths.append(path)
 
+        formatted = (
+            options.number
+            or options.number_nonblank
+            or options.show_ends
+            or options.show_tabs
+            or options.show_nonprinting
+            or options.squeeze_blank
+        )
+
         line_number = 1  # maintains count between multiple files
-        for path in paths:
+        for source in paths:
             try:
-                with open(path, "rb") as file:
+                # files redirected to another file are copied without decoding them
+                if (
+                    not formatted
+                    and source is not None
+                    and send_file(source, console.stdout)
+                ):
+                    continue
+
+                with open_lines(source, console) as lines:
+                    if not formatted:
+                        copy_lines(lines, console.stdout)
+                        continue
+
                     previous_line_blank = False
 
-                    for bytes_line in file:
-                        try:
-                            line = bytes_line.decode("utf8")
-                        except UnicodeDecodeError as err:
-                            return Exception(
-                                f"Error: failed to decode line {line}, {err}"
-                            )
+                    for line in lines:
 
                         # suppress multiple blank lines
                         if options.squeeze_blank and line.rstrip("\n") == "":
@@ -139,7 +190,12 @@ class Cat(Executable):
                         if options.show_ends and line.rstrip("\n") != line:
                             line = line.rstrip("\n") + "$\n"
 
-                        print(line.rstrip("\n"))
+                        print(line.rstrip("\n"), file=console.stdout)
+            except UnicodeDecodeError as err:
+                name = "stdin" if source is None else repr(source.as_posix())
+                return Exception(f"Error: failed to decode {name}, {err}")
+            except BrokenPipeError:
+                raise  # the next command in the pipeline stopped reading
             except OSError as err:
                 return OSError(f"Error: {err}")
 
@@ -28,7 +28,7 @@ class Cd(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | OSError:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         path = parse_path(options.path, console.cwd)
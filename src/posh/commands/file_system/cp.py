@@ -85,7 +85,7 @@ class Cp(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         destination = parse_path(options.destination, console.cwd)
@@ -123,7 +123,7 @@ class Cp(Executable):
                     continue
 
                 if options.backup:
-                    backup(dest_path, console.config.colours.errors)
+                    backup(dest_path, console.config.colours.errors, console.stderr)
 
                 if options.force or (
                     options.interactive
@@ -131,7 +131,10 @@ class Cp(Executable):
                     == "y"
                 ):
                     if (err := remove(dest_path)) is not None:
-                        print(add_colours(str(err), console.config.colours.errors))
+                        print(
+                            add_colours(str(err), console.config.colours.errors),
+                            file=console.stderr,
+                        )
                 else:
                     return FileExistsError(
                         f"Error: {dest_path.as_posix()!r} exists, "
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from argparse import Namespace
+from collections.abc import Iterator, Sequence
 from functools import partial
 from os import listdir, walk
 from os.path import getsize
@@ -13,6 +14,8 @@ from natsort import natsorted
 from ...colours import FgColour, add_colours
 from ..argparser import InlineArgumentParser
 from ..command import Executable
+from ..general.print_utils import get_readable_size
+from ..records import PathRecord
 from ..regexp import compile_regexp
 from .path_utils import check_ignore, is_hidden, parse_path
 
@@ -20,37 +23,14 @@ if TYPE_CHECKING:
     from ...interpreter import Interpreter
 
 
-def is_int(n: float) -> bool:
-    return n % 1 == 0
-
-
-def get_readable_size(size: float, ndigits: int = 2) -> str:
-    prefixes = ("", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi", "Yi")
-    for prefix in prefixes:
-        if size < 1024:
-            return f"{int(size) if is_int(size) else round(size, ndigits)}{prefix}B"
-
-        size /= 1024
-
-    return f"{round(size, ndigits)}{prefixes[-1]}B"
-
-
 def get_format_string(
     path: Path,
-    show_all: bool,
     show_type: bool,
     show_size: bool,
     human_readable: bool,
-    ignore: list[str],
-    ignore_patterns: list[Pattern[str]],
     directory_style: FgColour,
     file_style: FgColour,
 ) -> str:
-    if check_ignore(path, ignore, ignore_patterns) or (
-        is_hidden(path) and not show_all
-    ):
-        return ""
-
     output = ""
     if show_type:
         if path.is_file():
@@ -71,6 +51,58 @@ def get_format_string(
     return output + "\n"
 
 
+def list_paths(
+    path: Path,
+    show_all: bool,
+    recursive: bool,
+    ignore: list[str],
+    ignore_patterns: list[Pattern[str]],
+) -> Iterator[tuple[Path, list[Path]]]:
+    """
+    Yield each listed directory along with the paths it contains, leaving out hidden
+    & ignored paths.
+    """
+
+    def is_listed(path: Path) -> bool:
+        return not check_ignore(path, ignore, ignore_patterns) and (
+            show_all or not is_hidden(path)
+        )
+
+    if not recursive:
+        yield path, [
+            child
+            for name in natsorted(listdir(path))
+            if is_listed(child := path / name)
+        ]
+        return
+
+    hidden_exclude = None
+    for root, dir_names, file_names in walk(path):
+        root_path = Path(root)
+        if not show_all:
+            if is_hidden(root_path):
+                # if hidden hasn't be used yet or the root isn't a child of the
+                # hidden_exclude, set the hidden exlcude to the root
+                if hidden_exclude is None or not root_path.is_relative_to(
+                    hidden_exclude
+                ):
+                    hidden_exclude = root_path
+                continue
+            # anything that is a child of a hidden directory should also be hidden
+            if hidden_exclude is not None and root_path.is_relative_to(hidden_exclude):
+                continue
+
+        # never ignore the starting path, otherwise check whether to ignore
+        if root_path != path and check_ignore(root_path, ignore, ignore_patterns):
+            continue
+
+        yield root_path, [
+            child
+            for name in (*dir_names, *file_names)
+            if is_listed(child := Path(root, name))
+        ]
+
+
 class Ls(Executable):
     def __init__(self) -> None:
         self.parser = InlineArgumentParser.from_command(self)
@@ -135,12 +167,13 @@ class Ls(Executable):
     def help(self) -> str:
         return self.parser.format_help()
 
-    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+    def parse_options(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> tuple[Namespace, Path, list[Pattern[str]]] | Exception | None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
-        parsed_string_path = parse_path(options.path, console.cwd)
-        path = parsed_string_path
+        path = parse_path(options.path, console.cwd)
 
         if not path.is_absolute():
             path = console.cwd / path
@@ -158,66 +191,75 @@ class Ls(Executable):
                 return Exception(f"Error: {pattern!r} failied to compile, {compiled}")
             compiled_ignore_patterns.append(compiled)
 
+        return options, path, compiled_ignore_patterns
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (parsed := self.parse_options(console, args)) is None or isinstance(
+            parsed, Exception
+        ):
+            return parsed
+        options, path, compiled_ignore_patterns = parsed
+
         format_path = partial(
             get_format_string,
-            show_all=options.all,
             show_type=options.show_type,
             show_size=options.show_size,
             human_readable=options.human_readable,
-            ignore=options.ignore,
-            ignore_patterns=compiled_ignore_patterns,
             directory_style=console.config.colours.directory_path,
             file_style=console.config.colours.file_path,
         )
+        listing = list_paths(
+            path,
+            options.all,
+            options.recursive,
+            options.ignore,
+            compiled_ignore_patterns,
+        )
 
-        if options.recursive:
-            # this preserves the relative path when printing
-            # exg: ~/foo/bar => ./food/bar
-            if path == console.cwd and options.path == ".":
-                relative_root = "."
-            else:
-                relative_root = parsed_string_path.as_posix()
-
-            hidden_exclude = None
-            for root, dir_names, file_names in walk(path):
-                root_path = Path(root)
-                if not options.all:
-                    if is_hidden(root_path):
-                        # if hidden hasn't be used yet or the root isn't a child of the
-                        # hidden_exclude, set the hidden exlcude to the root
-                        if hidden_exclude is None or not root_path.is_relative_to(
-                            hidden_exclude
-                        ):
-                            hidden_exclude = root_path
-                        continue
-                    # anything that is a child of a hidden directory should also be hidden
-                    if hidden_exclude is not None and root_path.is_relative_to(
-                        hidden_exclude
-                    ):
-                        continue
-
-                # never ignore the starting path, otherwise check whether to ignore
-                if root_path != path and check_ignore(
-                    root_path, options.ignore, compiled_ignore_patterns
-                ):
-                    continue
-
-                # the relative root is either the path to the directory of a "." and since
-                # Path(".").parts == (), it will handle relative as well as aboslute paths
-                path_string = relative_root + "".join(
-                    f"/{part}" for part in root_path.relative_to(path).parts
-                )
-                print(f"{repr(path_string) if ' ' in path_string else path_string}:")
-
-                for dir_name in dir_names:
-                    print(format_path(Path(root, dir_name)), end="")
-
-                for file_name in file_names:
-                    print(format_path(Path(root, file_name)), end="")
+        if not options.recursive:
+            for _, paths in listing:
+                console.stdout.write("".join(format_path(child) for child in paths))
+            return None
 
-                print()
+        # this preserves the relative path when printing
+        # exg: ~/foo/bar => ./food/bar
+        if path == console.cwd and options.path == ".":
+            relative_root = "."
         else:
-            for file in natsorted(listdir(path)):
-                print(format_path(path / file), end="")
+            relative_root = parse_path(options.path, console.cwd).as_posix()
+
+        for root_path, paths in listing:
+            # the relative root is either the path to the directory of a "." and since
+            # Path(".").parts == (), it will handle relative as well as aboslute paths
+            path_string = relative_root + "".join(
+                f"/{part}" for part in root_path.relative_to(path).parts
+            )
+            # each directory is written as a single block
+            console.stdout.write(
+                f"{repr(path_string) if ' ' in path_string else path_string}:\n"
+                + "".join(format_path(child) for child in paths)
+                + "\n"
+            )
 
         return None
+
+    def records(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> list[PathRecord] | Exception:
+        if (parsed := self.parse_options(console, args)) is None:
+            return ValueError(f"Error: invalid arguments to {self.command()}")
+        if isinstance(parsed, Exception):
+            return parsed
+        options, path, compiled_ignore_patterns = parsed
+
+        return [
+            PathRecord.from_path(child)
+            for _, paths in list_paths(
+                path,
+                options.all,
+                options.recursive,
+                options.ignore,
+                compiled_ignore_patterns,
+            )
+            for child in paths
+        ]
@@ -43,7 +43,7 @@ class Mkdir(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         for path in map(partial(parse_path, cwd=console.cwd), options.paths):
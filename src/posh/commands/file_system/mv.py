@@ -66,7 +66,7 @@ class Mv(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         destination = parse_path(options.destination, console.cwd)
@@ -112,7 +112,7 @@ class Mv(Executable):
                     continue
 
                 if options.backup:
-                    backup(dest_path, console.config.colours.errors)
+                    backup(dest_path, console.config.colours.errors, console.stderr)
                 elif (
                     not options.force and not options.update and not options.interactive
                 ):
@@ -1,13 +1,22 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from functools import cache
 from os import stat
 from pathlib import Path
 from re import Pattern
 from shutil import copy2, copytree
 from stat import FILE_ATTRIBUTE_HIDDEN
-from sys import platform
+from sys import platform, stdin
+from typing import TYPE_CHECKING
 
 from ...colours import FgColour, add_colours
 
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+    from ...interpreter.streams import OutputStream
+
 
 @cache
 def parse_path(path: str | Path, cwd: Path) -> Path:
@@ -57,7 +66,7 @@ def check_ignore(
     )
 
 
-def backup(path: Path, err_style: FgColour) -> None:
+def backup(path: Path, err_style: FgColour, file: OutputStream | None = None) -> None:
     backup_path = Path(f"{path.as_posix()}.backup")
 
     i = 1
@@ -70,4 +79,21 @@ def backup(path: Path, err_style: FgColour) -> None:
         else:
             copy2(path, backup_path)
     except OSError as err:
-        print(add_colours(f"Error: failed to create backup, {err}", err_style))
+        print(
+            add_colours(f"Error: failed to create backup, {err}", err_style), file=file
+        )
+
+
+@contextmanager
+def open_lines(path: Path | None, console: Interpreter) -> Iterator[Iterable[str]]:
+    """
+    Open a file as an iterable of lines, or when the path is None use the stdin
+    of the console, keeping the original line endings.
+    """
+    if path is not None:
+        with open(path, "r", encoding="utf8", newline="") as file:
+            yield file
+    elif console.stdin is not None:
+        yield console.stdin
+    else:
+        yield stdin
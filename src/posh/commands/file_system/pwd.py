@@ -27,12 +27,13 @@ class Pwd(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None:
-        if self.parser.parse_arguments(args) is None:
+        if self.parser.parse_arguments(console, args) is None:
             return
 
         print(
             add_colours(
                 f"{string!r}" if " " in (string := console.cwd.as_posix()) else string,
                 console.config.colours.directory_path,
-            )
+            ),
+            file=console.stdout,
         )
@@ -15,6 +15,7 @@ from .path_utils import check_ignore, parse_path
 
 if TYPE_CHECKING:
     from ...interpreter import Interpreter
+    from ...interpreter.streams import OutputStream
 
 
 def remove_path(
@@ -48,20 +49,23 @@ def remove_path(
 
 
 def remove_recursively(
-    path: Path, remover: Callable[[Path], None | Exception], err_style: FgColour
+    path: Path,
+    remover: Callable[[Path], None | Exception],
+    err_style: FgColour,
+    file: OutputStream | None = None,
 ) -> None:
     for root, dirs, files in walk(path, topdown=False):
         root_path = Path(root)
         for name in dirs:
             if (err := remover(root_path / name)) is not None:
-                print(add_colours(str(err), err_style))
+                print(add_colours(str(err), err_style), file=file)
         for name in files:
             if (err := remover(root_path / name)) is not None:
-                print(add_colours(str(err), err_style))
+                print(add_colours(str(err), err_style), file=file)
 
     # walk doesn't include exclusively the root path
     if (err := remover(path)) is not None:
-        print(add_colours(str(err), err_style))
+        print(add_colours(str(err), err_style), file=file)
 
 
 def count_path_objs(path: Path) -> tuple[int, int]:
@@ -120,7 +124,7 @@ class Rm(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         paths = list[Path]()
@@ -168,7 +172,9 @@ class Rm(Executable):
             if path.is_dir():
                 if options.recursive:
                     if options.force or options.interactive:
-                        remove_recursively(path, remove, console.config.colours.errors)
+                        remove_recursively(
+                            path, remove, console.config.colours.errors, console.stderr
+                        )
                         continue
 
                     if sum((count := count_path_objs(path))) > 3:
@@ -179,7 +185,9 @@ class Rm(Executable):
                         if confirmation.lower() != "y":
                             continue
 
-                    remove_recursively(path, remove, console.config.colours.errors)
+                    remove_recursively(
+                        path, remove, console.config.colours.errors, console.stderr
+                    )
                 elif options.dir:
                     if ignore(path):
                         continue
@@ -38,7 +38,7 @@ class Touch(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         for path in map(partial(parse_path, cwd=console.cwd), options.paths):
@@ -51,7 +51,8 @@ class Touch(Executable):
                         f"Error: {path.as_posix()!r} already exists, "
                         "use -f, --force to overwrite it.",
                         console.config.colours.errors,
-                    )
+                    ),
+                    file=console.stderr,
                 )
                 continue
 
@@ -1,9 +1,35 @@
-from .alias import Alias
-from .clear import Clear
-from .config import Config
-from .exit import Exit
-from .help import Help
-from .history import History
-from .license import License
-
-__all__ = "Clear", "Exit", "Help", "History", "Config", "Alias", "License"
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .alias import Alias
+    from .clear import Clear
+    from .config import Config
+    from .exit import Exit
+    from .help import Help
+    from .history import History
+    from .license import License
+    from .profile import Profile
+    from .time import Time
+
+__all__ = "Clear", "Exit", "Help", "History", "Config", "Alias", "License", "Time", "Profile"
+
+# the command modules are imported on first access so that importing one of them
+# doesn't pull in the dependencies of all the others
+_MODULES = {
+    "Alias": ".alias",
+    "Clear": ".clear",
+    "Config": ".config",
+    "Exit": ".exit",
+    "Help": ".help",
+    "History": ".history",
+    "License": ".license",
+    "Profile": ".profile",
+    "Time": ".time",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _MODULES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
+from ...interpreter.lexer import join_tokens
 from ..argparser import InlineArgumentParser
 from ..command import Executable
 from .print_utils import print_dict
@@ -45,35 +46,34 @@ class Alias(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         if options.print:
-            print("Aliases:")
+            print("Aliases:", file=console.stdout)
             print_dict(
                 console.config.aliases,
                 format_key=repr,
-                format_val=lambda args: repr(" ".join(args)),
+                format_val=lambda tokens: repr(join_tokens(tokens)),
                 seperator=" -> ",
                 depth=1,
+                file=console.stdout,
             )
         elif options.save:
             console.config.write_to_json()
         elif options.remove is not None:
             if options.remove not in console.config.aliases:
                 return Exception(f"Error: alias {options.remove!r} does not exist")
-            console.config.aliases.pop(options.remove)
+            console.config.remove_alias(options.remove)
         else:
             if not options.alias or not options.command:
-                self.parser.print_usage()
+                self.parser.print_usage(console.stdout)
                 print(
-                    "alias: error: the following arguments are required: alias, commands"
+                    "alias: error: the following arguments are required: alias, commands",
+                    file=console.stdout,
                 )
                 return None
 
-            console.config.aliases.update(
-                console.config.parse_aliases({options.alias: options.command})
-            )
-            console.config.check_aliases()
+            return console.config.add_aliases({options.alias: options.command})
 
         return None
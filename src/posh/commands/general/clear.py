@@ -26,7 +26,7 @@ class Clear(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None:
-        if self.parser.parse_arguments(args) is None:
+        if self.parser.parse_arguments(console, args) is None:
             return
 
         print("\033c", end="")
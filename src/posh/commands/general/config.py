@@ -4,6 +4,8 @@ from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 from ...colours import FgColour, add_colours
+from ...interpreter.history_manager import FSYNC_POLICIES
+from ...interpreter.prompt import PROMPT_SEGMENTS
 from ..argparser import InlineArgumentParser
 from ..command import Executable
 from .print_utils import print_dict
@@ -75,6 +77,11 @@ class Config(Executable):
             choices=bool_str,
             help="toggle the recording of the console history",
         )
+        self.parser.add_argument(
+            "--record_stats",
+            choices=bool_str,
+            help="toggle the recording of each command's timing & resource usage",
+        )
         self.parser.add_argument(
             "--shorten_path",
             choices=bool_str,
@@ -85,6 +92,28 @@ class Config(Executable):
             type=int,
             help="length to shorten the console's cwd path to",
         )
+        self.parser.add_argument(
+            "--prompt_segments",
+            nargs="+",
+            choices=list(PROMPT_SEGMENTS),
+            help="segments to show in the prompt, in order",
+        )
+        self.parser.add_argument(
+            "--history_fsync",
+            choices=FSYNC_POLICIES,
+            help="when history is flushed to disk, never (left to the os), after every "
+            "batch of commands or at most once a second",
+        )
+        self.parser.add_argument(
+            "--history_window",
+            type=float,
+            help="seconds to wait for more commands before writing them to the history",
+        )
+        self.parser.add_argument(
+            "--history_database",
+            choices=bool_str,
+            help="toggle recording the cwd, duration & failure of commands in sqlite",
+        )
 
         colour_choices = [colour.name for colour in FgColour]
         self.parser.add_argument(
@@ -130,11 +159,11 @@ class Config(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         if all(not arg for arg in vars(options).values()):
-            self.parser.print_usage()
+            self.parser.print_usage(console.stdout)
             return None
 
         if options.show_time is not None:
@@ -146,12 +175,29 @@ class Config(Executable):
         if options.record_history is not None:
             console.config.record_history = options.record_history == "true"
 
+        if options.record_stats is not None:
+            console.config.record_stats = options.record_stats == "true"
+
         if options.shorten_path is not None:
             console.config.shorten_path = options.shorten_path == "true"
 
         if options.shortened_path_length is not None:
             console.config.shortened_path_length = options.shortened_path_length
 
+        if options.prompt_segments is not None:
+            console.config.prompt_segments = options.prompt_segments
+
+        if options.history_fsync is not None:
+            console.config.history_fsync = options.history_fsync
+
+        if options.history_window is not None:
+            if options.history_window < 0:
+                return ValueError("Error: history_window can't be negative")
+            console.config.history_window = options.history_window
+
+        if options.history_database is not None:
+            console.config.history_database = options.history_database == "true"
+
         if options.time_colour is not None:
             colour_string = options.time_colour
             colour = console.config.colours.parse_string(colour_string)
@@ -195,11 +241,11 @@ class Config(Executable):
                 console.config.colours.errors = colour
 
         if options.print:
-            print_dict(console.config.as_dict())
+            print_dict(console.config.as_dict(), file=console.stdout)
 
         if options.print_colours:
             for colour in FgColour:
-                print(add_colours(colour.name, colour))
+                print(add_colours(colour.name, colour), file=console.stdout)
 
         if options.where:
             if not console.config.path.exists():
@@ -210,7 +256,8 @@ class Config(Executable):
                 add_colours(
                     repr(path_str) if " " in path_str else path_str,
                     console.config.colours.file_path,
-                )
+                ),
+                file=console.stdout,
             )
 
         if options.reload:
@@ -226,4 +273,5 @@ class Config(Executable):
             console.config.set_defaults()
             console.config.write_to_json()
 
+        console.configure_history()
         return None
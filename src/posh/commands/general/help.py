@@ -35,19 +35,21 @@ class Help(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         if not options.cmd:
-            for cmd_string, command in sorted(
-                console.commands.items(), key=lambda cmd: cmd[0]  # sort alphabetically
-            ):
-                print(f"{cmd_string:<9}: {command.description()}\n", end="")
-        elif (command := console.commands.get(args[0])) is None:  # type: ignore
+            # descriptions come from the manifest so listing doesn't import every command
+            for cmd_string in sorted(console.commands):  # sort alphabetically
+                print(
+                    f"{cmd_string:<9}: {console.commands.description(cmd_string)}",
+                    file=console.stdout,
+                )
+        elif (executable := console.commands.instance(options.cmd)) is None:
             return Exception(
-                f"Error: unknown command {args[0]!r}",
+                f"Error: unknown command {options.cmd!r}",
             )
         else:
-            print(command().help())
+            print(executable.help(), file=console.stdout)
 
         return None
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
-from functools import cache
+from pathlib import Path
+from re import MULTILINE, error
+from re import compile as re_compile
+from re import escape, fullmatch
+from time import localtime, strftime, time
 from typing import TYPE_CHECKING, Iterator
 
 from loguru import logger
@@ -11,7 +15,33 @@ from ..argparser import InlineArgumentParser
 from ..command import Executable
 
 if TYPE_CHECKING:
+    from argparse import Namespace
+
     from ...interpreter import HistoryManager, Interpreter
+    from ...interpreter.history_manager import HistoryRecord
+
+DATABASE_DISABLED = (
+    "Error: the history database is disabled, enable it with "
+    "`config --history_database true -s`"
+)
+QUERY_LIMIT = 20  # records printed by a query without --limit
+_AGE_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+
+def parse_age(string: str) -> float | None:
+    """Parse an age like `90s`, `15m`, `1h`, `2d` or `1w` into seconds."""
+    if (match := fullmatch(r"(\d+(?:\.\d+)?)([smhdw])", string.strip())) is None:
+        return None
+    return float(match[1]) * _AGE_UNITS[match[2]]
+
+
+def format_record(record: HistoryRecord) -> str:
+    started = (
+        "" if record.started is None else strftime("%F %T", localtime(record.started))
+    )
+    duration = "" if record.duration is None else f"{record.duration:.2f}s"
+    failed = "x" if record.failed else " "
+    return f"{started:<19}  {duration:>9}  {failed}  {record.command}"
 
 
 def load_history_lines(history_manager: HistoryManager) -> Iterator[str]:
@@ -25,27 +55,25 @@ def load_history_lines(history_manager: HistoryManager) -> Iterator[str]:
 
 def clear_history(history_manager: HistoryManager) -> None:
     try:
-        with history_manager.get_file("w"):
-            pass
+        history_manager.clear()
     except OSError as err:
         logger.error(err)
 
-    get_line.cache_clear()
 
-
-@cache
-def get_line(line_number: int, history_manager: HistoryManager) -> str | IndexError:
-    # if using negative indexes we have to substract one to account for the current command
-    if line_number < 0:
+def get_line(
+    line_number: int, history_manager: HistoryManager, in_history: bool
+) -> str | Exception:
+    # if using negative indexes we have to substract one to account for the current
+    # command, if it's in the history
+    if line_number < 0 and in_history:
         line_number -= 1
 
-    lines = tuple(load_history_lines(history_manager))
-
-    if len(lines) < line_number:
-        return IndexError(
-            f"Error: index out of range, index {line_number}, range {len(lines) - 1}"
-        )
-    return lines[line_number].strip()
+    try:
+        return history_manager.get_line(line_number).strip()
+    except IndexError as err:
+        return IndexError(f"Error: {err}")
+    except OSError as err:
+        return OSError(f"Error: failed to read the history, {err}")
 
 
 class History(Executable):
@@ -63,6 +91,70 @@ class History(Executable):
             type=int,
             help="copy the given line number (supports negative indexes)",
         )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "-n",
+            "--number",
+            type=int,
+            help="print only the last given number of lines",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "-s",
+            "--search",
+            type=str,
+            help="print the lines which match a regular expression, newest first",
+        )
+        self.parser.add_argument(
+            "-l",
+            "--limit",
+            type=int,
+            default=None,
+            help="stop searching after the given number of matches",
+        )
+        self.parser.add_argument(
+            "-u",
+            "--unique",
+            action="store_true",
+            help="only print the newest of identical matches",
+        )
+        self.parser.add_argument(
+            "-F",
+            "--fixed_strings",
+            action="store_true",
+            help="search for a substring instead of a regular expression",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "-S",
+            "--sync",
+            action="store_true",
+            help="print the lines added by other sessions since the last sync",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "--cwd",
+            nargs="?",
+            const=".",
+            help="print the newest commands run in a directory, the cwd by default",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "--failed",
+            action="store_true",
+            help="print the newest commands which failed",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "--slowest",
+            action="store_true",
+            help="print the commands which took the longest",
+        )
+        self.parser.add_argument(
+            "--since",
+            type=str,
+            help="only query commands run within an age, e.g. 30m, 1h or 2d",
+        )
+        self.parser.add_mutually_exclusive_group().add_argument(
+            "--import",
+            dest="import_text",
+            action="store_true",
+            help="import the text history into the history database, once",
+        )
         self.parser.add_mutually_exclusive_group().add_argument(
             "-c",
             "--clear",
@@ -81,20 +173,131 @@ class History(Executable):
     def help(self) -> str:
         return self.parser.format_help()
 
+    def search(self, console: Interpreter, options: Namespace) -> None | Exception:
+        if console.history_manager is None:
+            return Exception("Error: couldn't load history manager")
+        if options.limit is not None and options.limit < 1:
+            return ValueError("Error: --limit must be at least 1")
+
+        pattern = options.search.encode("utf8")
+        try:
+            regexp = re_compile(
+                escape(pattern) if options.fixed_strings else pattern, MULTILINE
+            )
+        except error as err:
+            return ValueError(f"Error: invalid pattern {options.search!r}, {err}")
+
+        try:
+            # the last line is the search itself, unless it wasn't written, e.g. by a
+            # script or with record_history off
+            matches = console.history_manager.search(
+                regexp,
+                options.limit,
+                options.unique,
+                stop=-1 if console.in_history else None,
+            )
+        except OSError as err:
+            return OSError(f"Error: failed to read the history, {err}")
+
+        for index, cmd in matches:
+            console.stdout.write(f"{index:<5}  {cmd}\n")
+        return None
+
+    def query(self, console: Interpreter, options: Namespace) -> None | Exception:
+        import sqlite3  # pylint: disable=import-outside-toplevel
+
+        assert console.history_manager is not None
+        if options.limit is not None and options.limit < 1:
+            return ValueError("Error: --limit must be at least 1")
+        limit = options.limit or QUERY_LIMIT
+
+        since = None
+        if options.since is not None:
+            if (age := parse_age(options.since)) is None:
+                return ValueError(f"Error: invalid age {options.since!r}, e.g. 1h")
+            since = time() - age
+
+        try:
+            with console.history_manager.get_database() as database:
+                if options.cwd is not None:
+                    cwd = (console.cwd / Path(options.cwd).expanduser()).resolve()
+                    records = database.in_directory(cwd.as_posix(), since, limit)
+                elif options.failed:
+                    records = database.failed(since, limit)
+                else:
+                    records = database.slowest(since, limit)
+        except LookupError:
+            return LookupError(DATABASE_DISABLED)
+        except sqlite3.Error as err:
+            return OSError(f"Error: failed to query the history database, {err}")
+
+        for record in records:
+            console.stdout.write(f"{format_record(record)}\n")
+        return None
+
+    def import_text(self, console: Interpreter) -> None | Exception:
+        import sqlite3  # pylint: disable=import-outside-toplevel
+
+        assert console.history_manager is not None
+        try:
+            count = console.history_manager.import_history()
+        except LookupError:
+            return LookupError(DATABASE_DISABLED)
+        except ValueError as err:
+            return ValueError(f"Error: {err}")
+        except (sqlite3.Error, OSError) as err:
+            return OSError(f"Error: failed to import the history, {err}")
+
+        console.stdout.write(f"imported {count} commands\n")
+        return None
+
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         if console.history_manager is None:
             return Exception("Error: couldn't load history manager")
 
+        # options which modify a mode are rejected without it, rather than ignored
+        query = options.cwd is not None or options.failed or options.slowest
+        if (options.unique or options.fixed_strings) and options.search is None:
+            return ValueError("Error: --unique & --fixed_strings require --search")
+        if options.limit is not None and options.search is None and not query:
+            return ValueError(
+                "Error: --limit requires --search, --cwd, --failed or --slowest"
+            )
+        if options.since is not None and not query:
+            return ValueError("Error: --since requires --cwd, --failed or --slowest")
+
         if options.print or all(not arg for arg in vars(options).values()):
             for index, cmd in enumerate(load_history_lines(console.history_manager)):
-                print(f"{index:<5}  {cmd}", end="")
+                console.stdout.write(f"{index:<5}  {cmd}")
+        elif options.number is not None:
+            if options.number < 1:
+                return ValueError("Error: --number must be at least 1")
+            try:
+                start, lines = console.history_manager.tail(options.number)
+            except OSError as err:
+                return OSError(f"Error: failed to read the history, {err}")
+            for index, cmd in enumerate(lines, start):
+                console.stdout.write(f"{index:<5}  {cmd}\n")
+        elif options.search is not None:
+            return self.search(console, options)
+        elif query:
+            return self.query(console, options)
+        elif options.import_text:
+            return self.import_text(console)
+        elif options.sync:
+            try:
+                new_lines = console.history_manager.sync()
+            except OSError as err:
+                return OSError(f"Error: failed to read the history, {err}")
+            for index, cmd in new_lines:
+                console.stdout.write(f"{index:<5}  {cmd}\n")
         elif options.clear:
             clear_history(console.history_manager)
         elif options.copy:
-            line = get_line(options.copy, console.history_manager)
+            line = get_line(options.copy, console.history_manager, console.in_history)
 
             if isinstance(line, Exception):
                 return line
@@ -36,11 +36,11 @@ class License(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
-        if (options := self.parser.parse_arguments(args)) is None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
             return None
 
         if all(not arg for arg in vars(options).values()):
-            self.parser.print_usage()
+            self.parser.print_usage(console.stdout)
             return None
 
         if not console.data_directory.exists():
@@ -51,7 +51,7 @@ class License(Executable):
 
         if options.print:
             try:
-                print(license_path.read_text())
+                print(license_path.read_text(), file=console.stdout)
             except OSError as err:
                 return OSError(f"Error: couldn't read license, {err}")
 
@@ -61,7 +61,8 @@ class License(Executable):
                 add_colours(
                     repr(path_str) if " " in path_str else path_str,
                     console.config.colours.file_path,
-                )
+                ),
+                file=console.stdout,
             )
 
         return None
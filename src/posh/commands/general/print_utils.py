@@ -1,9 +1,36 @@
-from typing import Callable, Mapping, TypeVar
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Mapping, TypeVar
+
+if TYPE_CHECKING:
+    from ...interpreter.streams import OutputStream
 
 K = TypeVar("K")
 V = TypeVar("V")
 
 
+def is_int(n: float) -> bool:
+    return n % 1 == 0
+
+
+def get_readable_size(size: float, ndigits: int = 2) -> str:
+    prefixes = ("", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi", "Yi")
+    for prefix in prefixes:
+        if size < 1024:
+            return f"{int(size) if is_int(size) else round(size, ndigits)}{prefix}B"
+
+        size /= 1024
+
+    return f"{round(size, ndigits)}{prefixes[-1]}B"
+
+
+def format_size(size: int | None, sign: bool = False) -> str:
+    if size is None:
+        return "N/A"
+    prefix = ("-" if size < 0 else "+") if sign else "-" if size < 0 else ""
+    return f"{prefix}{get_readable_size(abs(size))}"
+
+
 def print_dict(
     d: Mapping[K, V],
     format_key: Callable[[K], str] = str,
@@ -11,11 +38,12 @@ def print_dict(
     seperator: str = "=",
     whitespace: str = " " * 4,
     depth: int = 0,
+    file: OutputStream | None = None,
 ) -> None:
     current_whitespace = whitespace * depth
     for key, value in d.items():
         if isinstance(value, dict):
-            print(f"{current_whitespace}{format_key(key)}:")
+            print(f"{current_whitespace}{format_key(key)}:", file=file)
             print_dict(
                 value,
                 format_key,
@@ -23,8 +51,10 @@ def print_dict(
                 seperator,
                 whitespace,
                 depth + 1,
+                file,
             )
         else:
             print(
-                f"{current_whitespace}{format_key(key)}{seperator}{format_val(value)}"
+                f"{current_whitespace}{format_key(key)}{seperator}{format_val(value)}",
+                file=file,
             )
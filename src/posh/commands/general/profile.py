@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import tracemalloc
+from argparse import REMAINDER
+from collections.abc import Sequence
+from io import StringIO
+from typing import TYPE_CHECKING
+
+from ...interpreter.lexer import join_arguments
+from ...interpreter.profiling import CURRENT_PROFILE, ProfileSession
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+from ..file_system.path_utils import parse_path
+from .print_utils import format_size
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from pathlib import Path
+
+    from ...interpreter import Interpreter
+
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# allocations made by tracemalloc itself or while importing aren't of interest
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Profile(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(
+            self, epilog="options must be given before the command to profile"
+        )
+        self.parser.add_argument(
+            "-m",
+            "--mem",
+            action="store_true",
+            help="trace memory allocations instead of profiling function calls",
+        )
+        self.parser.add_argument(
+            "-n",
+            "--number",
+            type=int,
+            default=20,
+            help="number of functions, or allocation sites, to print, default is 20",
+        )
+        self.parser.add_argument(
+            "-s",
+            "--sort",
+            choices=SORT_KEYS,
+            default=SORT_KEYS[0],
+            help="order to print functions in, default is cumulative time",
+        )
+        self.parser.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default=None,
+            help=(
+                "also write the stats to a .pstats file, e.g. for snakeviz, or the "
+                "snapshot with --mem"
+            ),
+        )
+        self.parser.add_argument(
+            "cmd",
+            nargs=REMAINDER,
+            help="command to profile, a single quoted word can hold a whole command line",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "profile"
+
+    @staticmethod
+    def description() -> str:
+        return "Run a command under a profiler and print where the time goes"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def profile_calls(
+        self,
+        console: Interpreter,
+        command: str,
+        options: Namespace,
+        output: Path | None,
+    ) -> None | Exception:
+        session = ProfileSession()
+        token = CURRENT_PROFILE.set(session)
+        try:
+            err = session.run(console.interpret_command, command)
+        except ValueError as profile_err:  # another profiler is active, e.g. on 3.12
+            return ValueError(f"Error: failed to start profiling, {profile_err}")
+        finally:
+            CURRENT_PROFILE.reset(token)
+        console.stdout.flush()
+
+        if (stats := session.stats()) is None:
+            return err
+
+        report = StringIO()
+        stats.stream = report  # type: ignore[attr-defined]
+        stats.sort_stats(options.sort).print_stats(options.number)
+        console.stderr.write(report.getvalue())
+
+        if output is not None:
+            try:
+                stats.dump_stats(output)
+            except OSError as dump_err:
+                return OSError(f"Error: failed to write {options.output!r}, {dump_err}")
+
+        return err
+
+    def profile_memory(
+        self,
+        console: Interpreter,
+        command: str,
+        options: Namespace,
+        output: Path | None,
+    ) -> None | Exception:
+        # when already tracing, e.g. with PYTHONTRACEMALLOC, only the difference counts
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        try:
+            err = console.interpret_command(command)
+            console.stdout.flush()
+            after = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        lines = [
+            f"peak {format_size(peak)}, still allocated {format_size(current)}",
+            f"{'size':>10}  {'blocks':>7}  allocation site",
+        ]
+        for statistic in after.compare_to(before, "lineno")[: options.number]:
+            frame = statistic.traceback[0]
+            lines.append(
+                f"{format_size(statistic.size_diff):>10}  "
+                f"{statistic.count_diff:>7}  {frame.filename}:{frame.lineno}"
+            )
+        console.stderr.write("\n".join(lines) + "\n")
+
+        if output is not None:
+            try:
+                after.dump(str(output))
+            except OSError as dump_err:
+                return OSError(f"Error: failed to write {options.output!r}, {dump_err}")
+
+        return err
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+        if not options.cmd:
+            return Exception("Error: profile requires a command to run")
+        if options.number < 1:
+            return ValueError("Error: --number must be at least 1")
+        if CURRENT_PROFILE.get() is not None:
+            return Exception("Error: profile can't be nested")
+
+        output = None
+        if options.output is not None:
+            output = parse_path(options.output, console.cwd)
+            if not output.is_absolute():
+                output = console.cwd / output
+
+        command = join_arguments(options.cmd)
+        if options.mem:
+            return self.profile_memory(console, command, options, output)
+        return self.profile_calls(console, command, options, output)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from argparse import REMAINDER
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from ...interpreter.lexer import join_arguments
+from ...interpreter.metrics import measure
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+from .print_utils import format_size
+
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+    from ...interpreter.metrics import CommandMetrics
+
+
+def format_metrics(metrics: CommandMetrics) -> str:
+    lines = [
+        f"real      {metrics.wall:.3f}s",
+        f"user      {metrics.user:.3f}s",
+        f"sys       {metrics.system:.3f}s",
+        f"max rss   {format_size(metrics.max_rss_delta, sign=True)}",
+    ]
+    if metrics.read_calls is not None and metrics.write_calls is not None:
+        lines.append(
+            f"reads     {metrics.read_calls} calls, {format_size(metrics.read_bytes)}"
+        )
+        lines.append(
+            f"writes    {metrics.write_calls} calls, {format_size(metrics.write_bytes)}"
+        )
+    if metrics.children:
+        lines.append(
+            f"children  {metrics.children} processes, "
+            f"user {metrics.children_user:.3f}s, sys {metrics.children_system:.3f}s, "
+            f"max rss {format_size(metrics.children_max_rss)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class Time(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(self)
+        self.parser.add_argument(
+            "cmd",
+            nargs=REMAINDER,
+            help="command to time, a single quoted word can hold a whole command line",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "time"
+
+    @staticmethod
+    def description() -> str:
+        return "Run a command and print the time & resources it used"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+        if not options.cmd:
+            return Exception("Error: time requires a command to run")
+
+        with measure(command := join_arguments(options.cmd)) as metrics:
+            err = console.interpret_command(command)
+
+        console.stdout.flush()
+        console.stderr.write(format_metrics(metrics))
+        return err
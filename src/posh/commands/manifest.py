@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class CommandSpec:
+    """
+    Cheap description of a builtin, used to list and look up commands without
+    importing the module which implements them.
+
+    The `description` must match the `description()` of the implementing class.
+    """
+
+    name: str
+    module: str  # relative to the `posh.commands` package
+    class_name: str
+    description: str
+
+
+COMMANDS: tuple[CommandSpec, ...] = (
+    CommandSpec(
+        "exit",
+        ".general.exit",
+        "Exit",
+        "Exit the program with the given exit code",
+    ),
+    CommandSpec("clear", ".general.clear", "Clear", "Clear console's output"),
+    CommandSpec("cd", ".file_system.cd", "Cd", "Change the current working directory"),
+    CommandSpec("help", ".general.help", "Help", "Print the help page of a command"),
+    CommandSpec(
+        "history",
+        ".general.history",
+        "History",
+        "Manage the console's command history",
+    ),
+    CommandSpec(
+        "pwd", ".file_system.pwd", "Pwd", "Print the current working directory"
+    ),
+    CommandSpec(
+        "ls", ".file_system.ls", "Ls", "Print the contents of a given directory"
+    ),
+    CommandSpec(
+        "cat",
+        ".file_system.cat",
+        "Cat",
+        "Concatenate the contents of a file and print them to the console",
+    ),
+    CommandSpec(
+        "touch", ".file_system.touch", "Touch", "Create empty file(s) from path(s)"
+    ),
+    CommandSpec("rm", ".file_system.rm", "Rm", "Remove file(s) or directory(ies)"),
+    CommandSpec(
+        "rmdir",
+        ".file_system.rmdir",
+        "Rmdir",
+        "Remove directory(ies), if they are empty",
+    ),
+    CommandSpec(
+        "mkdir",
+        ".file_system.mkdir",
+        "Mkdir",
+        "Create empty directory(ies) from path(s)",
+    ),
+    CommandSpec(
+        "cp",
+        ".file_system.cp",
+        "Cp",
+        "Copy source to destination, or multiple source(s) to directory",
+    ),
+    CommandSpec(
+        "config", ".general.config", "Config", "Manage the console's configurations"
+    ),
+    CommandSpec(
+        "mv",
+        ".file_system.mv",
+        "Mv",
+        "Rename source to destination, or move source(s) to directory",
+    ),
+    CommandSpec(
+        "ps",
+        ".processes.ps",
+        "Ps",
+        "Report a snapshot of currently running processes",
+    ),
+    CommandSpec(
+        "run", ".processes.run", "Run", "Start a process with any given arguments"
+    ),
+    CommandSpec(
+        "kill",
+        ".processes.kill",
+        "Kill",
+        "Kill or terminate process with a given pid",
+    ),
+    CommandSpec(
+        "jobs", ".processes.jobs", "Jobs", "Print the status of background jobs"
+    ),
+    CommandSpec(
+        "wait", ".processes.wait", "Wait", "Wait for background jobs to finish"
+    ),
+    CommandSpec(
+        "fg", ".processes.fg", "Fg", "Wait for a background job in the foreground"
+    ),
+    CommandSpec(
+        "parallel",
+        ".processes.parallel",
+        "Parallel",
+        "Run a command for every argument, several at once",
+    ),
+    CommandSpec(
+        "alias", ".general.alias", "Alias", "Create an alias for a string of commands"
+    ),
+    CommandSpec(
+        "grep",
+        ".text.grep",
+        "Grep",
+        "Print the lines of file(s) or stdin which match a pattern",
+    ),
+    CommandSpec(
+        "time",
+        ".general.time",
+        "Time",
+        "Run a command and print the time & resources it used",
+    ),
+    CommandSpec(
+        "profile",
+        ".general.profile",
+        "Profile",
+        "Run a command under a profiler and print where the time goes",
+    ),
+    CommandSpec(
+        "license",
+        ".general.license",
+        "License",
+        "Print and locate this product's license",
+    ),
+)
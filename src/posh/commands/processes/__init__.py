@@ -1,5 +1,31 @@
-from .kill import Kill
-from .ps import Ps
-from .run import Run
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = "Ps", "Run", "Kill"
+if TYPE_CHECKING:
+    from .fg import Fg
+    from .jobs import Jobs
+    from .kill import Kill
+    from .parallel import Parallel
+    from .ps import Ps
+    from .run import Run
+    from .wait import Wait
+
+__all__ = "Ps", "Run", "Kill", "Jobs", "Wait", "Fg", "Parallel"
+
+# the command modules are imported on first access so that importing one of them
+# doesn't pull in the dependencies of all the others
+_MODULES = {
+    "Fg": ".fg",
+    "Jobs": ".jobs",
+    "Kill": ".kill",
+    "Parallel": ".parallel",
+    "Ps": ".ps",
+    "Run": ".run",
+    "Wait": ".wait",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _MODULES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
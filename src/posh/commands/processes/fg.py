@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+
+
+class Fg(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(self)
+        self.parser.add_argument(
+            "id",
+            nargs="?",
+            type=int,
+            default=None,
+            help="id of the job, default is the latest job",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "fg"
+
+    @staticmethod
+    def description() -> str:
+        return "Wait for a background job in the foreground"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+
+        if options.id is None:
+            if (job := console.jobs.latest()) is None:
+                return Exception("Error: there are no jobs")
+        elif (job := console.jobs.get(options.id)) is None:
+            return Exception(f"Error: no such job with id {options.id}")
+
+        console.stdout.write(f"{job.command}\n")
+        console.stdout.flush()
+        try:
+            err = job.wait()
+        except KeyboardInterrupt:
+            # processes are interrupted like a foreground command would be, builtins
+            # can't be and keep running in the background
+            job.interrupt()
+            raise
+
+        console.report_job(job, notice=False)
+        return err
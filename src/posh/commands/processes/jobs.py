@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+
+
+class Jobs(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(self)
+        self.parser.add_argument(
+            "-l",
+            "--long",
+            action="store_true",
+            help="also print the pid of processes and the cwd of each job",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "jobs"
+
+    @staticmethod
+    def description() -> str:
+        return "Print the status of background jobs"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return
+
+        for job in console.jobs:
+            # like their notices, finished jobs are only listed once
+            if job.done:
+                console.report_job(job)
+                continue
+
+            details = ""
+            if options.long:
+                pid = "builtin" if job.process is None else str(job.process.pid)
+                details = f"{pid:>7}  {job.cwd.as_posix()}  "
+            console.stdout.write(f"[{job.id}]  Running  {details}{job.command}\n")
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from argparse import REMAINDER
+from collections.abc import Sequence
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextvars import copy_context
+from dataclasses import dataclass
+from io import StringIO
+from multiprocessing import get_context
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from ...colours import add_colours
+from ...interpreter.interpreter import Interpreter
+from ...interpreter.lexer import join_arguments, quote
+from ...interpreter.profiling import profiled
+from ...interpreter.streams import CURRENT_SESSION, OutputSink
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+from ..file_system.path_utils import open_lines, parse_path
+
+if TYPE_CHECKING:
+    from ...interpreter.config import Config
+
+ARGS_SEPARATOR = ":::"
+
+
+@dataclass(frozen=True, slots=True)
+class TaskResult:
+    command: str
+    stdout: str
+    stderr: str
+    error: str | None  # the message, since not every error can be pickled
+    elapsed: float
+
+
+class WorkerInterpreter(Interpreter):
+    """
+    Interpreter of a worker process, created once per process by `init_worker` with the
+    config of the parent, so that tasks don't load the config or commands again.
+    """
+
+    def __init__(
+        self, starting_directory: Path, config: Config, variables: dict[str, str]
+    ) -> None:
+        super().__init__(starting_directory, config)
+        self.variables = variables
+
+
+_worker: WorkerInterpreter | None = None
+
+
+def init_worker(
+    starting_directory: Path, config: Config, variables: dict[str, str]
+) -> None:
+    global _worker  # pylint: disable=global-statement
+    _worker = WorkerInterpreter(starting_directory, config, variables)
+
+
+def run_worker_task(command: str) -> TaskResult:
+    if _worker is None:
+        raise RuntimeError("the worker hasn't been initialized")
+    return run_task(_worker, command)
+
+
+def run_task(interpreter: Interpreter, command: str) -> TaskResult:
+    """
+    Run a command in a fork of the interpreter, capturing its output so that it can be
+    printed as one block.
+    """
+    task = interpreter.fork()
+    task.stdin = StringIO()
+    task.stdout = stdout = OutputSink.capture(strip_colours=False)
+    task.stderr = stderr = OutputSink.capture(strip_colours=False)
+
+    start = perf_counter()
+    error: str | None = None
+    token = CURRENT_SESSION.set(task)
+    try:
+        if (err := profiled(task.interpret_command, command)) is not None:
+            error = str(err)
+    except SystemExit as exit_err:
+        error = f"Error: exited with code {exit_err.code!r}"
+    finally:
+        CURRENT_SESSION.reset(token)
+
+    return TaskResult(
+        command, stdout.getvalue(), stderr.getvalue(), error, perf_counter() - start
+    )
+
+
+def build_command(template: Sequence[str], arg: str) -> str:
+    command = join_arguments(template)
+    if "{}" not in command:
+        return f"{command} {quote(arg)}"
+    return command.replace("{}", quote(arg))
+
+
+class Parallel(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(
+            self,
+            epilog=(
+                "every '{}' in the template is replaced by an argument, which is "
+                "otherwise appended to it, a template of a single quoted word can "
+                "contain pipes & redirects, e.g. 'cat {} | grep todo'"
+            ),
+        )
+        self.parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=cpu_count() or 1,
+            help="number of commands to run at once, default is the number of cpus",
+        )
+        self.parser.add_argument(
+            "-a",
+            "--arg_file",
+            type=str,
+            default=None,
+            help=(
+                f"read arguments from a file, one per line, instead of after "
+                f"'{ARGS_SEPARATOR}' or from stdin"
+            ),
+        )
+        self.parser.add_argument(
+            "-k",
+            "--keep_order",
+            action="store_true",
+            help="print the output of the commands in the order of their arguments",
+        )
+        self.parser.add_argument(
+            "-p",
+            "--processes",
+            action="store_true",
+            help="run the commands in worker processes instead of threads",
+        )
+        self.parser.add_argument(
+            "template",
+            nargs=REMAINDER,
+            help=f"command to run for every argument, followed by '{ARGS_SEPARATOR}'",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "parallel"
+
+    @staticmethod
+    def description() -> str:
+        return "Run a command for every argument, several at once"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def read_args(
+        self, console: Interpreter, arg_file: str | None
+    ) -> list[str] | Exception:
+        path = None
+        if arg_file is not None:
+            path = parse_path(arg_file, console.cwd)
+            if not path.is_absolute():
+                path = console.cwd / path
+            if not path.is_file():
+                return FileNotFoundError(f"Error: {arg_file!r} is not a file")
+
+        try:
+            with open_lines(path, console) as lines:
+                return [line for line in map(str.strip, lines) if line]
+        except OSError as err:
+            return OSError(f"Error: failed to read the arguments, {err}")
+
+    def write_result(self, console: Interpreter, result: TaskResult) -> None:
+        # each command's output is written as a whole, so commands never interleave
+        console.stdout.write(result.stdout)
+        console.stdout.flush()
+        console.stderr.write(result.stderr)
+        if result.error is not None:
+            print(
+                add_colours(result.error, console.config.colours.errors),
+                file=console.stderr,
+            )
+        console.stderr.flush()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        task_args: list[str] | Exception | None = None
+        if ARGS_SEPARATOR in args:
+            index = args.index(ARGS_SEPARATOR)
+            args, task_args = args[:index], list(args[index + 1 :])
+
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+        if not options.template:
+            return Exception("Error: parallel requires a command to run")
+        if options.jobs < 1:
+            return ValueError("Error: --jobs must be at least 1")
+
+        if task_args is None:
+            task_args = self.read_args(console, options.arg_file)
+        if isinstance(task_args, Exception):
+            return task_args
+
+        commands = [build_command(options.template, arg) for arg in task_args]
+        if not commands:
+            return None
+
+        pool: Executor
+        if options.processes:
+            pool = ProcessPoolExecutor(
+                min(options.jobs, len(commands)),
+                # workers start from a fresh interpreter, rather than forking the
+                # console's threads & locks
+                mp_context=get_context("spawn"),
+                initializer=init_worker,
+                initargs=(console.cwd, console.config, console.variables),
+            )
+        else:
+            pool = ThreadPoolExecutor(
+                min(options.jobs, len(commands)), thread_name_prefix="Parallel"
+            )
+
+        start = perf_counter()
+        failed = 0
+        with pool:
+            futures: list[Future[TaskResult]]
+            if options.processes:
+                futures = [
+                    pool.submit(run_worker_task, command) for command in commands
+                ]
+            else:
+                futures = [
+                    pool.submit(copy_context().run, run_task, console, command)
+                    for command in commands
+                ]
+
+            try:
+                for future in futures if options.keep_order else as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as err:  # pylint: disable=broad-exception-caught
+                        # e.g. a worker process which died
+                        result = TaskResult(
+                            commands[futures.index(future)], "", "", f"Error: {err}", 0
+                        )
+                    failed += result.error is not None
+                    self.write_result(console, result)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        console.stderr.write(
+            f"parallel: {len(commands)} commands, {len(commands) - failed} succeeded, "
+            f"{failed} failed in {perf_counter() - start:.2f}s\n"
+        )
+        if failed:
+            return Exception(f"Error: {failed} of {len(commands)} commands failed")
+        return None
@@ -4,52 +4,59 @@ from collections.abc import Sequence
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from psutil import AccessDenied, Process, process_iter
+from psutil import AccessDenied, NoSuchProcess, Process, process_iter
 
 from ..argparser import InlineArgumentParser
 from ..command import Executable
+from ..records import ProcessRecord
 
 if TYPE_CHECKING:
     from ...interpreter import Interpreter
 
 
-def get_pid(process: Process) -> str:
+def get_tty(process: Process) -> str | None:
     try:
-        return str(process.pid)
-    except AccessDenied:
-        return "N/A"
+        return process.terminal()
+    except (AccessDenied, AttributeError):
+        return None
 
 
-def get_tty(process: Process) -> str:
+def get_time(process: Process) -> float | None:
     try:
-        return process.terminal()  # type: ignore
-    except (AccessDenied, AttributeError):
-        return "N/A"
+        times = process.cpu_times()
+    except AccessDenied:
+        return None
+    return times.user + times.system
 
 
-def get_time(process: Process) -> str:
+def get_cmdline(process: Process) -> list[str] | None:
     try:
-        times = process.cpu_times()
+        return process.cmdline()
     except AccessDenied:
-        return "N/A"
-    return datetime.fromtimestamp((times.user + times.system) / 1000).strftime("%X")
+        return None
 
 
-def get_cmdline(process: Process) -> str:
+def get_record(process: Process) -> ProcessRecord | None:
     try:
-        return (
-            " ".join((repr(cmd) if " " in cmd else cmd) for cmd in process.cmdline())
-            or "N/A"
+        return ProcessRecord(
+            process.pid, get_tty(process), get_time(process), get_cmdline(process)
         )
-    except AccessDenied:
-        return "N/A"
+    except NoSuchProcess:  # exited while being inspected
+        return None
 
 
-def format_process(process: Process) -> str:
-    info = (get_pid(process), get_tty(process), get_time(process), get_cmdline(process))
-    if all(i == "N/A" for i in info):
-        return ""
-    return f"{info[0]:>5} {info[1]:<8} {info[2]:>8} {info[3]}\n"
+def format_record(record: ProcessRecord) -> str:
+    tty = "N/A" if record.tty is None else record.tty
+    time = (
+        "N/A"
+        if record.cpu_time is None
+        else datetime.fromtimestamp(record.cpu_time / 1000).strftime("%X")
+    )
+    cmdline = (
+        " ".join((repr(cmd) if " " in cmd else cmd) for cmd in record.cmdline or ())
+        or "N/A"
+    )
+    return f"{record.pid:>5} {tty:<8} {time:>8} {cmdline}\n"
 
 
 class Ps(Executable):
@@ -68,9 +75,22 @@ class Ps(Executable):
         return self.parser.format_help()
 
     def execute(self, console: Interpreter, args: Sequence[str]) -> None:
-        if self.parser.parse_arguments(args) is None:
+        if self.parser.parse_arguments(console, args) is None:
             return
 
-        print(f"  PID TTY{' ' * 10}TIME COMMAND")
+        console.stdout.write(f"  PID TTY{' ' * 10}TIME COMMAND\n")
         for process in process_iter():
-            print(format_process(process), end="")
+            if (record := get_record(process)) is not None:
+                console.stdout.write(format_record(record))
+
+    def records(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> list[ProcessRecord] | Exception:
+        if self.parser.parse_arguments(console, args) is None:
+            return ValueError(f"Error: invalid arguments to {self.command()}")
+
+        return [
+            record
+            for process in process_iter()
+            if (record := get_record(process)) is not None
+        ]
@@ -1,17 +1,56 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
-from subprocess import run
-from typing import TYPE_CHECKING
+from subprocess import DEVNULL, PIPE, Popen
+from threading import Thread
+from typing import IO, TYPE_CHECKING
 
+from ...interpreter.metrics import wait_process
+from ...interpreter.streams import get_fileno
 from ..argparser import InlineArgumentParser
 from ..command import Executable
 
 if TYPE_CHECKING:
+    from argparse import Namespace
+
     from ...interpreter import Interpreter
+    from ...interpreter.streams import InputStream, OutputStream
+
+
+def feed_lines(lines: InputStream, stdin: IO[str]) -> None:
+    try:
+        with stdin:
+            for line in lines:
+                stdin.write(line)
+    except BrokenPipeError:
+        pass  # the process exited without reading all of its input
+    finally:
+        lines.close()
+
+
+def pump_lines(lines: IO[str], stream: OutputStream) -> None:
+    # flushed per line since the process may produce output slowly
+    with lines:
+        for line in lines:
+            stream.write(line)
+            stream.flush()
+
+
+def start_pump(process: Popen[str], lines: IO[str], stream: OutputStream) -> Thread:
+    thread = Thread(
+        name=f"RunPump_{process.pid}",
+        target=pump_lines,
+        args=(lines, stream),
+        daemon=True,
+    )
+    thread.start()
+    return thread
 
 
 class Run(Executable):
+    external = True
+    spawnable = True
+
     def __init__(self) -> None:
         self.parser = InlineArgumentParser.from_command(self, add_help=False)
         self.parser.add_argument("cmd", type=str, help="command to run")
@@ -27,16 +66,90 @@ class Run(Executable):
     def help(self) -> str:
         return self.parser.format_help()
 
+    @staticmethod
+    def command_line(options: tuple[Namespace, list[str]]) -> str:
+        return " ".join(
+            (f'"{arg}"' if " " in arg else arg) for arg in (options[0].cmd, *options[1])
+        )
+
+    def spawn(
+        self, console: Interpreter, args: Sequence[str]
+    ) -> Popen[str] | Exception | None:
+        """
+        Start the process in its own session without waiting for it, so that it isn't
+        interrupted along with the foreground. The process writes to the file
+        descriptors of the console's streams, streams without one have its output
+        pumped into them by a thread, and it doesn't read any input.
+        """
+        if (options := self.parser.parse_known_arguments(console, args)) is None:
+            return None
+
+        console.stdout.flush()
+        console.stderr.flush()
+        stdout = get_fileno(console.stdout)
+        stderr = get_fileno(console.stderr)
+        process = Popen(
+            self.command_line(options),
+            shell=True,
+            cwd=console.cwd,
+            stdin=DEVNULL,
+            stdout=PIPE if stdout is None else stdout,
+            stderr=PIPE if stderr is None else stderr,
+            encoding="utf8",
+            errors="replace",
+            start_new_session=True,
+        )
+        if process.stdout is not None:
+            start_pump(process, process.stdout, console.stdout)
+        if process.stderr is not None:
+            start_pump(process, process.stderr, console.stderr)
+        return process
+
     def execute(self, console: Interpreter, args: Sequence[str]) -> None:
-        if (options := self.parser.parse_known_arguments(args)) is None:
+        if (options := self.parser.parse_known_arguments(console, args)) is None:
             return
 
-        run(
-            " ".join(
-                (f'"{arg}"' if " " in arg else arg)
-                for arg in (options[0].cmd, *options[1])
-            ),
+        # streams backed by a file descriptor, e.g. os pipes, are handed directly to
+        # the process, anything else has its lines pumped through a pipe
+        stdin: int | None = None
+        if console.stdin is not None:
+            stdin = get_fileno(console.stdin)
+            if stdin is None:
+                stdin = PIPE
+
+        console.stdout.flush()
+        if (stdout := get_fileno(console.stdout)) is None:
+            stdout = PIPE
+        console.stderr.flush()
+        if (stderr := get_fileno(console.stderr)) is None:
+            stderr = PIPE
+
+        with Popen(
+            self.command_line(options),
             shell=True,
-            check=False,
             cwd=console.cwd,
-        )
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            encoding="utf8",
+            errors="replace",
+        ) as process:
+            if process.stdin is not None and console.stdin is not None:
+                Thread(
+                    name=f"RunFeeder_{process.pid}",
+                    target=feed_lines,
+                    args=(console.stdin, process.stdin),
+                    daemon=True,
+                ).start()
+
+            # stderr is pumped on a thread, so that neither pipe fills up while the
+            # other is read
+            pump = None
+            if process.stderr is not None:
+                pump = start_pump(process, process.stderr, console.stderr)
+            if process.stdout is not None:
+                pump_lines(process.stdout, console.stdout)
+
+            wait_process(process)
+            if pump is not None:
+                pump.join()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+
+
+class Wait(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(self)
+        self.parser.add_argument(
+            "ids",
+            nargs="*",
+            type=int,
+            help="ids of the jobs to wait for, default is every job",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "wait"
+
+    @staticmethod
+    def description() -> str:
+        return "Wait for background jobs to finish"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+
+        if not options.ids:
+            console.report_jobs(wait=True)
+            return None
+
+        jobs = [console.jobs.get(job_id) for job_id in options.ids]
+        for job_id, job in zip(options.ids, jobs):
+            if job is None:
+                return Exception(f"Error: no such job with id {job_id}")
+
+        # like a foreground command, the first job which failed fails the wait
+        errors = [
+            console.report_job(job, print_error=False)
+            for job in jobs
+            if job is not None
+        ]
+        return next((err for err in errors if err is not None), None)
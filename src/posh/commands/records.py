@@ -0,0 +1,33 @@
+"""
+Structured output of commands, returned by `Executable.records` instead of the text the
+command would print.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from os.path import getsize
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class PathRecord:
+    path: Path
+    size: int | None  # None if it can't be read, e.g. of a dangling symlink
+    is_dir: bool
+
+    @classmethod
+    def from_path(cls, path: Path) -> PathRecord:
+        try:
+            size: int | None = getsize(path)
+        except OSError:
+            size = None
+        return cls(path, size, path.is_dir())
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessRecord:
+    pid: int
+    tty: str | None
+    cpu_time: float | None  # user + system time in seconds
+    cmdline: list[str] | None
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from importlib import import_module
+from typing import cast
+
+from .command import Executable
+from .manifest import CommandSpec
+
+
+class CommandRegistry(Mapping[str, type[Executable]]):
+    """
+    Mapping of command names to their executables. Commands are known through their
+    `CommandSpec`, the implementing module is only imported when the command is first
+    looked up, and a single instance of each executable is created on first use and
+    reused afterwards, so that the argument parsers are only ever built once.
+    """
+
+    def __init__(self, specs: Iterable[CommandSpec]) -> None:
+        self._specs = {spec.name: spec for spec in specs}
+        self._commands = dict[str, type[Executable]]()
+        self._instances = dict[str, Executable]()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{commands: {len(self._specs)!r}, "
+            f"imported: {sorted(self._commands)!r}, "
+            f"instantiated: {sorted(self._instances)!r}}}"
+        )
+
+    def __getitem__(self, name: str) -> type[Executable]:
+        if (command := self._commands.get(name)) is not None:
+            return command
+
+        spec = self._specs[name]
+        module = import_module(spec.module, __package__)
+        command = self._commands[name] = cast(
+            type[Executable], getattr(module, spec.class_name)
+        )
+        return command
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def description(self, name: str) -> str | None:
+        if (spec := self._specs.get(name)) is None:
+            return None
+        return spec.description
+
+    def instance(self, name: str) -> Executable | None:
+        if (executable := self._instances.get(name)) is not None:
+            return executable
+
+        if name not in self._specs:
+            return None
+
+        executable = self._instances[name] = self[name]()
+        return executable
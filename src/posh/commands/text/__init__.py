@@ -0,0 +1,19 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .grep import Grep
+
+__all__ = ("Grep",)
+
+# the command modules are imported on first access so that importing one of them
+# doesn't pull in the dependencies of all the others
+_MODULES = {
+    "Grep": ".grep",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _MODULES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
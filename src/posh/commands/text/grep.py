@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+from re import IGNORECASE, error
+from re import compile as re_compile
+from typing import TYPE_CHECKING
+
+from ...colours import add_colours
+from ..argparser import InlineArgumentParser
+from ..command import Executable
+from ..file_system.path_utils import open_lines, parse_path
+
+if TYPE_CHECKING:
+    from ...interpreter import Interpreter
+
+
+class Grep(Executable):
+    def __init__(self) -> None:
+        self.parser = InlineArgumentParser.from_command(self)
+        self.parser.add_argument(
+            "pattern", type=str, help="regular expression to search for"
+        )
+        self.parser.add_argument(
+            "paths",
+            type=str,
+            nargs="*",
+            help="path(s) to the file(s), with no path or '-' read from stdin",
+        )
+        self.parser.add_argument(
+            "-i", "--ignore_case", action="store_true", help="ignore case distinctions"
+        )
+        self.parser.add_argument(
+            "-v",
+            "--invert_match",
+            action="store_true",
+            help="select non-matching lines",
+        )
+        self.parser.add_argument(
+            "-n", "--line_number", action="store_true", help="show line numbers"
+        )
+        self.parser.add_argument(
+            "-c",
+            "--count",
+            action="store_true",
+            help="only print a count of matching lines per file",
+        )
+        self.parser.add_argument(
+            "-m",
+            "--max_count",
+            type=int,
+            default=None,
+            help="stop reading a file after the given number of matching lines",
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        return "grep"
+
+    @staticmethod
+    def description() -> str:
+        return "Print the lines of file(s) or stdin which match a pattern"
+
+    def help(self) -> str:
+        return self.parser.format_help()
+
+    def execute(self, console: Interpreter, args: Sequence[str]) -> None | Exception:
+        if (options := self.parser.parse_arguments(console, args)) is None:
+            return None
+
+        try:
+            pattern = re_compile(
+                options.pattern, IGNORECASE if options.ignore_case else 0
+            )
+        except error as err:
+            return Exception(f"Error: {options.pattern!r} failed to compile, {err}")
+
+        paths = list[Path | None]()  # None is stdin
+        for path_string in options.paths or ["-"]:
+            if path_string == "-":
+                paths.append(None)
+                continue
+
+            path = parse_path(path_string, console.cwd)
+
+            if not path.is_absolute():
+                path = console.cwd / path
+
+            if not path.is_file():
+                return FileNotFoundError(f"Error: {path_string!r} is not a file")
+
+            paths.append(path)
+
+        show_names = len(paths) > 1
+        for source in paths:
+            name = "(stdin)" if source is None else source.as_posix()
+            prefix = (
+                add_colours(f"{name}:", console.config.colours.file_path)
+                if show_names
+                else ""
+            )
+
+            count = 0
+            try:
+                with open_lines(source, console) as lines:
+                    for line_number, line in enumerate(lines, start=1):
+                        if (pattern.search(line) is None) != options.invert_match:
+                            continue
+
+                        count += 1
+                        if not options.count:
+                            number = f"{line_number}:" if options.line_number else ""
+                            line = line.rstrip("\n")
+                            print(f"{prefix}{number}{line}", file=console.stdout)
+
+                        if count == options.max_count:
+                            break
+            except UnicodeDecodeError as err:
+                return Exception(f"Error: failed to decode {name!r}, {err}")
+            except BrokenPipeError:
+                raise  # the next command in the pipeline stopped reading
+            except OSError as err:
+                return OSError(f"Error: {err}")
+
+            if options.count:
+                print(f"{prefix}{count}", file=console.stdout)
+
+        return None
@@ -1,16 +1,23 @@
-from .commands import load_commands, parse_string_command
+from .batch_interpreter import BatchInterpreter
+from .commands import ParseCache, load_commands, parse_string_command
 from .config import Config
 from .console import Console
 from .file_interpreter import FileIntepreter
 from .history_manager import HistoryManager
-from .interpreter import Interpreter
+from .interpreter import Interpreter, ShellInterpreter
+from .session import Result, Session
 
 __all__ = (
     "Interpreter",
+    "ShellInterpreter",
     "FileIntepreter",
+    "BatchInterpreter",
     "Console",
     "Config",
     "HistoryManager",
     "parse_string_command",
     "load_commands",
+    "ParseCache",
+    "Session",
+    "Result",
 )
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from ..colours import add_colours, should_colourize
+from .interpreter import ShellInterpreter
+from .streams import OutputSink
+
+
+class BatchInterpreter(ShellInterpreter):
+    """
+    Interpreter for commands given as a string or streamed from stdin, with no prompt.
+    Errors are printed to stderr and the exit code is set from the last command.
+    """
+
+    records_history = False
+
+    def __init__(self, starting_directory: Path, lines: Iterable[str]) -> None:
+        super().__init__(starting_directory)
+        # output is usually read by another process, so only keep colours for a terminal
+        self.stdout = OutputSink(strip_colours=not should_colourize(sys.stdout))
+        self.stderr = OutputSink(
+            sys.stderr, buffer_size=0, strip_colours=not should_colourize(sys.stderr)
+        )
+        self.lines = lines
+        self.exit_code = 0
+
+    def report(self, err: BaseException) -> None:
+        message = str(err)
+        if should_colourize(sys.stderr):
+            message = add_colours(message, self.config.colours.errors)
+        self.stdout.flush()
+        print(message, file=sys.stderr, flush=True)
+
+    def main(self) -> None:
+        try:
+            for line in self.lines:
+                if not (line := line.strip()):
+                    continue
+
+                if (err := self.interpret_command(line)) is not None:
+                    self.report(err)
+                    self.exit_code = 1
+                else:
+                    self.exit_code = 0
+                self.report_jobs()
+
+            self.report_jobs(wait=True)
+        except KeyboardInterrupt:
+            self.report(KeyboardInterrupt("Error: KEYBOARD INTERRUPT"))
+            self.exit_code = 130
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from shlex import shlex
-from typing import TYPE_CHECKING, Mapping, Sequence
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, replace
+from threading import Lock
+from typing import Any, Mapping, Sequence
 
 from ..commands import COMMANDS
-
-if TYPE_CHECKING:
-    from ..commands import Executable
+from ..commands.registry import CommandRegistry
+from .lexer import Token, TokenType, tokenize
 
 
 class FailedToParseError(Exception):
@@ -19,10 +19,30 @@ class Command:
     full_args: list[str]
 
 
+@dataclass(frozen=True)
+class Redirect:
+    path: str
+    append: bool = False
+    stderr: bool = False
+
+
 @dataclass
 class ExecutableCommand(Command):
     command: str
     args: list[str]
+    # whether each argument was quoted, for stages after parsing
+    quoted: list[bool] = field(default_factory=list)
+    redirects: list[Redirect] = field(default_factory=list)
+
+
+@dataclass
+class Pipeline(Command):
+    stages: list[ExecutableCommand]
+
+
+@dataclass
+class Background(Command):
+    command: ExecutableCommand | Pipeline
 
 
 @dataclass
@@ -36,45 +56,213 @@ class VariableDeclaration(Command):
     value: str
 
 
+def compile_aliases(
+    aliases: Mapping[str, list[Token]],
+) -> tuple[dict[str, list[Token]], list[list[str]]]:
+    """
+    Resolve every alias into the full list of tokens it expands to, returning the
+    expansion table along with any cycles found. Aliases which are part of, or depend on,
+    a cycle are left out of the table. An alias may reference itself, e.g. 'ls -> ls -a',
+    in which case the reference is left unexpanded.
+    """
+    expanded = dict[str, list[Token]]()
+    failed = set[str]()
+    cycles = list[list[str]]()
+
+    def resolve(alias: str, stack: list[str]) -> list[Token] | None:
+        if (resolved := expanded.get(alias)) is not None:
+            return resolved
+        if alias in failed:
+            return None
+
+        stack.append(alias)
+        resolved = list[Token]()
+        for token in aliases[alias]:
+            if (
+                token.type is not TokenType.WORD
+                or token.value == alias
+                or token.value not in aliases
+            ):
+                resolved.append(token)
+                continue
+
+            if token.value in stack:
+                cycles.append(stack[stack.index(token.value) :] + [token.value])
+                failed.update(stack)
+                stack.pop()
+                return None
+
+            if (inner := resolve(token.value, stack)) is None:
+                failed.add(alias)
+                stack.pop()
+                return None
+
+            resolved.extend(inner)
+
+        stack.pop()
+        expanded[alias] = resolved
+        return resolved
+
+    for alias in aliases:
+        resolve(alias, [])
+
+    return expanded, cycles
+
+
 def expand_aliases(
-    command_groups: list[list[str]],
-    aliases: Mapping[str, list[str]],
-) -> list[list[str]]:
-    for cmd_group_index, cmd_group in enumerate(command_groups):
-        if cmd_group and "alias" == cmd_group[0]:
+    tokens: list[Token],
+    expanded_aliases: Mapping[str, list[Token]],
+) -> list[Token]:
+    expanded_tokens = list[Token]()
+    command_start = True
+    defining_alias = False
+    redirect_path = False
+    for token in tokens:
+        if not token.is_word:
+            expanded_tokens.append(token)
+            redirect_path = token.is_redirect
+            command_start = command_start or not redirect_path
             continue
 
-        aliases_copy = dict(aliases)
-        for _ in range(len(aliases_copy)):
-            cur_group: list[str] = []
-            indexs_to_replace: list[tuple[int, list[str]]] = []
-            for inner_index, arg in enumerate(cmd_group):
-                if " " in arg:
-                    continue
-
-                cur_group.append(arg)
-
-                if arg in aliases_copy:
-                    expanded = aliases_copy[arg]
-                    if expanded != cur_group:
-                        indexs_to_replace.append((inner_index, expanded))
-                        del aliases_copy[arg]
-                    cur_group = []
-
-            for inner_index, args in indexs_to_replace:
-                cmd_group = (
-                    cmd_group[:inner_index] + args + cmd_group[inner_index + 1 :]
-                )
-                command_groups[cmd_group_index] = cmd_group
-    return command_groups
+        # the path of a redirect is never an alias
+        if redirect_path:
+            expanded_tokens.append(token)
+            redirect_path = False
+            continue
+
+        if command_start:
+            # never expand the arguments to alias so that aliases can be redefined
+            defining_alias = token.value == "alias"
+            command_start = False
+
+        if (
+            not defining_alias
+            and token.type is TokenType.WORD
+            and (expanded := expanded_aliases.get(token.value)) is not None
+        ):
+            expanded_tokens.extend(expanded)
+        else:
+            expanded_tokens.append(token)
+    return expanded_tokens
+
+
+def group_tokens(tokens: list[Token]) -> list[list[Token]]:
+    cmd_groups = list[list[Token]]()
+    cur_tokens = list[Token]()
+    for token in tokens:
+        if token.type is TokenType.SEMICOLON:
+            cmd_groups.append(cur_tokens)
+            cur_tokens = list[Token]()
+            continue
+        cur_tokens.append(token)
+        # like a semicolon, a '&' ends the command but is kept to mark it as a job
+        if token.type is TokenType.BACKGROUND:
+            cmd_groups.append(cur_tokens)
+            cur_tokens = list[Token]()
 
+    if cur_tokens:
+        cmd_groups.append(cur_tokens)  # remove remaing arguments left over
 
-def parse_commands(commands: Sequence[list[str]]) -> list[Command] | Exception:
+    return cmd_groups
+
+
+def make_executable_command(tokens: list[Token]) -> ExecutableCommand | Exception:
+    words = list[Token]()
+    redirects = list[Redirect]()
+    token_iter = iter(tokens)
+    for token in token_iter:
+        if not token.is_redirect:
+            words.append(token)
+            continue
+
+        if (path := next(token_iter, None)) is None or not path.is_word:
+            return FailedToParseError(
+                f"Error: syntax error, expected a path after {token.value!r}"
+            )
+
+        redirects.append(
+            Redirect(
+                path.value,
+                append=token.type is TokenType.REDIRECT_APPEND,
+                stderr=token.type is TokenType.REDIRECT_STDERR,
+            )
+        )
+
+    if not words:
+        return FailedToParseError("Error: syntax error, redirect without a command")
+
+    return ExecutableCommand(
+        [token.value for token in tokens],
+        words[0].value,
+        [token.value for token in words[1:]],
+        [token.quoted for token in words[1:]],
+        redirects,
+    )
+
+
+def parse_pipeline(tokens: list[Token]) -> Pipeline | Exception:
+    stages = list[ExecutableCommand]()
+    cur_tokens = list[Token]()
+    for token in (*tokens, Token(TokenType.PIPE, "|")):
+        if token.type is not TokenType.PIPE:
+            cur_tokens.append(token)
+            continue
+
+        if not cur_tokens:
+            return FailedToParseError("Error: syntax error, empty command in pipeline")
+        if cur_tokens[0].value.startswith("$"):
+            return ValueError(
+                "Error: syntax error, variables cannot be used in a pipeline: "
+                f"{cur_tokens[0].value}"
+            )
+
+        if isinstance(stage := make_executable_command(cur_tokens), Exception):
+            return stage
+        stages.append(stage)
+        cur_tokens = list[Token]()
+
+    return Pipeline([token.value for token in tokens], stages)
+
+
+def parse_background(tokens: list[Token]) -> Background | Exception:
+    if not tokens:
+        return FailedToParseError("Error: syntax error, '&' without a command")
+    if tokens[0].value.startswith("$"):
+        return ValueError(
+            "Error: syntax error, variables cannot be used in the background: "
+            f"{tokens[0].value}"
+        )
+
+    command: ExecutableCommand | Pipeline | Exception
+    if any(token.type is TokenType.PIPE for token in tokens):
+        command = parse_pipeline(tokens)
+    else:
+        command = make_executable_command(tokens)
+    if isinstance(command, Exception):
+        return command
+
+    return Background([*command.full_args, "&"], command)
+
+
+def parse_commands(commands: Sequence[list[Token]]) -> list[Command] | Exception:
     command_strings = list[Command]()
-    for arg_group in commands:
-        if not arg_group:
+    for token_group in commands:
+        if not token_group:
             return FailedToParseError("Error: failed to parse command")
 
+        if token_group[-1].type is TokenType.BACKGROUND:
+            if isinstance(job := parse_background(token_group[:-1]), Exception):
+                return job
+            command_strings.append(job)
+            continue
+
+        if any(token.type is TokenType.PIPE for token in token_group):
+            if isinstance(pipeline := parse_pipeline(token_group), Exception):
+                return pipeline
+            command_strings.append(pipeline)
+            continue
+
+        arg_group = [token.value for token in token_group]
         if arg_group[0].startswith("$"):
             if "=" in arg_group:
                 if len(arg_group) != 3:
@@ -93,37 +281,99 @@ def parse_commands(commands: Sequence[list[str]]) -> list[Command] | Exception:
 
                 command_strings.append(VariableReference(arg_group, arg_group[0]))
         else:
-            command_strings.append(
-                ExecutableCommand(arg_group, arg_group[0], arg_group[1:])
-            )
+            if isinstance(command := make_executable_command(token_group), Exception):
+                return command
+            command_strings.append(command)
 
     return command_strings
 
 
 def parse_string_command(
-    string_args: str, aliases: Mapping[str, list[str]]
+    string_args: str, expanded_aliases: Mapping[str, list[Token]]
 ) -> list[Command] | Exception:
-    lexer = shlex(string_args, punctuation_chars=True, posix=True)
-    lexer.whitespace_split = True
-    try:
-        args = list(lexer)
-    except ValueError as err:
-        return ValueError(f"Error: {err}")
-
-    cmd_groups = list[list[str]]()
-    cur_args = list[str]()
-    for arg in args:
-        if ";" in arg:
-            cmd_groups.append(cur_args)
-            cur_args = list[str]()
-            continue
-        cur_args.append(arg.replace("'", "").replace('"', ""))
+    if isinstance(tokens := tokenize(string_args), Exception):
+        return ValueError(f"Error: {tokens}")
+
+    return parse_commands(group_tokens(expand_aliases(tokens, expanded_aliases)))
+
+
+def copy_command(command: Command) -> Command:
+    # the interpreter substitutes variables into the arguments in place
+    changes = dict[str, Any]()
+    for command_field in fields(command):
+        if isinstance(value := getattr(command, command_field.name), Command):
+            changes[command_field.name] = copy_command(value)
+        elif isinstance(value, list):
+            changes[command_field.name] = [
+                copy_command(item) if isinstance(item, Command) else item
+                for item in value
+            ]
+    return replace(command, **changes)
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of parsed commands keyed by the command string and the version of
+    the alias table it was expanded with. Cached commands are never handed out, only
+    copies of them. It's shared by the forks of an interpreter, e.g. the stages of a
+    pipeline or the tasks of `parallel`, which may parse on several threads at once.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._aliases_version: int | None = None
+        self._cache = OrderedDict[str, list[Command]]()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{hits: {self.hits!r}, misses: {self.misses!r}, "
+            f"size: {len(self._cache)!r}, maxsize: {self.maxsize!r}}}"
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def parse(
+        self,
+        string_args: str,
+        expanded_aliases: Mapping[str, list[Token]],
+        aliases_version: int,
+    ) -> list[Command] | Exception:
+        with self._lock:
+            if aliases_version != self._aliases_version:
+                self._cache.clear()
+                self._aliases_version = aliases_version
+
+            if (commands := self._cache.get(string_args)) is not None:
+                self.hits += 1
+                self._cache.move_to_end(string_args)
+            else:
+                self.misses += 1
+
+        # cached commands are never changed, so they're copied & parsed without the lock
+        if commands is not None:
+            return [copy_command(command) for command in commands]
+
+        parsed = parse_string_command(string_args, expanded_aliases)
+        if isinstance(parsed, Exception):
+            return parsed
 
-    if cur_args:
-        cmd_groups.append(cur_args)  # remove remaing arguments left over
+        with self._lock:
+            # unless the aliases changed while parsing
+            if aliases_version == self._aliases_version:
+                self._cache[string_args] = parsed
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
 
-    return parse_commands(expand_aliases(cmd_groups, aliases))
+        return [copy_command(command) for command in parsed]
 
 
-def load_commands() -> dict[str, type[Executable]]:
-    return {command.command(): command for command in COMMANDS}
+def load_commands() -> CommandRegistry:
+    return CommandRegistry(COMMANDS)
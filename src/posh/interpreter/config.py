@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+from itertools import count
 from json import dump, load
 from pathlib import Path
-from shlex import shlex
 from string import whitespace
 from typing import Any, Self, cast
 
 from loguru import logger
 
 from ..colours import FgColour, add_colours
+from .commands import compile_aliases
+from .history_manager import FSYNC_POLICIES, FsyncPolicy
+from .lexer import Token, join_tokens, tokenize
+
+# shared between configs so that reloading the config also yields a new version
+_ALIAS_VERSIONS = count()
 
 
 class ColourConfig:
@@ -78,8 +84,13 @@ class Config:
         show_time: bool | None = None,
         show_username: bool | None = None,
         record_history: bool | None = None,
+        record_stats: bool | None = None,
         shorten_path: bool | None = None,
         shortened_path_length: int | None = None,
+        prompt_segments: list[str] | None = None,
+        history_fsync: str | None = None,
+        history_window: float | None = None,
+        history_database: bool | None = None,
         colours: dict[str, str] | None = None,
         aliases: dict[str, str] | None = None,
     ) -> None:
@@ -91,20 +102,60 @@ class Config:
         self.record_history = (
             record_history if record_history is not None else defaults[2]
         )
-        self.shorten_path = shorten_path if shorten_path is not None else defaults[3]
-        self.shortened_path_length = shortened_path_length or defaults[4]
-        self.colours = ColourConfig(**colours) if colours is not None else defaults[5]
+        self.record_stats = record_stats if record_stats is not None else defaults[3]
+        self.shorten_path = shorten_path if shorten_path is not None else defaults[4]
+        self.shortened_path_length = shortened_path_length or defaults[5]
+        self.prompt_segments = (
+            prompt_segments if prompt_segments is not None else defaults[6]
+        )
+        self.colours = ColourConfig(**colours) if colours is not None else defaults[10]
+        self.history_fsync = self.parse_fsync_policy(history_fsync) or defaults[7]
+        self.history_window = (
+            history_window if history_window is not None else defaults[8]
+        )
+        self.history_database = (
+            history_database if history_database is not None else defaults[9]
+        )
         self.aliases = (
-            self.parse_aliases(aliases) if aliases is not None else defaults[6]
+            self.parse_aliases(aliases) if aliases is not None else defaults[11]
         )
 
         self.check_aliases()
 
+    @property
+    def aliases(self) -> dict[str, list[Token]]:
+        return self._aliases
+
+    @aliases.setter
+    def aliases(self, aliases: dict[str, list[Token]]) -> None:
+        self._aliases = aliases
+        self._aliases_changed()
+
+    def _aliases_changed(self) -> None:
+        expanded_aliases, cycles = compile_aliases(self._aliases)
+        while cycles:
+            for cycle in cycles:
+                print(
+                    add_colours(
+                        f"Error: alias {cycle[0]!r} is recursive, {' -> '.join(cycle)}",
+                        self.colours.errors,
+                    )
+                )
+                for alias in cycle:
+                    self._aliases.pop(alias, None)
+            expanded_aliases, cycles = compile_aliases(self._aliases)
+
+        self.expanded_aliases = expanded_aliases
+        # anything caching the result of alias expansion should key on this version
+        self.aliases_version = next(_ALIAS_VERSIONS)
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.path!r}, {self.show_time}, {self.show_username}, "
-            f"{self.record_history}, {self.shorten_path}, {self.shortened_path_length}, "
-            f"{self.colours!r}, {self.aliases!r})"
+            f"{self.record_history}, {self.record_stats}, {self.shorten_path}, "
+            f"{self.shortened_path_length}, {self.prompt_segments!r}, {self.history_fsync!r}, "
+            f"{self.history_window}, {self.history_database}, {self.colours!r}, "
+            f"{self.aliases!r})"
         )
 
     @classmethod
@@ -125,19 +176,48 @@ class Config:
             return self
 
     @staticmethod
-    def get_defaults() -> (
-        tuple[bool, bool, bool, bool, int, ColourConfig, dict[str, list[str]]]
-    ):
+    def get_defaults() -> tuple[
+        bool,
+        bool,
+        bool,
+        bool,
+        bool,
+        int,
+        list[str],
+        FsyncPolicy,
+        float,
+        bool,
+        ColourConfig,
+        dict[str, list[Token]],
+    ]:
         # define all defaults for this class here
-        return (True, True, True, True, 40, ColourConfig(), {})
+        return (
+            True,
+            True,
+            True,
+            False,
+            True,
+            40,
+            ["time", "username", "path"],
+            "never",
+            0.05,
+            False,
+            ColourConfig(),
+            {},
+        )
 
     def set_defaults(self) -> None:
         (
             self.show_time,
             self.show_username,
             self.record_history,
+            self.record_stats,
             self.shorten_path,
             self.shortened_path_length,
+            self.prompt_segments,
+            self.history_fsync,
+            self.history_window,
+            self.history_database,
             self.colours,
             self.aliases,
         ) = self.get_defaults()
@@ -147,8 +227,13 @@ class Config:
             "show_time": self.show_time,
             "show_username": self.show_username,
             "record_history": self.record_history,
+            "record_stats": self.record_stats,
             "shorten_path": self.shorten_path,
             "shortened_path_length": self.shortened_path_length,
+            "prompt_segments": self.prompt_segments,
+            "history_fsync": self.history_fsync,
+            "history_window": self.history_window,
+            "history_database": self.history_database,
             "colours": {
                 "time": self.colours.time.name,
                 "current_path": self.colours.current_path.name,
@@ -157,9 +242,24 @@ class Config:
                 "file_path": self.colours.file_path.name,
                 "errors": self.colours.errors.name,
             },
-            "aliases": {alias: " ".join(arg) for alias, arg, in self.aliases.items()},
+            "aliases": {
+                alias: join_tokens(tokens) for alias, tokens in self.aliases.items()
+            },
         }
 
+    def parse_fsync_policy(self, string: str | None) -> FsyncPolicy | None:
+        if string is None:
+            return None
+
+        for policy in FSYNC_POLICIES:
+            if string == policy:
+                return policy
+
+        print(
+            add_colours(f"Error: invalid history_fsync {string!r}", self.colours.errors)
+        )
+        return None
+
     def write_to_json(self) -> None:
         try:
             with open(self.path, "w", encoding="utf8") as file:
@@ -183,20 +283,38 @@ class Config:
         for key in to_remove:
             self.aliases.pop(key)
 
-    def parse_aliases(self, aliases: dict[str, str]) -> dict[str, list[str]]:
-        parsed_aliases: dict[str, list[str]] = {}
-        for alias, args in aliases.items():
-            lexer = shlex(args)
-            lexer.whitespace_split = True
+        if to_remove:
+            self._aliases_changed()
+
+    def add_aliases(self, aliases: dict[str, str]) -> None | ValueError:
+        new_aliases = self.aliases | self.parse_aliases(aliases)
+
+        # reject cycles up front rather than dropping aliases which already existed
+        _, cycles = compile_aliases(new_aliases)
+        if cycles:
+            return ValueError(
+                f"Error: alias {cycles[0][0]!r} is recursive, {' -> '.join(cycles[0])}"
+            )
+
+        self.aliases = new_aliases
+        self.check_aliases()
+        return None
+
+    def remove_alias(self, alias: str) -> None:
+        self.aliases.pop(alias)
+        self._aliases_changed()
 
-            try:
-                parsed_aliases[alias] = list(lexer)
-            except ValueError as err:
+    def parse_aliases(self, aliases: dict[str, str]) -> dict[str, list[Token]]:
+        parsed_aliases: dict[str, list[Token]] = {}
+        for alias, args in aliases.items():
+            if isinstance(tokens := tokenize(args), ValueError):
                 print(
                     add_colours(
-                        f"Error: failed to create alias {alias!r}, {err}",
+                        f"Error: failed to create alias {alias!r}, {tokens}",
                         self.colours.errors,
                     )
                 )
                 continue
+
+            parsed_aliases[alias] = tokens
         return parsed_aliases
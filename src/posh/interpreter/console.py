@@ -1,102 +1,44 @@
 from __future__ import annotations
 
-from functools import cache
-from getpass import getuser
-from os import get_terminal_size
+import signal
 from pathlib import Path
-from time import strftime
+from time import perf_counter, time
+from typing import TYPE_CHECKING
 
-from ..colours import Meta, add_colours
-from .interpreter import Interpreter
+from ..colours import add_colours
+from .interpreter import ShellInterpreter
+from .prompt import Prompt
 
+if TYPE_CHECKING:
+    from .config import Config
 
-@cache
-def shorten_path(path: Path, length: int, root_str: str) -> str:
-    # makes sure at least the topmost directory is showing
-    parts = [path.name]
-    path = path.parent
 
-    while len(f"{root_str}{'/'.join(parts)}/{path.name}") < length:
-        parts.append(path.name)
-        path = path.parent
+class Console(ShellInterpreter):
+    def __init__(self, starting_directory: Path, config: Config | None = None) -> None:
+        super().__init__(starting_directory, config)
+        self.prompt = Prompt()
+        self.last_duration: float | None = None  # seconds the last command took
+        self._resolved_cwd: Path | None = None
 
-    return f"{root_str}{Path(*reversed(parts)).as_posix()}"
-
-
-class Console(Interpreter):
     def input_string(self) -> str:
-        output = ""
-
-        if self.config.show_time:
-            time_block = f"[{strftime('%X')}]"
-            output += add_colours(
-                f"{time_block:>{get_terminal_size().columns}}\r",
-                self.config.colours.time,
-                Meta.BOLD,
-            )
-
-        if self.config.show_username:
-            output += (
-                add_colours(getuser(), self.config.colours.username, Meta.BOLD) + ":"
-            )
-
         # resolve the cwd if the user deletes it
         while not self.cwd.exists():
             self.cwd = self.cwd.parent
 
-        # fixes capitilization of cwd
-        self.cwd = self.cwd.resolve()
+        # fixes capitilization of cwd, which only needs to be done once it changes
+        if self.cwd != self._resolved_cwd:
+            self.cwd = self._resolved_cwd = self.cwd.resolve()
 
-        if self.config.shorten_path:
-            if self.cwd == Path.home():
-                output += add_colours("~", self.config.colours.current_path, Meta.BOLD)
-            elif self.cwd.is_relative_to(Path.home()):
-                relative_path = self.cwd.relative_to(Path.home())
-                relative_path_string = relative_path.as_posix()
-                if len(relative_path_string) > self.config.shortened_path_length:
-                    output += add_colours(
-                        shorten_path(
-                            relative_path,
-                            self.config.shortened_path_length,
-                            "~/.../",
-                        ),
-                        self.config.colours.current_path,
-                        Meta.BOLD,
-                    )
-                else:
-                    output += add_colours(
-                        f"~/{relative_path_string}",
-                        self.config.colours.current_path,
-                        Meta.BOLD,
-                    )
-            elif len(str(self.cwd)) > self.config.shortened_path_length:
-                output += add_colours(
-                    shorten_path(
-                        self.cwd,
-                        self.config.shortened_path_length,
-                        f"{Path(Path.home().anchor).as_posix()}.../",
-                    ),
-                    self.config.colours.current_path,
-                    Meta.BOLD,
-                )
-            else:
-                output += add_colours(
-                    self.cwd.as_posix(),
-                    self.config.colours.current_path,
-                    Meta.BOLD,
-                )
-        else:
-            output += add_colours(
-                self.cwd.as_posix(),
-                self.config.colours.current_path,
-                Meta.BOLD,
-            )
-
-        return output
+        return self.prompt.render(self)
 
     def main(self) -> None:
+        if hasattr(signal, "SIGWINCH"):
+            signal.signal(signal.SIGWINCH, self.prompt.terminal_resized)
+
         while True:
             try:
+                # completion notices of background jobs are printed before the prompt
+                self.report_jobs()
                 try:
                     string_input = input(f"{self.input_string()} $ ").strip()
                 except EOFError:
@@ -107,7 +49,16 @@ class Console(Interpreter):
 
                 self.write_history(string_input)
 
-                err = self.interpret_command(string_input)
+                cwd, started, start = self.cwd, time(), perf_counter()
+                failed = True  # unless it finishes without an error, e.g. on ctrl-c
+                try:
+                    err = self.interpret_command(string_input)
+                    failed = err is not None
+                finally:
+                    self.last_duration = perf_counter() - start
+                    self.record_history(
+                        string_input, cwd, started, self.last_duration, failed
+                    )
                 if err is not None:
                     print(add_colours(str(err), self.config.colours.errors))
             except KeyboardInterrupt:  # allows the user to exit out of running cmd
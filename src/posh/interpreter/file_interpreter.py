@@ -2,7 +2,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from ..colours import add_colours
-from .interpreter import Interpreter
+from .interpreter import ShellInterpreter
+from .script import CompiledScript, ScriptSyntaxError, load_script
 
 
 @dataclass
@@ -30,41 +31,26 @@ class Traceback:
         )
 
 
-class FileIntepreter(Interpreter):
+class FileIntepreter(ShellInterpreter):
+    records_history = False
+
     def __init__(self, starting_directory: Path, file: Path) -> None:
         super().__init__(starting_directory)
-        self.config.record_history = False
         self.file_path = file
 
-    def main(self) -> None:
+    @property
+    def cache_directory(self) -> Path | None:
+        if not self.data_directory.exists():
+            return None
+        return self.data_directory / "cache"
+
+    def print_traceback(self, traceback: Traceback) -> None:
+        print(add_colours(traceback.format_traceback(), self.config.colours.errors))
+
+    def compile(self) -> CompiledScript | None:
+        """Compile the whole script up front, printing any errors found."""
         try:
-            with open(self.file_path, "rb") as file:
-                for index, line_bytes in enumerate(file, start=1):
-                    try:
-                        line = line_bytes.decode("utf8").strip()
-                    except UnicodeDecodeError as err:
-                        print(
-                            add_colours(
-                                f"Error: parsing failed on line {index} in file "
-                                f"{self.file_path.as_posix()!r}, {err}"
-                            )
-                        )
-                        return
-                    try:
-                        error: BaseException | None = self.interpret_command(line)
-                    except KeyboardInterrupt:
-                        error = KeyboardInterrupt("Error: KEYBOARD INTERRUPT")
-
-                    if error is not None:
-                        print(
-                            add_colours(
-                                Traceback(
-                                    error, self.file_path, line, index
-                                ).format_traceback(),
-                                self.config.colours.errors,
-                            )
-                        )
-                        return
+            script = load_script(self.file_path, self.cache_directory)
         except OSError as err:
             print(
                 add_colours(
@@ -72,5 +58,43 @@ class FileIntepreter(Interpreter):
                     self.config.colours.errors,
                 )
             )
+            return None
+
+        if isinstance(script, ScriptSyntaxError):
+            self.print_traceback(
+                Traceback(script, self.file_path, script.line, script.line_no)
+            )
+            return None
+
+        return script
+
+    def check(self) -> bool:
+        return self.compile() is not None
+
+    def main(self) -> None:
+        if (script := self.compile()) is None:
+            return
+
+        try:
+            for line in script.lines:
+                try:
+                    error: BaseException | None
+                    if isinstance(
+                        commands := line.parse(self.config.expanded_aliases), Exception
+                    ):
+                        error = commands
+                    else:
+                        error = self.execute_commands(commands)
+                except KeyboardInterrupt:
+                    error = KeyboardInterrupt("Error: KEYBOARD INTERRUPT")
+
+                if error is not None:
+                    self.print_traceback(
+                        Traceback(error, self.file_path, line.line, line.line_no)
+                    )
+                    return
+                self.report_jobs()
+
+            self.report_jobs(wait=True)
         except KeyboardInterrupt:
             print(add_colours("Error: KEYBOARD INTERUPT", self.config.colours.errors))
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING, Iterable
+
+from .history_manager import HistoryRecord
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .history_manager import FsyncPolicy
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    command TEXT NOT NULL,
+    cwd TEXT,
+    started REAL,
+    duration REAL,
+    session TEXT,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS history_cwd ON history (cwd, started);
+CREATE INDEX IF NOT EXISTS history_failed ON history (started) WHERE failed;
+CREATE INDEX IF NOT EXISTS history_duration ON history (duration);
+CREATE INDEX IF NOT EXISTS history_started ON history (started);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+_COLUMNS = "command, cwd, started, duration, session, failed"
+
+# how much sqlite syncs for each fsync policy of the history, with the write ahead log
+# `NORMAL` only syncs when the log is checkpointed
+_SYNCHRONOUS: dict[FsyncPolicy, str] = {
+    "never": "OFF",
+    "batch": "FULL",
+    "interval": "NORMAL",
+}
+
+
+class HistoryDatabase:
+    """
+    Records of the history in sqlite, with indexes for looking them up by cwd, failure
+    & duration. It isn't thread safe, the history manager holds its lock while using it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._synchronous: str | None = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__} {{path: {self.path!r}}}"
+
+    def connect(self) -> tuple[sqlite3.Connection, bool]:
+        """Return the connection, opened if needed, & whether the database is new."""
+        if self._connection is not None:
+            return self._connection, False
+
+        # the history manager's lock is held by whichever thread uses the connection
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            created = connection.execute("PRAGMA user_version").fetchone()[0] == 0
+            if created:
+                with connection:
+                    connection.executescript(_SCHEMA)
+                    connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._connection = connection
+        self._synchronous = None
+        return connection, created
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def add(self, records: Iterable[HistoryRecord], fsync: FsyncPolicy) -> None:
+        """Insert records in a single transaction."""
+        connection, _ = self.connect()
+        if self._synchronous != _SYNCHRONOUS[fsync]:
+            self._synchronous = _SYNCHRONOUS[fsync]
+            connection.execute(f"PRAGMA synchronous={self._synchronous}")
+        with connection:
+            connection.executemany(
+                f"INSERT INTO history ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (record.as_row() for record in records),
+            )
+
+    def import_commands(self, commands: Iterable[str]) -> int:
+        """
+        Insert bare records of commands from the text history, along with marking the
+        history as imported, in a single transaction. The history is only imported once.
+        """
+        connection, _ = self.connect()
+        with connection:
+            if self.get_meta("imported") is not None:
+                raise ValueError("the history has already been imported")
+            cursor = connection.executemany(
+                "INSERT INTO history (command) VALUES (?)",
+                ((command,) for command in commands),
+            )
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('imported', ?)",
+                (cursor.rowcount,),
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        connection, _ = self.connect()
+        with connection:
+            connection.execute("DELETE FROM history")
+            connection.execute("DELETE FROM meta WHERE key = 'imported'")
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('text_lines', 0)"
+            )
+
+    def get_meta(self, key: str) -> object:
+        connection, _ = self.connect()
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        return None if (value := row.fetchone()) is None else value[0]
+
+    def set_meta(self, key: str, value: object) -> None:
+        connection, _ = self.connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def _select(
+        self, where: str, order: str, *args: object, index: str | None = None
+    ) -> list[HistoryRecord]:
+        connection, _ = self.connect()
+        indexed_by = "" if index is None else f" INDEXED BY {index}"
+        rows = connection.execute(
+            f"SELECT {_COLUMNS} FROM history{indexed_by} WHERE {where} "
+            f"ORDER BY {order} LIMIT ?",
+            args,
+        )
+        return [
+            HistoryRecord(command, cwd, started, duration, session, bool(failed))
+            for command, cwd, started, duration, session, failed in rows
+        ]
+
+    def in_directory(
+        self, cwd: str, since: float | None, limit: int
+    ) -> list[HistoryRecord]:
+        """The newest commands run in a directory."""
+        return self._select(
+            "cwd = ? AND started >= ?", "started DESC", cwd, since or 0, limit
+        )
+
+    def failed(self, since: float | None, limit: int) -> list[HistoryRecord]:
+        """The newest commands which failed."""
+        return self._select(
+            "failed AND started >= ?", "started DESC", since or 0, limit
+        )
+
+    def slowest(self, since: float | None, limit: int) -> list[HistoryRecord]:
+        """The commands which took the longest."""
+        if since is None:
+            # without a filter the index on the duration is read from the end
+            return self._select("duration IS NOT NULL", "duration DESC", limit)
+        # otherwise only the commands since are sorted, rather than reading the index
+        # on the duration until enough of them are found, which may be all of them
+        return self._select(
+            "started >= ? AND duration IS NOT NULL",
+            "duration DESC",
+            since,
+            limit,
+            index="history_started",
+        )
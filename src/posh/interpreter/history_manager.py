@@ -1,26 +1,134 @@
 from __future__ import annotations
 
+import os
+import sys
+from array import array
 from atexit import register
+from bisect import bisect_left, bisect_right
 from contextlib import contextmanager
+from dataclasses import dataclass
+from io import FileIO
+from mmap import ACCESS_READ, mmap
 from pathlib import Path
 from queue import SimpleQueue
+from struct import Struct
 from threading import Event, Lock, Thread
-from typing import TYPE_CHECKING, Iterator, NoReturn, TextIO
+from time import monotonic, sleep, time
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Literal, NoReturn, TextIO
+from uuid import uuid4
 
 from loguru import logger
 
+if sys.platform != "win32":
+    from fcntl import LOCK_EX, LOCK_UN, flock
+
 if TYPE_CHECKING:
+    from re import Pattern
+
     from _typeshed import OpenTextMode
 
+    from .history_database import HistoryDatabase
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """A command with where, when & how it ran, those imported from text are bare."""
+
+    command: str
+    cwd: str | None = None
+    started: float | None = None  # unix timestamp
+    duration: float | None = None  # seconds
+    session: str | None = None
+    failed: bool = False
+
+    def as_row(self) -> tuple[object, ...]:
+        return (
+            self.command,
+            self.cwd,
+            self.started,
+            self.duration,
+            self.session,
+            self.failed,
+        )
+
 
 class ManagerExistsError(Exception):
     ...
 
 
+INDEX_SUFFIX = ".idx"
+# the sidecar starts with the number of lines it indexes & the size of the history
+# they make up, followed by the offset of the end of each line
+_INDEX_HEADER = Struct("<QQ")
+_READ_SIZE = 1024 * 1024
+_SEARCH_SIZE = 256 * 1024  # bytes searched at once, newest first
+_IMPORT_SIZE = 100_000  # lines read at once while importing the history
+
+# when appended lines are flushed to disk, never (left to the os), after every batch
+# of lines or at most once per `fsync_interval`
+FsyncPolicy = Literal["never", "batch", "interval"]
+FSYNC_POLICIES: tuple[FsyncPolicy, ...] = ("never", "batch", "interval")
+
+
+def index_lines(file: BinaryIO, start: int) -> array[int]:
+    """Return the offset of the end of every complete line in a file after `start`."""
+    ends = array("Q")
+    file.seek(start)
+    position = start
+    while block := file.read(_READ_SIZE):
+        index = block.find(b"\n")
+        while index != -1:
+            ends.append(position + index + 1)
+            index = block.find(b"\n", index + 1)
+        position += len(block)
+    return ends
+
+
+@contextmanager
+def lock_file(file: BinaryIO) -> Iterator[None]:
+    """
+    Hold an advisory lock on a file, which every posh session takes before appending to
+    the history. There are no advisory locks on windows, where appends rely on O_APPEND.
+    """
+    if sys.platform == "win32":
+        yield
+        return
+
+    flock(file.fileno(), LOCK_EX)
+    try:
+        yield
+    finally:
+        flock(file.fileno(), LOCK_UN)
+
+
 class HistoryManager:
+    """
+    Appends commands to the history file on a background thread & keeps an index of
+    the offset where every line ends, so that any line, or the last N lines, can be
+    read without reading the whole file. The index is saved next to the history in a
+    sidecar file, which is extended as lines are added, so it's only built once.
+
+    Every posh session appends to the same history, so each batch of lines is written
+    by a single write while holding a lock on the file, after indexing the lines other
+    sessions added since, which are kept until they're read by `sync`.
+
+    Optionally records of every command, with their cwd, duration & whether they failed,
+    are also written to a sqlite database, by the same thread.
+
+    The writer keeps the file open & waits `window` seconds after a command is added,
+    so that the commands added meanwhile, e.g. by a script, are written at once.
+    """
+
     _used_paths = set[Path]()
 
-    def __init__(self, path: Path) -> None:
+    def __init__(
+        self,
+        path: Path,
+        window: float = 0.05,
+        fsync: FsyncPolicy = "never",
+        fsync_interval: float = 1,
+        database: Path | None = None,
+    ) -> None:
         if not path.exists():
             raise FileNotFoundError(f"object @ {path!r} does not exist")
         if path in HistoryManager._used_paths:
@@ -30,17 +138,37 @@ class HistoryManager:
 
         HistoryManager._used_paths.add(path)
         self.id = next(self._generate_id())
+        self.session = uuid4().hex[:12]  # identifies this session's records
         self._path = path
+        self._index_path = path.with_suffix(INDEX_SUFFIX)
+        # None until the index is first needed
+        self._ends: array[int] | None = None
+        self.window = window  # seconds
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval  # seconds
+        # opened by the first write & kept open, None while closed
+        self._file: FileIO | None = None
+        # the lines added by other sessions which haven't been read by `sync`, the lines
+        # after `_seen_size` are added to them once the index is loaded
+        self._unseen = list[range]()
+        self._seen_size: int | None = path.stat().st_size
+        self._synced = True
+        self._last_sync = monotonic()
         self._queue = SimpleQueue[str]()
+        self._records = SimpleQueue[HistoryRecord]()
         self._event = Event()
         self._lock = Lock()
+        self.database: HistoryDatabase | None = None
+        self._database_since = 0.0  # unix timestamp the database was used from
+        if database is not None:
+            self.use_database(database)
         self._thread = Thread(
             name=f"HistoryManager_{self.id}",
             target=self._threaded_writer,
             daemon=True,
         )
         self._thread.start()
-        register(self._process_queue)
+        register(self.close)
 
     def __repr__(self) -> str:
         return (
@@ -62,6 +190,13 @@ class HistoryManager:
     def get_file(self, mode: OpenTextMode) -> Iterator[TextIO]:
         self._process_queue()
         self._lock.acquire()
+        if "r" not in mode or "+" in mode:
+            # the file may change, so it's opened again for the next write & the index
+            # is checked again
+            self._close_file()
+            self._ends = None
+            self._seen_size = None
+            self._unseen.clear()
         file = open(self._path, mode, encoding="utf8")
 
         try:
@@ -70,26 +205,409 @@ class HistoryManager:
             file.close()
             self._lock.release()
 
+    def _read_index(self, file: BinaryIO) -> array[int]:
+        # the lock on the history must be held, a sidecar which doesn't match the
+        # history, e.g. after it was edited or a session crashed while saving it, is
+        # rebuilt from scratch
+        ends = array("Q")
+        try:
+            with open(self._index_path, "rb") as index_file:
+                header = index_file.read(_INDEX_HEADER.size)
+                if len(header) != _INDEX_HEADER.size:
+                    return ends
+                count, indexed_size = _INDEX_HEADER.unpack(header)
+                size = os.fstat(index_file.fileno()).st_size
+                if size != _INDEX_HEADER.size + count * ends.itemsize:
+                    return ends
+                ends.fromfile(index_file, count)
+        except (OSError, EOFError):
+            return array("Q")
+
+        if not ends or ends[-1] != indexed_size:
+            return array("Q")
+        if indexed_size > os.fstat(file.fileno()).st_size:
+            return array("Q")
+        file.seek(indexed_size - 1)
+        if file.read(1) != b"\n":
+            return array("Q")
+        return ends
+
+    def _load_index(self) -> array[int]:
+        """Load the index from the sidecar, indexing any lines added since it was saved."""
+        if self._ends is not None:
+            return self._ends
+
+        with open(self._path, "rb") as file, lock_file(file):
+            ends = self._read_index(file)
+            saved = len(ends)
+            ends.extend(index_lines(file, ends[-1] if ends else 0))
+            self._ends = ends
+            self._save_index(len(ends) - saved, rewrite=not saved)
+
+        if self._seen_size is not None:
+            first = bisect_right(ends, self._seen_size)
+            if first < len(ends):
+                self._unseen.insert(0, range(first, len(ends)))
+            self._seen_size = None
+        return ends
+
+    def _indexed_size(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def _save_index(self, added: int, rewrite: bool = False) -> None:
+        # the lock on the history must be held. The sidecar is shared by every session,
+        # so it may already have some of the lines, if it's behind the lines before
+        # those added, or ahead of the index, it's written again. The entries are
+        # written before the header, so a sidecar left half written doesn't match it
+        assert self._ends is not None
+        try:
+            descriptor = os.open(self._index_path, os.O_RDWR | os.O_CREAT, 0o644)
+            with open(descriptor, "r+b") as index_file:
+                saved = 0
+                header = index_file.read(_INDEX_HEADER.size)
+                if not rewrite and len(header) == _INDEX_HEADER.size:
+                    saved = _INDEX_HEADER.unpack(header)[0]
+                if not len(self._ends) - added <= saved <= len(self._ends):
+                    saved = 0
+                size = os.fstat(index_file.fileno()).st_size
+                if saved == len(self._ends) and size == _INDEX_HEADER.size + (
+                    saved * self._ends.itemsize
+                ):
+                    return  # already up to date
+
+                index_file.seek(_INDEX_HEADER.size + saved * self._ends.itemsize)
+                index_file.truncate()
+                self._ends[saved:].tofile(index_file)
+                index_file.flush()
+                index_file.seek(0)
+                index_file.write(
+                    _INDEX_HEADER.pack(len(self._ends), self._indexed_size())
+                )
+        except OSError as err:
+            logger.error(f"failed to save the history index, {err}")
+
+    def _extend_index(self, ends: array[int]) -> None:
+        if self._ends is None or not ends:
+            return
+        self._ends.extend(ends)
+        self._save_index(len(ends))
+
+    def _catch_up(self, file: BinaryIO) -> None:
+        """Index the lines other sessions added since the end of the index."""
+        assert self._ends is not None
+        start = len(self._ends)
+        self._extend_index(index_lines(file, self._indexed_size()))
+        if len(self._ends) > start:
+            self._unseen.append(range(start, len(self._ends)))
+
+    def __len__(self) -> int:
+        self._process_queue()
+        with self._lock:
+            return len(self._load_index())
+
+    def _read_lines(self, start: int, stop: int) -> list[str]:
+        # the lock must be held & the index loaded
+        assert self._ends is not None
+        if start >= stop:
+            return []
+        begin = self._ends[start - 1] if start > 0 else 0
+        with open(self._path, "rb") as file:
+            file.seek(begin)
+            data = file.read(self._ends[stop - 1] - begin)
+        lines = data.decode("utf8", errors="replace").removesuffix("\n").split("\n")
+        return [line.removesuffix("\r") for line in lines]
+
+    def get_line(self, index: int) -> str:
+        """Return a line of the history, negative indexes count from the end."""
+        self._process_queue()
+        with self._lock:
+            if not (length := len(self._load_index())):
+                raise IndexError("the history is empty")
+            if not -length <= index < length:
+                raise IndexError(
+                    f"index out of range, index {index}, range {-length} to {length - 1}"
+                )
+            index %= length
+            return self._read_lines(index, index + 1)[0]
+
+    def tail(self, count: int) -> tuple[int, list[str]]:
+        """Return the index of the first of the last `count` lines, & the lines."""
+        self._process_queue()
+        with self._lock:
+            length = len(self._load_index())
+            start = max(0, length - count)
+            return start, self._read_lines(start, length)
+
+    def search(
+        self,
+        pattern: Pattern[bytes],
+        limit: int | None = None,
+        unique: bool = False,
+        stop: int | None = None,
+    ) -> list[tuple[int, str]]:
+        """
+        Return the index & text of the lines which match a pattern, newest first, out
+        of the lines before `stop`, which can be negative like a slice. The file is
+        searched as bytes, in chunks from the end, so only matching lines are decoded
+        & the search stops once it has `limit` results.
+        """
+        self._process_queue()
+        results = list[tuple[int, str]]()
+        seen = set[bytes]()
+        with self._lock:
+            ends = self._load_index()
+            stop_line = slice(stop).indices(len(ends))[1]
+            if not stop_line:
+                return results
+
+            with (
+                open(self._path, "rb") as file,
+                mmap(file.fileno(), ends[stop_line - 1], access=ACCESS_READ) as data,
+            ):
+                while stop_line > 0:
+                    # a chunk of whole lines ending at `stop_line`
+                    chunk_end = ends[stop_line - 1]
+                    start_line = min(
+                        bisect_left(ends, chunk_end - _SEARCH_SIZE, 0, stop_line),
+                        stop_line - 1,
+                    )
+                    position = ends[start_line - 1] if start_line else 0
+
+                    matches = list[int]()
+                    while match := pattern.search(data, position, chunk_end):
+                        line = bisect_right(ends, match.start(), start_line, stop_line)
+                        if line == stop_line:  # an empty match at the end of the chunk
+                            break
+                        matches.append(line)
+                        position = ends[line]  # one match per line is enough
+
+                    for line in reversed(matches):
+                        text = data[ends[line - 1] if line else 0 : ends[line]]
+                        if unique:
+                            if text in seen:
+                                continue
+                            seen.add(text)
+                        results.append(
+                            (line, text.decode("utf8", errors="replace").rstrip("\r\n"))
+                        )
+                        if limit is not None and len(results) >= limit:
+                            return results
+
+                    stop_line = start_line
+        return results
+
+    def sync(self) -> list[tuple[int, str]]:
+        """
+        Return the index & text of the lines added by other sessions since the last
+        sync, only the lines added since the end of the index are read.
+        """
+        self._process_queue()
+        with self._lock:
+            self._load_index()
+            with open(self._path, "rb") as file, lock_file(file):
+                self._catch_up(file)
+
+            lines = list[tuple[int, str]]()
+            for unseen in self._unseen:
+                lines.extend(zip(unseen, self._read_lines(unseen.start, unseen.stop)))
+            self._unseen.clear()
+            return lines
+
+    def clear(self) -> None:
+        self._process_queue()
+        with self._lock:
+            self._close_file()
+            self._unseen.clear()
+            self._seen_size = None
+            with open(self._path, "ab") as file, lock_file(file):
+                file.truncate(0)
+                self._ends = array("Q")
+                self._save_index(0, rewrite=True)
+            if self.database is not None:
+                import sqlite3  # pylint: disable=import-outside-toplevel
+
+                try:
+                    self.database.clear()
+                except sqlite3.Error as err:
+                    logger.error(f"failed to clear the history database, {err}")
+
     def add(self, cmd: str) -> None:
         self._queue.put(cmd, block=False)
         self._event.set()
 
+    def record(self, record: HistoryRecord) -> None:
+        """Queue a record of a command which finished, if the database is in use."""
+        # commands which started before, e.g. the one which enabled the database, have
+        # their text line imported instead
+        if self.database is None or (record.started or 0) < self._database_since:
+            return
+        record.session = self.session
+        self._records.put(record, block=False)
+        self._event.set()
+
+    def use_database(self, path: Path | None) -> None:
+        """Start writing records to the database at `path`, or stop if it's None."""
+        self._process_queue()
+        with self._lock:
+            if self.database is not None and self.database.path == path:
+                return
+            if self.database is not None:
+                self.database.close()
+                self.database = None
+            if path is None:
+                return
+
+            # imported here since sqlite is only needed once the database is enabled
+            # pylint: disable-next=import-outside-toplevel
+            import sqlite3
+
+            # pylint: disable-next=import-outside-toplevel
+            from .history_database import HistoryDatabase
+
+            database = HistoryDatabase(path)
+            try:
+                _, created = database.connect()
+                if created:
+                    # the lines before the database was created are imported by
+                    # `import_history`, those after it are recorded in both
+                    database.set_meta("text_lines", len(self._load_index()))
+            except (sqlite3.Error, OSError) as err:
+                logger.error(f"failed to open the history database, {err}")
+                database.close()
+                return
+            self.database = database
+            self._database_since = time()
+
+    @contextmanager
+    def get_database(self) -> Iterator[HistoryDatabase]:
+        """Hold the lock on the database, after writing the queued records to it."""
+        self._process_queue()
+        with self._lock:
+            if self.database is None:
+                raise LookupError("the history database isn't in use")
+            yield self.database
+
+    def import_history(self) -> int:
+        """Import the commands of the text history from before the database existed."""
+        with self.get_database() as database:
+            text_lines = database.get_meta("text_lines")
+            stop = min(
+                text_lines if isinstance(text_lines, int) else 0,
+                len(self._load_index()),
+            )
+            return database.import_commands(
+                line
+                for start in range(0, stop, _IMPORT_SIZE)
+                for line in self._read_lines(start, min(start + _IMPORT_SIZE, stop))
+            )
+
+    def _close_file(self) -> None:
+        # the lock must be held
+        if self._file is None:
+            return
+        try:
+            if not self._synced:
+                self._sync()
+            self._file.close()
+        except OSError as err:
+            logger.error(err)
+        finally:
+            self._file = None
+
+    def _sync(self) -> None:
+        # the lock must be held & the file open
+        assert self._file is not None
+        os.fsync(self._file.fileno())
+        self._synced = True
+        self._last_sync = monotonic()
+
+    def _write(self, lines: list[str]) -> None:
+        # the lock must be held
+        self._load_index()
+        if self._file is None:
+            # unbuffered, so that each batch is a single write, which O_APPEND keeps in
+            # one piece even if another session appends at the same time
+            self._file = open(  # pylint: disable=consider-using-with
+                self._path, "a+b", buffering=0
+            )
+
+        blocks = [f"{line}\n".encode("utf8") for line in lines]
+        data = b"".join(blocks)
+        with lock_file(self._file):
+            self._catch_up(self._file)
+            start = os.fstat(self._file.fileno()).st_size
+            written = 0
+            while written < len(data):
+                written += self._file.write(data[written:]) or 0
+            end = os.fstat(self._file.fileno()).st_size
+
+        if end - start != len(data) or start != self._indexed_size():
+            # without a lock another session wrote at the same time, so where the
+            # lines ended up isn't known & they're indexed again by the next read
+            self._ends = None
+            self._seen_size = end
+        else:
+            ends = array("Q")
+            for block in blocks:
+                start += len(block)
+                ends.append(start)
+            self._extend_index(ends)
+
+        self._synced = False
+        if self.fsync == "batch" or (
+            self.fsync == "interval"
+            and monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync()
+
     def _process_queue(self) -> None:
-        lines = list[str]()
-        while not self._queue.empty():
-            lines.append(self._queue.get())
+        with self._lock:
+            lines = list[str]()
+            while not self._queue.empty():
+                lines.append(self._queue.get())
+
+            records = list[HistoryRecord]()
+            while not self._records.empty():
+                records.append(self._records.get())
+            if records and self.database is not None:
+                import sqlite3  # pylint: disable=import-outside-toplevel
 
-        if lines:
-            with self._lock:
                 try:
-                    with open(self._path, "a", encoding="utf8") as file:
-                        file.writelines(f"{line}\n" for line in lines)
-                except OSError as err:
-                    logger.error(err)
+                    self.database.add(records, self.fsync)
+                except sqlite3.Error as err:
+                    logger.error(f"failed to write to the history database, {err}")
+
+            try:
+                if lines:
+                    self._write(lines)
+                # lines left unsynced by the interval policy once commands stop
+                elif (
+                    not self._synced
+                    and self._file is not None
+                    and self.fsync == "interval"
+                    and monotonic() - self._last_sync >= self.fsync_interval
+                ):
+                    self._sync()
+            except OSError as err:
+                logger.error(err)
+
+    def close(self) -> None:
+        """Write any queued lines & close the file, it's opened again if needed."""
+        self._process_queue()
+        with self._lock:
+            self._close_file()
+            if self.database is not None:
+                self.database.close()
+
+    def _sync_timeout(self) -> float | None:
+        if self._synced or self.fsync != "interval":
+            return None
+        return max(0, self._last_sync + self.fsync_interval - monotonic())
 
     @logger.catch
     def _threaded_writer(self) -> NoReturn:
         while True:
-            self._event.wait()
-            self._process_queue()
+            if self._event.wait(self._sync_timeout()) and self.window > 0:
+                sleep(self.window)  # lets the commands which follow join the batch
             self._event.clear()
+            self._process_queue()
@@ -1,33 +1,80 @@
 from __future__ import annotations
 
+import sys
 from abc import ABC, abstractmethod
+from contextlib import ExitStack, closing, suppress
+from contextvars import copy_context
+from copy import copy
+from io import StringIO
 from os import getpid
 from pathlib import Path
+from threading import Thread
+from typing import TYPE_CHECKING, ClassVar, Self
 
 from loguru import logger
 
+from ..colours import add_colours
+from ..commands.file_system.path_utils import parse_path
 from .commands import (
+    Background,
+    Command,
     ExecutableCommand,
+    ParseCache,
+    Pipeline,
+    Redirect,
     VariableDeclaration,
     VariableReference,
     load_commands,
-    parse_string_command,
 )
 from .config import Config
-from .history_manager import HistoryManager
+from .history_manager import HistoryManager, HistoryRecord
+from .jobs import Job, JobTable
+from .metrics import StatsLog, measure
+from .profiling import profiled
+from .streams import (
+    InputStream,
+    OutputSink,
+    OutputStream,
+    Pipe,
+    open_redirect,
+    os_pipe,
+)
+
+if TYPE_CHECKING:
+    from ..commands import Executable
 
 
 class UnknownCommandError(Exception):
     ...
 
 
-class Interpreter(ABC):
-    def __init__(self, starting_directory: Path) -> None:
+class Interpreter:
+    """
+    Runs commands for whatever drives it, e.g. a `Session` or a worker process of
+    `parallel`, see `ShellInterpreter` for those which drive themselves.
+    """
+
+    # interpreters which don't record history leave `record_history` of the config as
+    # it is, since the config may be saved back to the user's config file
+    records_history: ClassVar[bool] = True
+
+    def __init__(self, starting_directory: Path, config: Config | None = None) -> None:
         self.cwd = starting_directory
         self.variables = dict[str, str]()
+        # None means the process' own stdin
+        self.stdin: InputStream | None = None
+        self.stdout: OutputStream = OutputSink()
+        # whether the line being run was written to the history, as its last line
+        self.in_history = False
+        self.stderr: OutputStream = OutputSink(sys.stderr, buffer_size=0)
         self.project_dir = Path(__file__).parent.parent
         self.data_directory = self.project_dir / "data"
-        if not self.data_directory.exists():
+        if config is not None:
+            # handed over by another interpreter, e.g. to a worker process, which also
+            # keeps the history
+            self.config = config
+            self.history_manager = None
+        elif not self.data_directory.exists():
             self.config = Config(self.data_directory / "config.json")
             logger.warning("data directory couldn't be found")
             self.history_manager = None
@@ -35,15 +82,30 @@ class Interpreter(ABC):
             self.config = Config.from_json(self.data_directory / "config.json")
 
             if (history_path := self.data_directory / "history.txt").exists():
-                self.history_manager = HistoryManager(history_path)
+                self.history_manager = HistoryManager(
+                    history_path, self.config.history_window, self.config.history_fsync
+                )
             else:
                 try:
                     history_path.touch()
-                    self.history_manager = HistoryManager(history_path)
+                    self.history_manager = HistoryManager(
+                        history_path,
+                        self.config.history_window,
+                        self.config.history_fsync,
+                    )
                 except OSError as err:
                     logger.error(f"couldn't create history file, {err}")
                     self.history_manager = None
+            self.configure_history()
         self.commands = load_commands()
+        self.parse_cache = ParseCache()
+        self.jobs = JobTable()
+        # only written to when `record_stats` is enabled
+        self.stats_log = (
+            StatsLog(self.data_directory / "stats.jsonl")
+            if config is None and self.data_directory.exists()
+            else None
+        )
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}{{pid: {getpid()!r}, cwd: {self.cwd!r}}}"
@@ -53,45 +115,318 @@ class Interpreter(ABC):
             self.config = Config(self.config.path)
         else:
             self.config = Config.from_json(self.data_directory / "config.json")
+        self.configure_history()
 
-    def write_history(self, cmd: str) -> None:
-        if not self.config.record_history or self.history_manager is None:
+    def configure_history(self) -> None:
+        """Apply the history options of the config to the history manager."""
+        if self.history_manager is None:
             return
-        self.history_manager.add(cmd)
+        self.history_manager.window = self.config.history_window
+        self.history_manager.fsync = self.config.history_fsync
+        self.history_manager.use_database(
+            self.data_directory / "history.db" if self.config.history_database else None
+        )
+
+    def write_history(self, cmd: str) -> bool:
+        """Add a line which is about to run to the history, returning if it was."""
+        if (
+            not self.records_history
+            or not self.config.record_history
+            or self.history_manager is None
+        ):
+            self.in_history = False
+        else:
+            self.history_manager.add(cmd)
+            self.in_history = True
+        return self.in_history
+
+    def record_history(
+        self, cmd: str, cwd: Path, started: float, duration: float, failed: bool
+    ) -> None:
+        """Record a command which finished in the history database, if it's in use."""
+        if (
+            not self.records_history
+            or not self.config.record_history
+            or self.history_manager is None
+        ):
+            return
+        self.history_manager.record(
+            HistoryRecord(cmd, cwd.as_posix(), started, duration, failed=failed)
+        )
+
+    def fork(self) -> Self:
+        """
+        Create a copy of the interpreter which shares its config, commands, history and
+        jobs, but has its own cwd, variables and streams, so that changes to them made by the
+        copy don't affect the original.
+        """
+        child = copy(self)
+        child.variables = dict(self.variables)
+        return child
+
+    def substitute_variables(self, command: ExecutableCommand) -> None | Exception:
+        for index, value in enumerate(command.args):
+            if value.startswith("$"):
+                variable = self.variables.get(value)
+                if variable is None:
+                    return Exception(f"Error: unknown variable {value!r}")
+                command.args[index] = repr(variable) if " " in variable else variable
+        return None
+
+    def open_redirects(
+        self, redirects: list[Redirect], stack: ExitStack
+    ) -> None | Exception:
+        """
+        Open the targets of redirects and set them as the interpreter's streams, the
+        targets are closed along with the stack.
+        """
+        for redirect in redirects:
+            path = parse_path(redirect.path, self.cwd)
+            if not path.is_absolute():
+                path = self.cwd / path
+
+            try:
+                sink = stack.enter_context(
+                    closing(open_redirect(path, redirect.append))
+                )
+            except OSError as err:
+                return OSError(f"Error: failed to open {redirect.path!r}, {err}")
+
+            if redirect.stderr:
+                self.stderr = sink
+            else:
+                self.stdout = sink
+
+        return None
+
+    def run_executable(
+        self, executor: Executable, command: ExecutableCommand
+    ) -> None | Exception:
+        if not command.redirects:
+            return executor.execute(self, command.args)
+
+        stdout, stderr = self.stdout, self.stderr
+        try:
+            with ExitStack() as stack:
+                if (err := self.open_redirects(command.redirects, stack)) is not None:
+                    return err
+
+                err = executor.execute(self, command.args)
+
+                # like the rest of the command's errors, the returned one is written to
+                # the redirected stderr instead of being reported
+                if err is not None and self.stderr is not stderr:
+                    print(err, file=self.stderr)
+                    return None
+                return err
+        finally:
+            self.stdout, self.stderr = stdout, stderr
+
+    def execute_command(self, command: ExecutableCommand) -> None | Exception:
+        if (executor := self.commands.instance(command.command)) is None:
+            return UnknownCommandError(f"Error: unknown command {command.command!r}")
+
+        if (err := self.substitute_variables(command)) is not None:
+            return err
+
+        try:
+            return self.run_executable(executor, command)
+        finally:
+            self.stdout.flush()
+
+    def execute_pipeline(self, pipeline: Pipeline) -> None | Exception:
+        executors: list[Executable] = []
+        for command in pipeline.stages:
+            if (executor := self.commands.instance(command.command)) is None:
+                return UnknownCommandError(
+                    f"Error: unknown command {command.command!r}"
+                )
+
+            if (err := self.substitute_variables(command)) is not None:
+                return err
+
+            executors.append(executor)
+
+        # every stage runs in its own copy of the interpreter, like a subshell
+        stages = [self.fork() for _ in executors]
+        for index, (stage, next_stage) in enumerate(zip(stages, stages[1:])):
+            # builtins exchange lines in-process, external processes need a real pipe
+            # so that they can be handed its file descriptors, like output written to a
+            # file, output read by another command never has colours
+            if executors[index].external or executors[index + 1].external:
+                next_stage.stdin, writer = os_pipe()
+                stage.stdout = OutputSink(writer, strip_colours=True)
+            else:
+                pipe = Pipe()
+                next_stage.stdin = pipe.reader
+                stage.stdout = OutputSink(pipe.writer, strip_colours=True)
+
+        errors: list[None | Exception] = [None] * len(stages)
+
+        def close_streams(index: int) -> None:
+            stage = stages[index]
+            if index > 0 and stage.stdin is not None:
+                stage.stdin.close()
+            with suppress(BrokenPipeError):
+                if index < len(stages) - 1:
+                    stage.stdout.close()
+                else:
+                    stage.stdout.flush()
+
+        def run_stage(index: int) -> None:
+            try:
+                errors[index] = stages[index].run_executable(
+                    executors[index], pipeline.stages[index]
+                )
+            except BrokenPipeError:
+                pass  # the next stage stopped reading, this is not an error
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                logger.exception(err)
+                errors[index] = err
+            finally:
+                close_streams(index)
+
+        threads = [
+            Thread(
+                name=f"PipelineStage_{index}_{command.command}",
+                target=copy_context().run,
+                # a profiler only sees its own thread, so stages are profiled apart
+                args=(profiled, run_stage, index),
+                daemon=True,
+            )
+            for index, command in enumerate(pipeline.stages[:-1])
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            run_stage(len(stages) - 1)
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            for index in range(len(stages)):
+                close_streams(index)
+            raise
+
+        return next((err for err in errors if err is not None), None)
+
+    def execute_background(self, background: Background) -> None | Exception:
+        command = background.command
+        job = self.jobs.create(" ".join(command.full_args), self.cwd)
+        # the job runs in its own copy of the interpreter, so that later changes to the
+        # cwd or variables don't affect it, and never reads from the terminal
+        job_interpreter = self.fork()
+        job_interpreter.stdin = StringIO()
+        job_interpreter.stdout = OutputSink(job.stdout)
+        job_interpreter.stderr = OutputSink(job.stderr, buffer_size=0)
+
+        if (
+            isinstance(command, ExecutableCommand)
+            and (executor := self.commands.instance(command.command)) is not None
+            and executor.spawnable
+        ):
+            # processes run on their own instead of taking up one of the job threads
+            if (err := self.substitute_variables(command)) is not None:
+                job.close()
+                return err
+
+            with ExitStack() as stack:
+                if (
+                    err := job_interpreter.open_redirects(command.redirects, stack)
+                ) is None:
+                    process = executor.spawn(job_interpreter, command.args)
+                    if isinstance(process, Exception):
+                        err = process
+                    else:
+                        job.process = process
+            if job.process is None:  # any usage errors were written to the job's output
+                self.report_job(job, notice=False)
+                return err
+
+            self.jobs.add(job)
+            print(f"[{job.id}] {job.process.pid}", file=self.stdout)
+        else:
+            self.jobs.submit(
+                job, copy_context().run, job_interpreter.execute_commands, [command]
+            )
+            print(f"[{job.id}]", file=self.stdout)
+
+        self.stdout.flush()
+        return None
+
+    def report_job(
+        self, job: Job, notice: bool = True, print_error: bool = True
+    ) -> None | Exception:
+        """
+        Print the output of a finished job, and a notice of how it finished, removing it
+        from the job table. Returns the error of the job, if it failed.
+        """
+        err = job.wait()
+        stdout, stderr = job.read_output()
+        self.jobs.remove(job)
+
+        self.stdout.write(stdout)
+        if notice:
+            self.stdout.write(
+                f"[{job.id}]  {'Done' if err is None else 'Failed'}  {job.command}\n"
+            )
+        self.stdout.flush()
+        self.stderr.write(stderr)
+        if notice and print_error and err is not None:
+            print(add_colours(str(err), self.config.colours.errors), file=self.stderr)
+        return err
+
+    def report_jobs(self, wait: bool = False) -> None:
+        """Report every finished job, or every job once it finishes if `wait`."""
+        for job in list(self.jobs) if wait else self.jobs.finished():
+            self.report_job(job)
 
     def interpret_command(self, string_command: str) -> None | Exception:
-        commands = parse_string_command(string_command, self.config.aliases)
+        commands = self.parse_cache.parse(
+            string_command, self.config.expanded_aliases, self.config.aliases_version
+        )
         if isinstance(commands, Exception):
             return commands
 
-        for command in commands:
-            if isinstance(command, VariableDeclaration):
-                self.variables[command.name] = command.value
-            elif isinstance(command, VariableReference):
-                if (variable := self.variables.get(command.name)) is None:
-                    return Exception(f"Error: unknown variable {command.name!r}")
-
-                print(repr(variable) if " " in variable else variable)
-            elif isinstance(command, ExecutableCommand):
-                if (executor := self.commands.get(command.command)) is None:
-                    return UnknownCommandError(
-                        f"Error: unknown command {command.command!r}"
-                    )
+        return self.execute_commands(commands)
 
-                for index, value in enumerate(command.args):
-                    if value.startswith("$"):
-                        variable = self.variables.get(value)
-                        if variable is None:
-                            return Exception(f"Error: unknown variable {value!r}")
-                        command.args[index] = (
-                            repr(variable) if " " in variable else variable
-                        )
+    def dispatch_command(self, command: Command) -> None | Exception:
+        if isinstance(command, VariableDeclaration):
+            self.variables[command.name] = command.value
+        elif isinstance(command, VariableReference):
+            if (variable := self.variables.get(command.name)) is None:
+                return Exception(f"Error: unknown variable {command.name!r}")
 
-                if (err := executor().execute(self, command.args)) is not None:
-                    return err
+            print(repr(variable) if " " in variable else variable, file=self.stdout)
+            self.stdout.flush()
+        elif isinstance(command, ExecutableCommand):
+            return self.execute_command(command)
+        elif isinstance(command, Pipeline):
+            return self.execute_pipeline(command)
+        elif isinstance(command, Background):
+            return self.execute_background(command)
 
         return None
 
+    def execute_commands(self, commands: list[Command]) -> None | Exception:
+        for command in commands:
+            if self.config.record_stats and self.stats_log is not None:
+                with measure(" ".join(command.full_args)) as metrics:
+                    err = self.dispatch_command(command)
+                metrics.error = None if err is None else str(err)
+                self.stats_log.add(metrics)
+            else:
+                err = self.dispatch_command(command)
+
+            if err is not None:
+                return err
+
+        return None
+
+
+class ShellInterpreter(Interpreter, ABC):
+    """Interpreter which reads its own commands, e.g. from a terminal or a script."""
+
     @abstractmethod
     def main(self) -> None:
         ...
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from signal import SIGINT
+from tempfile import TemporaryFile
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator
+
+if TYPE_CHECKING:
+    from subprocess import Popen
+
+
+def output_file() -> IO[str]:
+    # the output of a job is kept on disk until it's reported, so that a long running
+    # job doesn't fill up memory, processes write to its file descriptor directly
+    return TemporaryFile("w+", encoding="utf8", errors="replace")
+
+
+@dataclass(eq=False)
+class Job:
+    id: int
+    command: str
+    cwd: Path  # snapshot of the cwd the job was started in
+    stdout: IO[str]
+    stderr: IO[str]
+    future: Future[None | Exception] | None = None  # builtins run in the job pool
+    process: Popen[str] | None = None  # external processes run on their own
+
+    @property
+    def done(self) -> bool:
+        if self.process is not None:
+            return self.process.poll() is not None
+        return self.future is None or self.future.done()
+
+    def wait(self) -> None | Exception:
+        """Wait for the job to finish, returning its error if it failed."""
+        if self.process is not None:
+            if (code := self.process.wait()) < 0:
+                return Exception(f"Error: terminated by signal {-code}")
+            if code != 0:
+                return Exception(f"Error: exited with code {code}")
+            return None
+
+        if self.future is None:
+            return None
+        try:
+            return self.future.result()
+        except SystemExit as exit_err:
+            return Exception(f"Error: exited with code {exit_err.code!r}")
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            return err
+
+    def interrupt(self) -> None:
+        """Interrupt the process of the job, builtins can't be interrupted."""
+        if self.process is None or self.process.poll() is not None:
+            return
+
+        with suppress(ProcessLookupError):
+            if hasattr(os, "killpg"):
+                # the process leads its own group, which includes its children
+                os.killpg(self.process.pid, SIGINT)
+            else:
+                self.process.terminate()
+
+    def read_output(self) -> tuple[str, str]:
+        output = list[str]()
+        for file in (self.stdout, self.stderr):
+            file.flush()
+            file.seek(0)
+            output.append(file.read())
+        return output[0], output[1]
+
+    def close(self) -> None:
+        self.stdout.close()
+        self.stderr.close()
+
+
+class JobTable:
+    """
+    Background jobs of an interpreter and its forks. Builtins run in a pool of threads
+    which is only created once the first job is started.
+    """
+
+    def __init__(self) -> None:
+        self.jobs = dict[int, Job]()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{{jobs: {list(self.jobs)!r}}}"
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def __iter__(self) -> Iterator[Job]:
+        return iter(sorted(self.jobs.values(), key=lambda job: job.id))
+
+    def get(self, job_id: int) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def latest(self) -> Job | None:
+        return self.jobs[max(self.jobs)] if self.jobs else None
+
+    def create(self, command: str, cwd: Path) -> Job:
+        # like bash, ids start over once every job has been reported
+        job_id = max(self.jobs, default=0) + 1
+        return Job(job_id, command, cwd, output_file(), output_file())
+
+    def submit(
+        self, job: Job, function: Callable[..., None | Exception], *args: Any
+    ) -> None:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(thread_name_prefix="Job")
+        job.future = self._pool.submit(function, *args)
+        self.jobs[job.id] = job
+
+    def add(self, job: Job) -> None:
+        self.jobs[job.id] = job
+
+    def remove(self, job: Job) -> None:
+        self.jobs.pop(job.id, None)
+        job.close()
+
+    def finished(self) -> list[Job]:
+        return [job for job in self if job.done]
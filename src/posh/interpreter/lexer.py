@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from enum import Enum, auto
+from re import DOTALL, Match, Pattern
+from re import compile as re_compile
+from re import escape
+from typing import Iterable, NamedTuple, Sequence
+
+
+class TokenType(Enum):
+    WORD = auto()
+    QUOTED_WORD = auto()  # a word where any part was quoted or escaped
+    SEMICOLON = auto()
+    PIPE = auto()
+    REDIRECT = auto()  # >
+    REDIRECT_APPEND = auto()  # >>
+    REDIRECT_STDERR = auto()  # 2>
+    BACKGROUND = auto()  # &
+
+
+# operators recognized by the lexer, anything else is part of a word
+OPERATORS: dict[str, TokenType] = {
+    ";": TokenType.SEMICOLON,
+    "|": TokenType.PIPE,
+    ">": TokenType.REDIRECT,
+    ">>": TokenType.REDIRECT_APPEND,
+    "2>": TokenType.REDIRECT_STDERR,
+    "&": TokenType.BACKGROUND,
+}
+REDIRECTS = frozenset(
+    (TokenType.REDIRECT, TokenType.REDIRECT_APPEND, TokenType.REDIRECT_STDERR)
+)
+
+
+class Token(NamedTuple):
+    type: TokenType
+    value: str
+
+    @property
+    def is_word(self) -> bool:
+        return self.type in (TokenType.WORD, TokenType.QUOTED_WORD)
+
+    @property
+    def is_redirect(self) -> bool:
+        return self.type in REDIRECTS
+
+    @property
+    def quoted(self) -> bool:
+        return self.type is TokenType.QUOTED_WORD
+
+
+def _compile_lexer(operators: Iterable[str]) -> Pattern[str]:
+    # longest operators first so that multi-character operators take precedence
+    operator_pattern = "|".join(
+        escape(operator) for operator in sorted(operators, key=len, reverse=True)
+    )
+    # single character operators end an unquoted word, e.g. 'a;b' is 'a', ';', 'b'
+    word_stops = escape("".join(op for op in operators if len(op) == 1))
+    return re_compile(
+        r"\s*(?:"
+        rf"(?P<operator>{operator_pattern})"
+        rf"""|(?P<word>(?:[^\s'"\\{word_stops}]+|'[^']*'|"(?:[^"\\]|\\.)*"|\\.)+)"""
+        r"""|(?P<unterminated>['"])"""
+        r"|(?P<escape>\\))",
+        DOTALL,
+    )
+
+
+_LEXER = _compile_lexer(OPERATORS)
+_WORD_PARTS = re_compile(
+    r"""'(?P<single>[^']*)'"""
+    r'|"(?P<double>(?:[^"\\]|\\.)*)"'
+    r"|\\(?P<escaped>.)"
+    r"""|(?P<bare>[^'"\\]+)""",
+    DOTALL,
+)
+_DOUBLE_QUOTE_ESCAPES = re_compile(r'\\([\\"])')
+
+
+def _unquote_part(match: Match[str]) -> str:
+    if (double := match.group("double")) is not None:
+        # like a posix shell, only backslashes & double quotes can be escaped
+        return _DOUBLE_QUOTE_ESCAPES.sub(r"\1", double)
+    return match.group(match.lastgroup or 0)
+
+
+def _word(string: str) -> Token:
+    if "'" not in string and '"' not in string and "\\" not in string:
+        return Token(TokenType.WORD, string)
+    return Token(TokenType.QUOTED_WORD, _WORD_PARTS.sub(_unquote_part, string))
+
+
+def tokenize(string: str) -> list[Token] | ValueError:
+    """
+    Split a command string into tokens in a single pass. Quotes are removed from
+    words, but whether a word was quoted is kept in its token type.
+    """
+    tokens = list[Token]()
+    for match in _LEXER.finditer(string):
+        kind = match.lastgroup
+        if kind == "word":
+            tokens.append(_word(match.group(kind)))
+        elif kind == "operator":
+            operator = match.group(kind)
+            tokens.append(Token(OPERATORS[operator], operator))
+        elif kind == "unterminated":
+            return ValueError("No closing quotation")
+        elif kind == "escape":
+            return ValueError("No escaped character")
+    return tokens
+
+
+def quote(string: str) -> str:
+    """Quote a string, if needed, so that `tokenize` reads it back as a single word."""
+    if (
+        (match := _LEXER.fullmatch(string)) is not None
+        and match.group("word") == string
+        and _word(string).type is TokenType.WORD
+    ):
+        return string
+    return '"' + string.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def join_tokens(tokens: Iterable[Token]) -> str:
+    return " ".join(
+        quote(token.value) if token.is_word else token.value for token in tokens
+    )
+
+
+def join_arguments(args: Sequence[str]) -> str:
+    """
+    Join the arguments of a command back into a command string, a single argument is
+    used as is so that it can hold a whole command line, e.g. 'cat notes.txt | grep x'.
+    """
+    if len(args) == 1:
+        return args[0]
+    return " ".join(map(quote, args))
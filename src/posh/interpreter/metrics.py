@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import os
+import sys
+from atexit import register
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from json import dumps
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Event, Lock, Thread
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Iterator, NamedTuple, NoReturn
+
+from loguru import logger
+
+if sys.platform != "win32":
+    from resource import RUSAGE_SELF, getrusage
+
+if TYPE_CHECKING:
+    from resource import struct_rusage
+    from subprocess import Popen
+
+    from psutil import Process
+
+# ru_maxrss is in kilobytes on linux, but in bytes on macos
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+_process: Process | None = None
+
+
+def get_process() -> Process:
+    global _process  # pylint: disable=global-statement
+    if _process is None:
+        # imported here since psutil is slow to import & only needed once a command
+        # is measured
+        from psutil import Process  # pylint: disable=import-outside-toplevel
+
+        _process = Process()
+    return _process
+
+
+class Sample(NamedTuple):
+    user: float
+    system: float
+    max_rss: int | None  # bytes
+    io: Any | None  # psutil's io counters, which aren't available on macos
+
+
+def take_sample() -> Sample:
+    from psutil import AccessDenied  # pylint: disable=import-outside-toplevel
+
+    process = get_process()
+    times = process.cpu_times()
+    try:
+        io = process.io_counters()
+    except (AttributeError, AccessDenied):
+        io = None
+
+    if sys.platform == "win32":
+        max_rss = getattr(process.memory_info(), "peak_wset", None)
+    else:
+        max_rss = getrusage(RUSAGE_SELF).ru_maxrss * _MAXRSS_SCALE
+
+    return Sample(times.user, times.system, max_rss, io)
+
+
+@dataclass(slots=True)
+class CommandMetrics:
+    """
+    Timing & resource usage of a command. The usage of the shell is measured for the
+    whole process, so it includes any other threads, e.g. background jobs, while the
+    usage of processes started by the command comes from `os.wait4`.
+
+    The operating system doesn't count how many files are stat'd, so the number of read
+    & write calls, and the bytes they transferred, are counted instead.
+    """
+
+    command: str
+    started: float = 0  # unix timestamp
+    wall: float = 0  # all times are in seconds
+    user: float = 0
+    system: float = 0
+    max_rss_delta: int | None = None  # growth of the peak rss in bytes
+    read_calls: int | None = None
+    write_calls: int | None = None
+    read_bytes: int | None = None
+    write_bytes: int | None = None
+    children: int = 0  # processes reaped with `os.wait4`
+    children_user: float = 0
+    children_system: float = 0
+    children_max_rss: int = 0  # bytes, the largest of any single child
+    error: str | None = None
+
+    def add_samples(self, before: Sample, after: Sample) -> None:
+        self.user = after.user - before.user
+        self.system = after.system - before.system
+        if before.max_rss is not None and after.max_rss is not None:
+            self.max_rss_delta = after.max_rss - before.max_rss
+
+        if before.io is not None and after.io is not None:
+            self.read_calls = after.io.read_count - before.io.read_count
+            self.write_calls = after.io.write_count - before.io.write_count
+            # on linux the chars include reads & writes served by the page cache
+            read_field = (
+                "read_chars" if hasattr(after.io, "read_chars") else "read_bytes"
+            )
+            write_field = (
+                "write_chars" if hasattr(after.io, "write_chars") else "write_bytes"
+            )
+            self.read_bytes = getattr(after.io, read_field) - getattr(
+                before.io, read_field
+            )
+            self.write_bytes = getattr(after.io, write_field) - getattr(
+                before.io, write_field
+            )
+
+    def add_child(self, rusage: struct_rusage) -> None:
+        self.children += 1
+        self.children_user += rusage.ru_utime
+        self.children_system += rusage.ru_stime
+        self.children_max_rss = max(
+            self.children_max_rss, rusage.ru_maxrss * _MAXRSS_SCALE
+        )
+
+    def as_json(self) -> str:
+        return dumps(asdict(self))
+
+
+# every command being measured in the current context, innermost last, e.g. both
+# `time run make` and `run make` when stats are recorded
+CURRENT_METRICS: ContextVar[tuple[CommandMetrics, ...]] = ContextVar(
+    "CURRENT_METRICS", default=()
+)
+
+
+@contextmanager
+def measure(command: str) -> Iterator[CommandMetrics]:
+    metrics = CommandMetrics(command, started=time())
+    token = CURRENT_METRICS.set((*CURRENT_METRICS.get(), metrics))
+    before = take_sample()
+    start = perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.wall = perf_counter() - start
+        metrics.add_samples(before, take_sample())
+        CURRENT_METRICS.reset(token)
+
+
+def add_child_usage(rusage: struct_rusage) -> None:
+    """Add the resource usage of a reaped process to every command being measured."""
+    for metrics in CURRENT_METRICS.get():
+        metrics.add_child(rusage)
+
+
+def wait_process(process: Popen[Any]) -> int:
+    """
+    Wait for a process to exit, adding its resource usage, and that of the processes it
+    waited for, to the commands being measured.
+    """
+    if sys.platform == "win32" or process.returncode is not None:
+        return process.wait()
+    if not CURRENT_METRICS.get():
+        return process.wait()
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # already reaped
+        return process.wait()
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    add_child_usage(rusage)
+    return process.returncode
+
+
+class StatsLog:
+    """
+    Append only log of the metrics of every command, one json object per line. Like the
+    history, lines are written by a background thread so that recording them stays off
+    the critical path, the thread is only started once the first line is added.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._queue = SimpleQueue[str]()
+        self._event = Event()
+        self._lock = Lock()
+        self._thread: Thread | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__} {{thread: {self._thread!r}, path: {self.path!r}}}"
+        )
+
+    def add(self, metrics: CommandMetrics) -> None:
+        self._queue.put(metrics.as_json())
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = Thread(
+                        name="StatsLog", target=self._threaded_writer, daemon=True
+                    )
+                    self._thread.start()
+                    register(self._process_queue)
+        self._event.set()
+
+    def _process_queue(self) -> None:
+        lines = list[str]()
+        while not self._queue.empty():
+            lines.append(self._queue.get())
+
+        if lines:
+            with self._lock:
+                try:
+                    with open(self.path, "a", encoding="utf8") as file:
+                        file.writelines(f"{line}\n" for line in lines)
+                except OSError as err:
+                    logger.error(err)
+
+    @logger.catch
+    def _threaded_writer(self) -> NoReturn:
+        while True:
+            self._event.wait()
+            self._event.clear()
+            self._process_queue()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from cProfile import Profile
+    from pstats import Stats
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class ProfileSession:
+    """
+    Profiles of a command and everything it runs in other threads, e.g. the stages of a
+    pipeline, since a profiler only sees the thread it was enabled in.
+    """
+
+    def __init__(self) -> None:
+        self.profiles: list[Profile] = []
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{{profiles: {len(self.profiles)!r}}}"
+
+    def run(self, function: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        # imported here since profiling is rare, unlike starting the shell
+        from cProfile import Profile  # pylint: disable=import-outside-toplevel
+
+        profile = Profile()
+        try:
+            return profile.runcall(function, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.profiles.append(profile)
+
+    def stats(self) -> Stats | None:
+        from pstats import Stats  # pylint: disable=import-outside-toplevel
+
+        with self._lock:
+            if not self.profiles:
+                return None
+            stats = Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+            return stats
+
+
+# the session profiling the command running in the current context, if any
+CURRENT_PROFILE: ContextVar[ProfileSession | None] = ContextVar(
+    "CURRENT_PROFILE", default=None
+)
+
+
+def profiled(function: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    """Call a function, profiling it if the current context is being profiled."""
+    if (session := CURRENT_PROFILE.get()) is None:
+        return function(*args, **kwargs)
+    return session.run(function, *args, **kwargs)
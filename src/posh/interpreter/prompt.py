@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+from functools import lru_cache
+from getpass import getuser
+from pathlib import Path
+from shutil import get_terminal_size
+from threading import Event, Lock, Thread
+from time import monotonic, strftime
+from types import FrameType
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from ..colours import Meta, add_colours
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .console import Console
+
+
+@lru_cache(maxsize=128)
+def shorten_path(path: Path, length: int, root_str: str) -> str:
+    # makes sure at least the topmost directory is showing
+    parts = [path.name]
+    path = path.parent
+
+    while len(f"{root_str}{'/'.join(parts)}/{path.name}") < length:
+        parts.append(path.name)
+        path = path.parent
+
+    return f"{root_str}{Path(*reversed(parts)).as_posix()}"
+
+
+def format_path(cwd: Path, config: Config) -> str:
+    if not config.shorten_path:
+        return cwd.as_posix()
+
+    home = Path.home()
+    if cwd == home:
+        return "~"
+    if cwd.is_relative_to(home):
+        relative_path = cwd.relative_to(home)
+        relative_path_string = relative_path.as_posix()
+        if len(relative_path_string) > config.shortened_path_length:
+            return shorten_path(relative_path, config.shortened_path_length, "~/.../")
+        return f"~/{relative_path_string}"
+    if len(str(cwd)) > config.shortened_path_length:
+        root_str = f"{Path(home.anchor).as_posix()}.../"
+        return shorten_path(cwd, config.shortened_path_length, root_str)
+    return cwd.as_posix()
+
+
+class PromptSegment(ABC):
+    """
+    Provider of one segment of the prompt, e.g. the cwd. A segment is only rendered
+    again once its key changes, a key of None renders it for every prompt.
+
+    Background segments are rendered on a thread of their own, the prompt waits at most
+    `timeout` seconds for them and otherwise shows their last value, a late value is
+    shown by the next prompt. They shouldn't change the console.
+    """
+
+    background = False
+    timeout = 0.05  # seconds
+
+    @classmethod
+    @abstractmethod
+    def name(cls) -> str:
+        ...
+
+    def key(self, console: Console) -> Hashable | None:
+        return None
+
+    @abstractmethod
+    def render(self, console: Console) -> str:
+        ...
+
+
+class TimeSegment(PromptSegment):
+    def __init__(self) -> None:
+        self._columns: int | None = None
+
+    @classmethod
+    def name(cls) -> str:
+        return "time"
+
+    def terminal_resized(self, signum: int, frame: FrameType | None) -> None:
+        self._columns = None
+
+    def render(self, console: Console) -> str:
+        if not console.config.show_time:
+            return ""
+
+        if self._columns is None:
+            self._columns = get_terminal_size().columns
+        time_block = f"[{strftime('%X')}]"
+        return add_colours(
+            f"{time_block:>{self._columns}}\r", console.config.colours.time, Meta.BOLD
+        )
+
+
+class UsernameSegment(PromptSegment):
+    @classmethod
+    def name(cls) -> str:
+        return "username"
+
+    def key(self, console: Console) -> Hashable | None:
+        return console.config.show_username, console.config.colours.username
+
+    def render(self, console: Console) -> str:
+        if not console.config.show_username:
+            return ""
+        return add_colours(getuser(), console.config.colours.username, Meta.BOLD) + ":"
+
+
+class PathSegment(PromptSegment):
+    @classmethod
+    def name(cls) -> str:
+        return "path"
+
+    def key(self, console: Console) -> Hashable | None:
+        # the config is changed in place by the config command, so its values are
+        # compared rather than the object
+        return (
+            console.cwd,
+            console.config.shorten_path,
+            console.config.shortened_path_length,
+            console.config.colours.current_path,
+        )
+
+    def render(self, console: Console) -> str:
+        return add_colours(
+            format_path(console.cwd, console.config),
+            console.config.colours.current_path,
+            Meta.BOLD,
+        )
+
+
+def find_branch(cwd: Path) -> str | None:
+    for directory in (cwd, *cwd.parents):
+        git = directory / ".git"
+        if git.is_file():  # a worktree or submodule points to its git directory
+            gitdir = git.read_text(encoding="utf8").strip().removeprefix("gitdir: ")
+            git = directory / gitdir
+        elif not git.is_dir():
+            continue
+
+        head = (git / "HEAD").read_text(encoding="utf8").strip()
+        if head.startswith("ref: "):
+            return head.removeprefix("ref: ").removeprefix("refs/heads/")
+        return head[:7]  # a detached head
+    return None
+
+
+class BranchSegment(PromptSegment):
+    # looking for the repository stats every parent of the cwd, which can be slow
+    background = True
+
+    @classmethod
+    def name(cls) -> str:
+        return "branch"
+
+    def render(self, console: Console) -> str:
+        try:
+            branch = find_branch(console.cwd)
+        except OSError:
+            branch = None
+        if branch is None:
+            return ""
+        return " " + add_colours(f"({branch})", console.config.colours.username)
+
+
+class DurationSegment(PromptSegment):
+    MIN_DURATION = 1  # seconds, quicker commands aren't worth showing
+
+    @classmethod
+    def name(cls) -> str:
+        return "duration"
+
+    def key(self, console: Console) -> Hashable | None:
+        return console.last_duration, console.config.colours.time
+
+    def render(self, console: Console) -> str:
+        if console.last_duration is None or console.last_duration < self.MIN_DURATION:
+            return ""
+        return " " + add_colours(
+            f"{console.last_duration:.1f}s", console.config.colours.time
+        )
+
+
+class JobsSegment(PromptSegment):
+    @classmethod
+    def name(cls) -> str:
+        return "jobs"
+
+    def key(self, console: Console) -> Hashable | None:
+        return len(console.jobs), console.config.colours.time
+
+    def render(self, console: Console) -> str:
+        if not (jobs := len(console.jobs)):
+            return ""
+        return " " + add_colours(
+            f"[{jobs} job{'s' if jobs > 1 else ''}]", console.config.colours.time
+        )
+
+
+# every segment which can be shown, in the `prompt_segments` config option
+PROMPT_SEGMENTS: dict[str, type[PromptSegment]] = {
+    segment.name(): segment
+    for segment in (
+        TimeSegment,
+        UsernameSegment,
+        PathSegment,
+        BranchSegment,
+        DurationSegment,
+        JobsSegment,
+    )
+}
+
+
+class SegmentState:
+    def __init__(self, segment: PromptSegment) -> None:
+        self.segment = segment
+        self.key: Hashable | None = None
+        self.value: str | None = None
+        # set once the background render in progress, if any, has finished
+        self.rendered: Event | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{segment: {self.segment.name()!r}, "
+            f"key: {self.key!r}, value: {self.value!r}}}"
+        )
+
+
+class Prompt:
+    """
+    The segments of the prompt, in the order of the `prompt_segments` config option,
+    each keeps its last value, which is only rendered again once its key changes.
+    """
+
+    def __init__(self) -> None:
+        self.renders = 0
+        self._states = dict[str, SegmentState]()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{renders: {self.renders!r}, "
+            f"segments: {list(self._states)!r}}}"
+        )
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def state(self, name: str) -> SegmentState | None:
+        if (state := self._states.get(name)) is None:
+            if (segment := PROMPT_SEGMENTS.get(name)) is None:
+                return None
+            state = self._states[name] = SegmentState(segment())
+        return state
+
+    def terminal_resized(self, signum: int, frame: FrameType | None) -> None:
+        for state in self._states.values():
+            if isinstance(state.segment, TimeSegment):
+                state.segment.terminal_resized(signum, frame)
+
+    def render_in_background(self, state: SegmentState, console: Console) -> Event:
+        def render() -> None:
+            try:
+                value = state.segment.render(console)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                logger.error(f"prompt segment {state.segment.name()!r} failed, {err}")
+            else:
+                with self._lock:
+                    state.value = value
+            finally:
+                rendered.set()
+
+        rendered = Event()
+        Thread(
+            name=f"Prompt-{state.segment.name()}", target=render, daemon=True
+        ).start()
+        return rendered
+
+    def refresh(self, state: SegmentState, console: Console) -> bool:
+        """
+        Render a segment again if its key changed, returning whether it's being
+        rendered in the background.
+        """
+        key = state.segment.key(console)
+        if key is not None and key == state.key and state.value is not None:
+            return False
+        # a render which is still running, e.g. on a hung file system, isn't repeated
+        # or waited for again
+        if state.rendered is not None and not state.rendered.is_set():
+            return False
+        state.key = key
+        self.renders += 1
+
+        if not state.segment.background:
+            state.value = state.segment.render(console)
+            return False
+        state.rendered = self.render_in_background(state, console)
+        return True
+
+    def render(self, console: Console) -> str:
+        start = monotonic()
+        states = [
+            state
+            for name in console.config.prompt_segments
+            if (state := self.state(name)) is not None
+        ]
+        # every background segment is started before waiting for any of them, so
+        # that the prompt waits for the slowest, rather than the sum of them
+        rendering = [self.refresh(state, console) for state in states]
+
+        output = ""
+        for state, in_background in zip(states, rendering):
+            if in_background and state.rendered is not None:
+                state.rendered.wait(max(0, start + state.segment.timeout - monotonic()))
+            with self._lock:
+                output += state.value or ""
+        return output
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import sha1
+from os import replace
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, dump, load
+from typing import TYPE_CHECKING, Iterator, Mapping
+
+from loguru import logger
+
+from .. import __version__
+from .commands import copy_command, expand_aliases, group_tokens, parse_commands
+from .lexer import TokenType, tokenize
+
+if TYPE_CHECKING:
+    from os import stat_result
+
+    from .commands import Command
+    from .lexer import Token
+
+
+class ScriptSyntaxError(Exception):
+    def __init__(self, message: str, line: str, line_no: int) -> None:
+        super().__init__(message)
+        self.line = line
+        self.line_no = line_no
+
+
+@dataclass(slots=True)
+class CompiledLine:
+    line_no: int
+    line: str
+    tokens: list[Token]
+    commands: list[Command]  # parsed without expanding any aliases
+
+    def parse(
+        self, expanded_aliases: Mapping[str, list[Token]]
+    ) -> list[Command] | Exception:
+        """Return the commands of the line, only parsing it again if it uses an alias."""
+        if not any(
+            token.type is TokenType.WORD and token.value in expanded_aliases
+            for token in self.tokens
+        ):
+            return [copy_command(command) for command in self.commands]
+
+        return parse_commands(
+            group_tokens(expand_aliases(self.tokens, expanded_aliases))
+        )
+
+
+@dataclass(slots=True)
+class CompiledScript:
+    """
+    Every line of a script tokenized & parsed ahead of running it, the path, mtime,
+    size and posh version it was compiled from are used to validate cached scripts.
+    """
+
+    path: Path
+    mtime_ns: int
+    size: int
+    version: str
+    lines: list[CompiledLine]
+
+    def is_valid(self, path: Path, stat: stat_result) -> bool:
+        return (self.path, self.mtime_ns, self.size, self.version) == (
+            path,
+            stat.st_mtime_ns,
+            stat.st_size,
+            __version__,
+        )
+
+
+def compile_script(
+    path: Path, stat: stat_result | None = None
+) -> CompiledScript | ScriptSyntaxError:
+    """
+    Compile a whole script, returning the error of the first invalid line if there is
+    one. Raises `OSError` if the script can't be read.
+    """
+    path = path.resolve()
+    if stat is None:
+        stat = path.stat()
+
+    lines = list[CompiledLine]()
+    with open(path, "rb") as file:
+        for line_no, line_bytes in enumerate(file, start=1):
+            try:
+                line = line_bytes.decode("utf8").strip()
+            except UnicodeDecodeError as err:
+                return ScriptSyntaxError(
+                    f"Error: failed to decode line, {err}",
+                    line_bytes.decode("utf8", errors="replace").strip(),
+                    line_no,
+                )
+
+            if not line:
+                continue
+
+            if isinstance(tokens := tokenize(line), Exception):
+                return ScriptSyntaxError(f"Error: {tokens}", line, line_no)
+
+            if isinstance(commands := parse_commands(group_tokens(tokens)), Exception):
+                return ScriptSyntaxError(str(commands), line, line_no)
+
+            lines.append(CompiledLine(line_no, line, tokens, commands))
+
+    return CompiledScript(path, stat.st_mtime_ns, stat.st_size, __version__, lines)
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    # unpickling a large script creates many objects at once which would otherwise
+    # trigger repeated, pointless, collections since all of them are still alive
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def get_cache_path(path: Path, cache_directory: Path) -> Path:
+    return cache_directory / f"{sha1(path.as_posix().encode()).hexdigest()}.pickle"
+
+
+def load_script(
+    path: Path, cache_directory: Path | None = None
+) -> CompiledScript | ScriptSyntaxError:
+    """
+    Compile a script, or load it from the cache if it hasn't changed since it was last
+    compiled. Raises `OSError` if the script can't be read.
+    """
+    path = path.resolve()
+    stat = path.stat()
+
+    if cache_directory is None:
+        return compile_script(path, stat)
+
+    cache_path = get_cache_path(path, cache_directory)
+    try:
+        with open(cache_path, "rb") as file, gc_paused():
+            cached = load(file)
+        if isinstance(cached, CompiledScript) and cached.is_valid(path, stat):
+            return cached
+    except FileNotFoundError:
+        pass
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        logger.warning(f"failed to load the compiled script @ {cache_path!r}, {err}")
+
+    if isinstance(compiled := compile_script(path, stat), ScriptSyntaxError):
+        return compiled
+
+    # written to a temporary file first so that a partially written cache is never read
+    temp_path = cache_path.with_suffix(".tmp")
+    try:
+        cache_directory.mkdir(exist_ok=True)
+        with open(temp_path, "wb") as file:
+            dump(compiled, file, HIGHEST_PROTOCOL)
+        replace(temp_path, cache_path)
+    except OSError as err:
+        logger.warning(f"failed to cache the compiled script @ {cache_path!r}, {err}")
+
+    return compiled
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from copy import deepcopy
+from io import BufferedIOBase, StringIO
+from pathlib import Path
+from signal import SIGTERM, default_int_handler, signal
+from socketserver import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+from threading import Lock
+from typing import IO, Any, Iterator
+
+from loguru import logger
+
+from ..client import encode_frame, make_private_directory, socket_directory
+from .commands import ParseCache
+from .interpreter import Interpreter, ShellInterpreter
+from .jobs import JobTable
+from .streams import CURRENT_SESSION, OutputSink
+
+
+class SessionRouter:
+    """
+    Stand-in for `sys.stdout` & `sys.stderr` which sends anything written directly to
+    them, e.g. argparse's usage messages, to the session running in the current context.
+    """
+
+    def __init__(self, fallback: IO[str], stderr: bool = False) -> None:
+        self.fallback = fallback
+        self.stderr = stderr
+
+    def write(self, string: str, /) -> int:
+        if (session := CURRENT_SESSION.get()) is None:
+            return self.fallback.write(string)
+        return (session.stderr if self.stderr else session.stdout).write(string)
+
+    def flush(self) -> None:
+        if (session := CURRENT_SESSION.get()) is None:
+            self.fallback.flush()
+        else:
+            (session.stderr if self.stderr else session.stdout).flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.fallback, name)
+
+
+class FrameWriter:
+    def __init__(self, file: BufferedIOBase) -> None:
+        self.file = file
+        self.lock = Lock()  # pipeline stages may write from their own threads
+
+    def send(self, **frame: Any) -> None:
+        with self.lock:
+            self.file.write(encode_frame(**frame))
+            self.file.flush()
+
+
+class FrameStream:
+    """Output stream which sends everything written to it to the client as frames."""
+
+    def __init__(self, writer: FrameWriter, name: str) -> None:
+        self.writer = writer
+        self.name = name
+
+    def write(self, string: str, /) -> int:
+        if string:
+            self.writer.send(**{self.name: string})
+        return len(string)
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+def read_frames(file: BufferedIOBase) -> Iterator[dict[str, Any]]:
+    for raw_frame in file:
+        yield json.loads(raw_frame)
+
+
+class SessionHandler(StreamRequestHandler):
+    server: PoshServer
+
+    def open_session(self, start: dict[str, Any], writer: FrameWriter) -> Interpreter:
+        """
+        Fork the warm interpreter, giving the session its own cwd, variables and config,
+        so that e.g. an alias made by one client isn't seen by the others.
+        """
+        session = self.server.interpreter.fork()
+        session.config = deepcopy(session.config)
+        session.cwd = Path(start.get("cwd") or session.cwd)
+        session.variables = dict[str, str]()
+        session.parse_cache = ParseCache()
+        session.jobs = JobTable()
+        session.stdin = StringIO()  # the server's own stdin isn't the client's
+        strip_colours = not start.get("colours", False)
+        session.stdout = OutputSink(
+            FrameStream(writer, "stdout"), strip_colours=strip_colours
+        )
+        session.stderr = OutputSink(
+            FrameStream(writer, "stderr"), buffer_size=0, strip_colours=strip_colours
+        )
+        return session
+
+    def handle(self) -> None:
+        frames = read_frames(self.rfile)
+        writer = FrameWriter(self.wfile)
+        try:
+            start = next(frames, None)
+        except ValueError as frame_err:
+            logger.warning(f"invalid frame from client, {frame_err}")
+            return
+        if start is None:
+            return
+
+        session = self.open_session(start, writer)
+        token = CURRENT_SESSION.set(session)
+        exit_code = 0
+        try:
+            for frame in frames:
+                if not (line := str(frame.get("line", "")).strip()):
+                    continue
+
+                try:
+                    err = session.interpret_command(line)
+                except SystemExit as exit_err:
+                    code = exit_err.code
+                    exit_code = code if isinstance(code, int) else int(code is not None)
+                    break
+
+                if err is not None:
+                    session.stdout.flush()
+                    print(err, file=session.stderr)
+                    exit_code = 1
+                else:
+                    exit_code = 0
+                session.report_jobs()
+
+            session.report_jobs(wait=True)
+        except ValueError as frame_err:
+            logger.warning(f"invalid frame from client, {frame_err}")
+            exit_code = 1
+        finally:
+            CURRENT_SESSION.reset(token)
+
+        try:
+            session.stdout.flush()
+            writer.send(exit=exit_code)
+        except OSError:
+            pass  # the client disconnected
+
+
+class PoshServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        self.socket_path = socket_path
+        super().__init__(str(socket_path), SessionHandler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        # whoever can connect runs commands as the user
+        os.chmod(self.socket_path, 0o600)
+
+
+def is_serving(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(socket_path))
+        except OSError:
+            return False
+        return True
+
+
+class ServerInterpreter(ShellInterpreter):
+    """
+    Interpreter which stays warm and serves sessions from clients over a unix socket,
+    every session runs in its own fork of it.
+    """
+
+    records_history = False
+
+    def __init__(self, starting_directory: Path, socket_path: Path) -> None:
+        super().__init__(starting_directory)
+        self.socket_path = socket_path
+
+    def main(self) -> None:
+        if self.socket_path.parent == socket_directory():
+            try:
+                make_private_directory(self.socket_path.parent)
+            except OSError as err:
+                print(f"Error: can't serve @ {self.socket_path}, {err}")
+                return
+
+        if self.socket_path.exists():
+            if is_serving(self.socket_path):
+                print(f"Error: a server is already running @ {self.socket_path}")
+                return
+            self.socket_path.unlink()  # left behind by a server which didn't exit
+
+        # stop serving, and remove the socket, when terminated as well as interrupted
+        signal(SIGTERM, default_int_handler)
+
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = SessionRouter(stdout)
+        sys.stderr = SessionRouter(stderr, stderr=True)
+        try:
+            with PoshServer(self.socket_path, self) as server:
+                print(f"posh server listening @ {self.socket_path}", flush=True)
+                server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+            self.socket_path.unlink(missing_ok=True)
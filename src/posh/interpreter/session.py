@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+from .commands import ExecutableCommand, ParseCache
+from .interpreter import Interpreter, UnknownCommandError
+from .jobs import JobTable
+from .streams import CURRENT_SESSION, OutputSink
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    command: str
+    stdout: str
+    stderr: str
+    error: Exception | None
+    elapsed: float  # seconds
+    records: list[Any] | None = None  # only set by `Session.records`
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class EmbeddedInterpreter(Interpreter):
+    """Interpreter driven by sessions of the program embedding it, see `Session`."""
+
+    records_history = False
+
+
+_base_interpreter: EmbeddedInterpreter | None = None
+_base_lock = Lock()
+
+
+def get_base_interpreter() -> EmbeddedInterpreter:
+    # every session forks the same interpreter since there can only be one history
+    # manager per file, this also means the commands & config are only loaded once
+    global _base_interpreter  # pylint: disable=global-statement
+    with _base_lock:
+        if _base_interpreter is None:
+            _base_interpreter = EmbeddedInterpreter(Path.cwd())
+        return _base_interpreter
+
+
+class Session:
+    """
+    Run posh commands from python, returning their output & errors as a `Result`
+    instead of printing them. Every session has its own cwd and variables.
+
+    ```
+    session = Session("~/projects")
+    if (result := session.run("ls | grep posh")).ok:
+        print(result.stdout)
+    paths = session.records("ls -r").records
+    ```
+    """
+
+    def __init__(self, cwd: str | Path | None = None, colours: bool = False) -> None:
+        path = Path.cwd() if cwd is None else Path(cwd).expanduser().resolve()
+        if not path.is_dir():
+            raise NotADirectoryError(f"Error: {str(cwd)!r} is not a directory")
+
+        self.interpreter = get_base_interpreter().fork()
+        # changes to the config, e.g. aliases, stay in the session
+        self.interpreter.config = deepcopy(self.interpreter.config)
+        self.interpreter.cwd = path
+        self.interpreter.variables = dict[str, str]()
+        self.interpreter.parse_cache = ParseCache()
+        self.interpreter.jobs = JobTable()
+        self.interpreter.stdin = StringIO()  # the embedding program's stdin isn't ours
+        self.colours = colours
+        self.exited = False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{{cwd: {self.cwd!r}, exited: {self.exited!r}}}"
+
+    @property
+    def cwd(self) -> Path:
+        return self.interpreter.cwd
+
+    @property
+    def variables(self) -> dict[str, str]:
+        return self.interpreter.variables
+
+    def _run(self, command: str, records: bool) -> Result:
+        stdout = OutputSink.capture(strip_colours=not self.colours)
+        stderr = OutputSink.capture(strip_colours=not self.colours)
+        self.interpreter.stdout, self.interpreter.stderr = stdout, stderr
+        # the input of the last command may have been closed by it, e.g. by `run`
+        self.interpreter.stdin = StringIO()
+
+        start = perf_counter()
+        output: list[Any] | Exception | None = None
+        token = CURRENT_SESSION.set(self.interpreter)
+        try:
+            if self.exited:
+                output = Exception("Error: the session has exited")
+            elif records:
+                output = self.get_records(command)
+            else:
+                output = self.interpreter.interpret_command(command)
+        except SystemExit as exit_err:
+            self.exited = True
+            if exit_err.code not in (None, 0):
+                output = Exception(f"Error: exited with code {exit_err.code!r}")
+        finally:
+            CURRENT_SESSION.reset(token)
+        elapsed = perf_counter() - start
+
+        return Result(
+            command,
+            stdout.getvalue(),
+            stderr.getvalue(),
+            output if isinstance(output, Exception) else None,
+            elapsed,
+            output if isinstance(output, list) else None,
+        )
+
+    def get_records(self, command: str) -> list[Any] | Exception:
+        commands = self.interpreter.parse_cache.parse(
+            command,
+            self.interpreter.config.expanded_aliases,
+            self.interpreter.config.aliases_version,
+        )
+        if isinstance(commands, Exception):
+            return commands
+
+        if (
+            len(commands) != 1
+            or not isinstance(executable_command := commands[0], ExecutableCommand)
+            or executable_command.redirects
+        ):
+            return Exception(
+                "Error: records can only be returned by a single command, "
+                "without pipes or redirects"
+            )
+
+        if (
+            executor := self.interpreter.commands.instance(executable_command.command)
+        ) is None:
+            return UnknownCommandError(
+                f"Error: unknown command {executable_command.command!r}"
+            )
+
+        if (
+            err := self.interpreter.substitute_variables(executable_command)
+        ) is not None:
+            return err
+
+        return executor.records(self.interpreter, executable_command.args)
+
+    def run(self, command: str) -> Result:
+        """Run a line of commands, capturing everything they print."""
+        return self._run(command, records=False)
+
+    def records(self, command: str) -> Result:
+        """
+        Run a single command and return what it would print as records, e.g. a
+        `PathRecord` per path listed by `ls`. Commands without records return an error.
+        """
+        return self._run(command, records=True)
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import sys
+from collections import deque
+from contextlib import suppress
+from contextvars import ContextVar
+from io import StringIO, UnsupportedOperation
+from os import fdopen, fstat, pipe
+from shutil import copyfileobj
+from stat import S_ISREG
+from threading import Condition
+from typing import IO, TYPE_CHECKING, Iterator, Protocol
+
+from ..colours import strip_colours
+
+if sys.platform == "linux":
+    from os import sendfile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .interpreter import Interpreter
+
+# size, in characters, at which an `OutputSink` writes its buffer to the target
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# size, in bytes, of the write buffer of a file that output is redirected to
+REDIRECT_BUFFER_SIZE = 1024 * 1024
+# most bytes copied by a single call to `sendfile`
+SENDFILE_SIZE = 1024 * 1024 * 1024
+
+# the session whose command runs in the current context, if any, output written
+# straight to `sys.stdout` & `sys.stderr`, e.g. argparse's messages, belongs to it
+CURRENT_SESSION: ContextVar[Interpreter | None] = ContextVar(
+    "CURRENT_SESSION", default=None
+)
+
+
+class OutputStream(Protocol):
+    def write(self, string: str, /) -> int:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class InputStream(Protocol):
+    def __iter__(self) -> Iterator[str]:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+def get_fileno(stream: object) -> int | None:
+    """Return the file descriptor backing a stream, or None if there isn't one."""
+    try:
+        return stream.fileno()  # type: ignore
+    except (AttributeError, OSError, UnsupportedOperation):
+        return None
+
+
+class OutputSink:
+    """
+    Buffered output of a command. Writes are joined into large blocks which are only
+    written to the target once the buffer is full or the sink is flushed at the end of
+    the command. It is also the one place where output is captured or has its colours
+    stripped.
+    """
+
+    def __init__(
+        self,
+        target: OutputStream | None = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        strip_colours: bool = False,
+    ) -> None:
+        self.target = target  # None is the process' stdout at the time of writing
+        self.buffer_size = buffer_size
+        self.strip_colours = strip_colours
+        self._buffer = list[str]()
+        self._size = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{target: {self.target!r}, "
+            f"buffered: {self._size!r}, strip_colours: {self.strip_colours!r}}}"
+        )
+
+    @classmethod
+    def capture(cls, strip_colours: bool = True) -> OutputSink:
+        """Create a sink which keeps everything written to it, see `getvalue`."""
+        return cls(StringIO(), strip_colours=strip_colours)
+
+    def getvalue(self) -> str:
+        if not isinstance(self.target, StringIO):
+            raise TypeError("only a capturing sink has a value")
+        self.flush()
+        return self.target.getvalue()
+
+    def write(self, string: str, /) -> int:
+        self._buffer.append(string)
+        self._size += len(string)
+        if self._size >= self.buffer_size:
+            self.flush()
+        return len(string)
+
+    def flush(self) -> None:
+        target = sys.stdout if self.target is None else self.target
+        if self._buffer:
+            block = "".join(self._buffer)
+            self._buffer.clear()
+            self._size = 0
+            target.write(strip_colours(block) if self.strip_colours else block)
+        target.flush()
+
+    def fileno(self) -> int:
+        """
+        Return the file descriptor of the target, so that external processes can write
+        to it directly. The sink should be flushed before handing it out.
+        """
+        if (
+            fileno := get_fileno(sys.stdout if self.target is None else self.target)
+        ) is None:
+            raise UnsupportedOperation("the target of the sink has no file descriptor")
+        return fileno
+
+    def isatty(self) -> bool:
+        target = sys.stdout if self.target is None else self.target
+        try:
+            return target.isatty()  # type: ignore
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self.target is not None:
+                self.target.close()
+
+
+class Pipe:
+    """
+    Bounded, in-process pipe of lines between two builtins. Writers block while the
+    pipe is full and raise `BrokenPipeError` once the reader has been closed, readers
+    block while it is empty and stop once the writer has been closed.
+    """
+
+    def __init__(self, max_lines: int = 1024) -> None:
+        self.max_lines = max_lines
+        self._lines = deque[str]()
+        self._partial = ""
+        self._condition = Condition()
+        self._writer_closed = False
+        self._reader_closed = False
+        self.reader = PipeReader(self)
+        self.writer = PipeWriter(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}{{lines: {len(self._lines)!r}, "
+            f"writer_closed: {self._writer_closed!r}, "
+            f"reader_closed: {self._reader_closed!r}}}"
+        )
+
+    def _put(self, lines: list[str]) -> None:
+        with self._condition:
+            while len(self._lines) >= self.max_lines and not self._reader_closed:
+                self._condition.wait()
+
+            if self._reader_closed:
+                raise BrokenPipeError("the reading end of the pipe has been closed")
+
+            self._lines.extend(lines)
+            self._condition.notify_all()
+
+    def write(self, string: str) -> int:
+        if self._writer_closed:
+            raise ValueError("write to a closed pipe")
+
+        if "\n" not in string:
+            self._partial += string
+            return len(string)
+
+        *lines, self._partial = (self._partial + string).split("\n")
+        self._put([f"{line}\n" for line in lines])
+        return len(string)
+
+    def close_writer(self) -> None:
+        if self._writer_closed:
+            return
+
+        try:
+            if self._partial:
+                self._put([self._partial])
+        except BrokenPipeError:
+            pass
+        finally:
+            self._partial = ""
+            with self._condition:
+                self._writer_closed = True
+                self._condition.notify_all()
+
+    def read_lines(self) -> Iterator[str]:
+        while True:
+            with self._condition:
+                while not self._lines and not self._writer_closed:
+                    if self._reader_closed:
+                        return
+                    self._condition.wait()
+
+                if not self._lines or self._reader_closed:
+                    return
+
+                lines = list(self._lines)
+                self._lines.clear()
+                self._condition.notify_all()
+
+            yield from lines
+
+    def close_reader(self) -> None:
+        with self._condition:
+            self._reader_closed = True
+            self._lines.clear()
+            self._condition.notify_all()
+
+
+class PipeWriter:
+    def __init__(self, pipe: Pipe) -> None:
+        self._pipe = pipe
+
+    def write(self, string: str, /) -> int:
+        return self._pipe.write(string)
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        self._pipe.close_writer()
+
+
+class PipeReader:
+    def __init__(self, pipe: Pipe) -> None:
+        self._pipe = pipe
+
+    def __iter__(self) -> Iterator[str]:
+        return self._pipe.read_lines()
+
+    def close(self) -> None:
+        self._pipe.close_reader()
+
+
+def open_redirect(path: Path, append: bool = False) -> OutputSink:
+    """
+    Open a file that output is redirected to. The file is opened once with a large
+    write buffer and colours are stripped from anything written to it.
+    """
+    file = open(  # pylint: disable=consider-using-with
+        path, "a" if append else "w", encoding="utf8", buffering=REDIRECT_BUFFER_SIZE
+    )
+    return OutputSink(file, strip_colours=True)
+
+
+def send_file(path: Path, stream: OutputStream) -> bool:
+    """
+    Copy the contents of a file into a stream backed by a regular file, e.g. one that
+    output is redirected to, without the data passing through python. The copy always
+    ends in a LF, like the output of `print`. Returns whether the file was copied.
+    """
+    if (fileno := get_fileno(stream)) is None or not S_ISREG(fstat(fileno).st_mode):
+        return False
+
+    stream.flush()
+    with open(path, "rb") as source:
+        offset = 0
+        sent_all = False
+        # only linux can sendfile between two regular files, and not in append mode
+        if sys.platform == "linux":
+            with suppress(OSError):
+                while sent := sendfile(fileno, source.fileno(), offset, SENDFILE_SIZE):
+                    offset += sent
+                sent_all = True
+
+        if not sent_all:
+            # carry on from wherever sendfile stopped, the target is already past it
+            source.seek(offset)
+            with open(fileno, "wb", buffering=0, closefd=False) as target:
+                copyfileobj(source, target, REDIRECT_BUFFER_SIZE)
+
+        if (size := source.seek(0, 2)) > 0:
+            source.seek(size - 1)
+            if source.read(1) != b"\n":
+                stream.write("\n")
+
+    return True
+
+
+def os_pipe() -> tuple[IO[str], IO[str]]:
+    """
+    Create a pipe backed by the operating system, used whenever one side of the
+    pipe is an external process so that it can be handed the file descriptor.
+    """
+    read_fd, write_fd = pipe()
+    return (
+        fdopen(read_fd, "r", encoding="utf8", errors="replace"),
+        fdopen(write_fd, "w", encoding="utf8"),
+    )